@@ -0,0 +1,142 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Adaptadores das plataformas do Multi Downloader
+Cada plataforma é descrita por um adaptador: os domínios aceitos (o próprio domínio e os seus subdomínios,
+consultados em uma tabela pelos sufixos do host, sem comparações por trecho do endereço), a pasta de
+download, o nome exibido nas mensagens, as opções extras do yt_dlp e os padrões de URL (pré-compilados) que
+indicam o extrator do yt_dlp (`ie_key`). Com o `ie_key`, a extração usa diretamente o extrator
+correspondente, sem testar a URL contra toda a lista de extratores.
+Adicionar uma plataforma baixada pelo yt_dlp exige apenas registrar um novo adaptador.
+Funções:
+    sanitize_twitter_url(url):
+        Converte a URL de um tweet para o formato /i/status/ID.
+    url_host(url) / host_matches(host, domain):
+        Obtêm o host de uma URL e indicam se ele é um domínio ou um subdomínio dele (usadas também por archive.py).
+    register_adapter(adapter):
+        Registra um adaptador e os seus domínios.
+    find_adapter(url) / get_adapter(platform) / all_adapters():
+        Localizam o adaptador de uma URL (pelo domínio), de uma plataforma ou listam todos.
+Classes:
+    PlatformAdapter:
+        Descrição de uma plataforma e resolução do extrator do yt_dlp de cada URL.
+"""
+
+# Importações nativas
+import re
+from urllib.parse import urlparse, urlunparse
+
+# Classe que descreve uma plataforma
+class PlatformAdapter:
+    def __init__(self, platform, name, hosts, directory, patterns=(), ytdl=True, sanitize=None, ydl_options=None):
+        self.platform = platform  # Identificador da plataforma (youtube, twitter...)
+        self.name = name  # Nome exibido nas mensagens
+        self.hosts = frozenset(host.lower() for host in hosts)  # Domínios aceitos (e os seus subdomínios)
+        self.directory = directory  # Pasta de download
+        # Padrões de URL e o extrator do yt_dlp correspondente (o primeiro padrão que casar é usado)
+        self.patterns = tuple((re.compile(pattern), ie_key) for pattern, ie_key in patterns)
+        self.ytdl = ytdl  # Baixada pelo yt_dlp (com escolha de formato e qualidade)
+        self.sanitize = sanitize  # Função que ajusta a URL antes do download
+        self.ydl_options = dict(ydl_options or {})  # Opções extras do yt_dlp
+
+    # Obtém o extrator do yt_dlp da URL, ou None se nenhum padrão casar (o yt_dlp testa todos os extratores)
+    def resolve_ie_key(self, url):
+        for pattern, ie_key in self.patterns:
+            if pattern.match(url):
+                return ie_key
+        return None
+
+    # Ajusta a URL antes do download
+    def prepare_url(self, url):
+        return self.sanitize(url) if self.sanitize else url
+
+# Função para sanitizar a URL do Twitter
+def sanitize_twitter_url(url):
+    parsed_url = urlparse(url)
+    path_parts = parsed_url.path.split('/')
+    if len(path_parts) > 2 and path_parts[1] != 'i':
+        path_parts[1] = 'i'
+        sanitized_path = '/'.join(path_parts)
+        sanitized_url = urlunparse(parsed_url._replace(path=sanitized_path))
+        return sanitized_url
+    return url
+
+# Função para obter o host de uma URL http(s) (em minúsculas e sem a porta), ou None para URLs inválidas
+def url_host(url):
+    parsed_url = urlparse(url.strip())
+    if parsed_url.scheme not in ('http', 'https') or not parsed_url.netloc:
+        return None
+    try:
+        return parsed_url.hostname or None
+    except ValueError:
+        return None
+
+# Função para indicar se o host é o domínio `domain` ou um subdomínio dele (m.facebook.com, mas não notfacebook.com)
+def host_matches(host, domain):
+    return host == domain or host.endswith('.' + domain)
+
+# Adaptadores registrados: plataforma -> adaptador e domínio -> adaptador
+_adapters = {}
+_hosts = {}
+
+# Função para registrar um adaptador (substitui o adaptador anterior da mesma plataforma)
+def register_adapter(adapter):
+    previous = _adapters.get(adapter.platform)
+    if previous is not None:
+        for host in previous.hosts:
+            _hosts.pop(host, None)
+    _adapters[adapter.platform] = adapter
+    for host in adapter.hosts:
+        _hosts[host] = adapter
+    return adapter
+
+# Função para localizar o adaptador de uma URL pelo domínio registrado do host ou de um domínio acima dele
+# (business.facebook.com, gaming.youtube.com...), o mesmo critério de host_matches, com uma consulta à tabela por
+# sufixo do host. Retorna None para URLs inválidas ou de domínios não registrados
+def find_adapter(url):
+    host = url_host(url)
+    if host is None:
+        return None
+    labels = host.split('.')
+    for index in range(len(labels) - 1):
+        adapter = _hosts.get('.'.join(labels[index:]))
+        if adapter is not None:
+            return adapter
+    return None
+
+def get_adapter(platform):
+    return _adapters.get(platform)
+
+def all_adapters():
+    return list(_adapters.values())
+
+# Plataformas suportadas
+# Os padrões seguem os dos extratores do yt_dlp: uma URL que casa com o padrão é aceita pelo extrator indicado
+register_adapter(PlatformAdapter(
+    'youtube', 'Youtube', ('youtube.com', 'youtu.be'), 'downloads-Youtube',
+    patterns=(
+        (r'https?://(?:(?:www|m|music)\.)?youtube\.com/watch\?(?!(?:.*&)?list=)(?:.*&)?v=[\w-]{11}(?:[&#]|$)', 'Youtube'),
+        (r'https?://(?:(?:www|m|music)\.)?youtube\.com/(?:shorts|live|embed)/[\w-]{11}(?:[/?#]|$)(?!.*[?&]list=)', 'Youtube'),
+        (r'https?://youtu\.be/[\w-]{11}(?:[/?#]|$)(?!.*[?&]list=)', 'Youtube'),
+        (r'https?://(?:(?:www|m|music)\.)?youtube\.com/(?:playlist\?|@|channel/|c/|user/)', 'YoutubeTab'),
+    ),
+))
+register_adapter(PlatformAdapter(
+    'twitter', 'Twitter', ('twitter.com', 'x.com'), 'downloads-Twitter',
+    patterns=(
+        (r'https?://(?:(?:www|m(?:obile)?)\.)?(?:twitter|x)\.com/(?:(?:i/web|[^/]+)/status|statuses)/\d+', 'Twitter'),
+    ),
+    sanitize=sanitize_twitter_url,
+    ydl_options={'restrictfilenames': True, 'trim_file_name': 50},
+))
+register_adapter(PlatformAdapter(
+    'instagram', 'Instagram', ('instagram.com',), 'downloads-Instagram',
+    ytdl=False,  # Baixado pelo Instaloader
+))
+register_adapter(PlatformAdapter(
+    'facebook', 'Facebook', ('facebook.com', 'fb.com', 'fb.watch'), 'downloads-Facebook',
+    patterns=(
+        (r'https?://(?:[\w-]+\.)?facebook\.com/(?:[^/?#]+/videos/(?:[^/?#]+/)?\d+|(?:watch/?|video\.php)\?(?:.*&)?v=\d+)', 'Facebook'),
+    ),
+))
@@ -0,0 +1,206 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Índice (arquivo) das mídias já baixadas pelo Multi Downloader
+Cada mídia é indexada por extrator, ID do vídeo, formato e qualidade, com o caminho do arquivo, o tamanho e,
+opcionalmente, o hash SHA-256 do conteúdo. Um pedido repetido é resolvido sem acessar a rede: o ID é obtido
+da própria URL e o arquivo existente é reaproveitado. O índice pode ser reconstruído a partir das pastas de
+download, pois o nome dos arquivos contém o ID do vídeo (`mp4_720p_[ID]_título.mp4`, `mp3_[ID]_título.mp3`).
+Funções:
+    media_key(url):
+        Obtém (extrator, ID do vídeo) a partir da URL, sem acessar a rede.
+    file_sha256(path):
+        Calcula o hash SHA-256 de um arquivo.
+    shortcode_from_mediaid(mediaid):
+        Converte o ID numérico de um post do Instagram no shortcode usado nas URLs.
+Classes:
+    MediaArchive:
+        Acesso ao banco do índice, seguro para uso a partir de várias threads.
+"""
+
+# Importações nativas
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+# Importações locais
+from adapters import host_matches, url_host
+
+# Nome do extrator (o mesmo `extractor_key` do yt_dlp) de cada plataforma
+EXTRACTOR_KEYS = {
+    'youtube': 'Youtube',
+    'twitter': 'Twitter',
+    'facebook': 'Facebook',
+    'instagram': 'Instagram',
+}
+
+# Alfabeto dos shortcodes do Instagram (base 64 do ID numérico do post)
+SHORTCODE_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+# Padrões de URL com o ID do vídeo
+YOUTUBE_ID = re.compile(r'^[\w-]{11}$')
+YOUTUBE_PATH = re.compile(r'^/(?:shorts|embed|live|v)/([\w-]{11})')
+TWITTER_PATH = re.compile(r'/status(?:es)?/(\d+)')
+FACEBOOK_PATH = re.compile(r'/(?:videos|reel)/(?:[^/]+/)?(\d+)')
+INSTAGRAM_PATH = re.compile(r'^/(?:[\w.]+/)?(?:p|reel|reels|tv)/([\w-]+)')
+
+# Nomes dos arquivos baixados: formato, qualidade (ausente no mp3), ID do vídeo e título
+ARCHIVED_NAME = re.compile(r'^(mp4|mp3)_(?:(best|\d+p)_)?\[([^\]]+)\]_.*\.(?:mp4|mp3|webm|mkv|m4a|mov)$')
+# Nomes dos vídeos baixados pelo instaloader: '{usuário} - {ID numérico do post}.mp4'
+INSTAGRAM_NAME = re.compile(r'^.+ - (\d+)\.mp4$')
+# Arquivos intermediários do yt_dlp (formatos separados antes da junção)
+INTERMEDIATE_NAME = re.compile(r'\.f[\w-]+\.\w+$')
+
+# Função para obter (extrator, ID do vídeo) a partir da URL, ou None se a URL não tiver o ID
+def media_key(url):
+    host = url_host(url)
+    if host is None:
+        return None
+    parsed_url = urlparse(url.strip())
+    query = parse_qs(parsed_url.query)
+
+    # Mesmo critério de domínio do roteamento das URLs (adapters.py)
+    if host_matches(host, 'youtu.be'):
+        video_id = parsed_url.path.strip('/')
+        return ('Youtube', video_id) if YOUTUBE_ID.match(video_id) else None
+    if host_matches(host, 'youtube.com'):
+        if parsed_url.path == '/watch' and YOUTUBE_ID.match(query.get('v', [''])[0]):
+            return 'Youtube', query['v'][0]
+        match = YOUTUBE_PATH.match(parsed_url.path)
+        return ('Youtube', match.group(1)) if match else None
+    if host_matches(host, 'twitter.com') or host_matches(host, 'x.com'):
+        match = TWITTER_PATH.search(parsed_url.path)
+        return ('Twitter', match.group(1)) if match else None
+    if host_matches(host, 'facebook.com') or host_matches(host, 'fb.com'):
+        match = FACEBOOK_PATH.search(parsed_url.path)
+        if match:
+            return 'Facebook', match.group(1)
+        video_id = query.get('v', [''])[0]
+        return ('Facebook', video_id) if video_id.isdigit() else None
+    if host_matches(host, 'instagram.com'):
+        match = INSTAGRAM_PATH.match(parsed_url.path)
+        return ('Instagram', match.group(1)) if match else None
+    return None
+
+# Função para calcular o hash SHA-256 de um arquivo
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Função para converter o ID numérico de um post do Instagram no shortcode usado nas URLs
+def shortcode_from_mediaid(mediaid):
+    mediaid = int(mediaid)
+    shortcode = ''
+    while mediaid:
+        mediaid, remainder = divmod(mediaid, 64)
+        shortcode = SHORTCODE_ALPHABET[remainder] + shortcode
+    return shortcode or 'A'
+
+# Classe de acesso ao índice das mídias baixadas
+class MediaArchive:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS media (
+                    extractor TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    format TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER,
+                    sha256 TEXT,
+                    added_at REAL NOT NULL,
+                    PRIMARY KEY (extractor, video_id, format, quality)
+                )
+            """)
+
+    # O áudio em mp3 não depende da qualidade do vídeo escolhida
+    @staticmethod
+    def _quality_key(format_choice, quality):
+        return 'best' if format_choice == 'mp3' or not quality else quality
+
+    # Retorna o caminho do arquivo já baixado, ou None se não houver um arquivo válido
+    # Entradas cujo arquivo foi apagado ou alterado são removidas; com `verify`, o hash também é conferido
+    def lookup(self, extractor, video_id, format_choice, quality, verify=False):
+        key = (extractor, video_id, format_choice, self._quality_key(format_choice, quality))
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT path, size, sha256 FROM media WHERE extractor = ? AND video_id = ? AND format = ? AND quality = ?", key).fetchone()
+        if row is None:
+            return None
+        try:
+            valid = os.path.getsize(row['path']) == row['size'] if row['size'] is not None else os.path.isfile(row['path'])
+            if valid and verify and row['sha256']:
+                valid = file_sha256(row['path']) == row['sha256']
+        except OSError:
+            valid = False
+        if not valid:
+            self.remove(*key)
+            return None
+        return row['path']
+
+    # Registra um arquivo baixado (substitui a entrada anterior com a mesma chave)
+    def add(self, extractor, video_id, format_choice, quality, path, sha256=None):
+        size = os.path.getsize(path)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO media (extractor, video_id, format, quality, path, size, sha256, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (extractor, video_id, format_choice, self._quality_key(format_choice, quality), path, size, sha256, time.time()))
+
+    def remove(self, extractor, video_id, format_choice, quality):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM media WHERE extractor = ? AND video_id = ? AND format = ? AND quality = ?",
+                                     (extractor, video_id, format_choice, self._quality_key(format_choice, quality)))
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM media").fetchone()[0]
+
+    # Reconstrói o índice a partir das pastas de download (`directories`: plataforma -> pasta)
+    # Retorna o número de arquivos indexados; arquivos sem o ID no nome (baixados por versões antigas) são ignorados
+    def rebuild(self, directories, hash_files=False):
+        entries = []
+        for platform, directory in directories.items():
+            extractor = EXTRACTOR_KEYS[platform]
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue  # Pasta ainda não criada
+            for name in names:
+                path = os.path.join(directory, name)
+                if INTERMEDIATE_NAME.search(name) or not os.path.isfile(path):
+                    continue
+                match = ARCHIVED_NAME.match(name)
+                if match:
+                    format_choice, quality, video_id = match.groups()
+                elif platform == 'instagram' and INSTAGRAM_NAME.match(name):
+                    format_choice, quality, video_id = 'mp4', 'best', shortcode_from_mediaid(INSTAGRAM_NAME.match(name).group(1))
+                else:
+                    continue
+                entries.append((extractor, video_id, format_choice, self._quality_key(format_choice, quality), path,
+                                os.path.getsize(path), file_sha256(path) if hash_files else None, os.path.getmtime(path)))
+
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM media")
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO media (extractor, video_id, format, quality, path, size, sha256, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                entries)
+        return len(entries)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
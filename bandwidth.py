@@ -0,0 +1,221 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Controle de banda do Multi Downloader
+Um limite total e limites por grupo (plataforma) são divididos de forma justa entre os downloads ativos:
+cada download recebe uma cota (bytes/s), aplicada por um balde de fichas (token bucket) próprio, e as cotas
+são recalculadas sempre que um download começa ou termina ou que os limites são alterados. Um grupo limitado
+que não usa toda a sua parte do limite total libera a sobra para os demais downloads (divisão max-min).
+Funções:
+    parse_rate(text):
+        Converte um limite como '500K', '2M' ou '1.5MB' em bytes/s.
+    fair_shares(groups, total_rate, group_rates):
+        Calcula a cota de cada download a partir do número de downloads de cada grupo e dos limites.
+Classes:
+    TokenBucket:
+        Balde de fichas com taxa ajustável, que bloqueia quem consome mais do que a taxa permite.
+    BandwidthGovernor:
+        Mantém os limites e as cotas dos downloads ativos.
+    BandwidthLease:
+        Cota de um download: limita a leitura e mede a taxa real.
+    ThrottledStream:
+        Envolve uma resposta HTTP, limitando as leituras pela cota do download.
+"""
+
+# Importações nativas
+import itertools
+import threading
+import time
+
+# Capacidade do balde, em segundos de cota (permite pequenas rajadas sem ultrapassar a média)
+BURST_SECONDS = 0.5
+# Maior espera contínua (s) antes de verificar o cancelamento e a nova cota
+MAX_SLEEP = 0.25
+# Janela (s) da média móvel usada para medir a taxa real de cada download
+RATE_WINDOW = 2.0
+
+# Multiplicadores dos sufixos aceitos nos limites de banda
+RATE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# Função para converter um limite como '500K', '2M' ou '1.5MB' (por segundo) em bytes/s
+# Retorna None para textos vazios, '0' ou 'none' (sem limite)
+def parse_rate(text):
+    text = (text or '').strip().upper().removesuffix('/S').removesuffix('B').strip()
+    if text in ('', '0', 'NONE'):
+        return None
+    unit = text[-1] if text[-1] in RATE_UNITS else ''
+    number = float(text[:-1] if unit else text)
+    if number < 0:
+        raise ValueError(f"Limite de banda inválido: {text}")
+    return int(number * RATE_UNITS[unit]) or None
+
+# Função para calcular a cota de cada download (divisão max-min)
+# `groups`: download -> grupo; `group_rates`: grupo -> limite (bytes/s); `total_rate`: limite total ou None
+# Retorna download -> cota (bytes/s), ou None para downloads sem limite
+def fair_shares(groups, total_rate=None, group_rates=None):
+    group_rates = group_rates or {}
+    members = {}
+    for key, group in groups.items():
+        members.setdefault(group, []).append(key)
+    # Limite de cada download imposto apenas pelo seu grupo (a parte igual do limite do grupo)
+    caps = {key: group_rates[group] / len(members[group]) if group_rates.get(group) else None
+            for key, group in groups.items()}
+    if not total_rate:
+        return caps
+
+    shares = {}
+    remaining, pending = float(total_rate), len(caps)
+    # Preenche do menor limite para o maior: quem não alcança a parte igual libera a sobra aos demais
+    for key, cap in sorted(caps.items(), key=lambda item: float('inf') if item[1] is None else item[1]):
+        equal_share = remaining / pending
+        shares[key] = cap if cap is not None and cap < equal_share else equal_share
+        remaining -= shares[key]
+        pending -= 1
+    return shares
+
+# Classe do balde de fichas
+class TokenBucket:
+    def __init__(self, rate=None):
+        self._lock = threading.Lock()
+        self.rate = rate  # Bytes por segundo (None = sem limite)
+        self._tokens = 0.0
+        self._updated_at = time.monotonic()
+
+    # Altera a taxa; as fichas acumuladas são mantidas até a nova capacidade
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            if rate:
+                self._tokens = min(self._tokens, rate * BURST_SECONDS)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self._tokens + (now - self._updated_at) * self.rate, self.rate * BURST_SECONDS)
+        self._updated_at = now
+
+    # Consome `amount` fichas, aguardando o necessário; `check_cancelled` é chamada durante as esperas
+    def consume(self, amount, check_cancelled=None):
+        with self._lock:
+            self._refill()
+            self._tokens -= amount  # Pode ficar negativo: a dívida é paga com a espera abaixo
+        while True:
+            with self._lock:
+                self._refill()
+                if not self.rate or self._tokens >= 0:
+                    return
+                wait = -self._tokens / self.rate
+            if check_cancelled is not None:
+                check_cancelled()
+            time.sleep(min(wait, MAX_SLEEP))  # Espera em passos curtos: a taxa pode mudar no meio do caminho
+
+# Classe da cota de banda de um download
+class BandwidthLease:
+    def __init__(self, governor, key, group):
+        self.governor = governor
+        self.key = key
+        self.group = group
+        self.bucket = TokenBucket()
+        self.check_cancelled = None  # Chamada durante as esperas (cancelamento do download)
+        self._lock = threading.Lock()
+        self._window = []  # (instante, bytes) das leituras recentes
+
+    # Cota atual (bytes/s), ou None se o download não tiver limite
+    @property
+    def allotted(self):
+        return self.bucket.rate
+
+    # Taxa real (bytes/s) medida nos últimos RATE_WINDOW segundos
+    @property
+    def actual(self):
+        with self._lock:
+            now = time.monotonic()
+            self._window = [(at, size) for at, size in self._window if now - at <= RATE_WINDOW]
+            if not self._window:
+                return 0.0
+            return sum(size for _, size in self._window) / max(now - self._window[0][0], 1e-3)
+
+    # Registra `amount` bytes lidos e aguarda o necessário para respeitar a cota
+    def throttle(self, amount):
+        with self._lock:
+            self._window.append((time.monotonic(), amount))
+        self.bucket.consume(amount, self.check_cancelled)
+
+    # Devolve a cota (as demais são recalculadas)
+    def close(self):
+        self.governor.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Classe que mantém os limites de banda e as cotas dos downloads ativos
+class BandwidthGovernor:
+    def __init__(self, total_rate=None, group_rates=None):
+        self._lock = threading.Lock()
+        self.total_rate = total_rate
+        self.group_rates = dict(group_rates or {})
+        self._leases = {}
+        self._keys = itertools.count(1)
+
+    # Altera os limites em tempo de execução (None em group_rates remove o limite do grupo)
+    def set_limits(self, total_rate=..., group_rates=None):
+        with self._lock:
+            if total_rate is not ...:
+                self.total_rate = total_rate
+            for group, rate in (group_rates or {}).items():
+                if rate:
+                    self.group_rates[group] = rate
+                else:
+                    self.group_rates.pop(group, None)
+            self._rebalance()
+
+    # Cria a cota de um novo download do grupo informado
+    def acquire(self, group):
+        with self._lock:
+            lease = BandwidthLease(self, next(self._keys), group)
+            self._leases[lease.key] = lease
+            self._rebalance()
+        return lease
+
+    def release(self, lease):
+        with self._lock:
+            if self._leases.pop(lease.key, None) is not None:
+                self._rebalance()
+
+    # Cotas e taxas reais dos downloads ativos
+    def snapshot(self):
+        with self._lock:
+            leases = list(self._leases.values())
+        return [{'group': lease.group, 'allotted': lease.allotted, 'actual': lease.actual} for lease in leases]
+
+    def _rebalance(self):
+        shares = fair_shares({key: lease.group for key, lease in self._leases.items()}, self.total_rate, self.group_rates)
+        for key, lease in self._leases.items():
+            lease.bucket.set_rate(shares[key])
+
+# Classe que envolve uma resposta HTTP e limita as leituras pela cota do download
+# Os demais atributos (status, headers, url...) são repassados à resposta original
+class ThrottledStream:
+    def __init__(self, stream, lease):
+        self._stream = stream
+        self._lease = lease
+
+    def read(self, *args, **kwargs):
+        data = self._stream.read(*args, **kwargs)
+        if data:
+            self._lease.throttle(len(data))
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stream.close()
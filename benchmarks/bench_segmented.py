@@ -0,0 +1,67 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Benchmark do download segmentado
+Baixa um arquivo de um servidor local com velocidade limitada por conexão, passando pelo mesmo
+YoutubeDL usado pelo engine, com 1 conexão (comportamento anterior: HttpFD do yt_dlp) e com N conexões,
+e verifica que os arquivos baixados são idênticos ao original.
+Uso:
+    python -m benchmarks.bench_segmented [--size-mb 32] [--rate-mb 4] [--connections 1 2 4 8]
+"""
+
+# Importações nativas
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importações locais
+import ytdl
+from benchmarks.media_server import MediaServer
+
+# Função para baixar a URL com o número de conexões informado; retorna (segundos, sha256)
+def run_download(url, directory, connections):
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'noprogress': True,
+        'outtmpl': os.path.join(directory, f"{connections}.%(ext)s"),
+        'segmented_connections': connections,
+        'cachedir': False,
+    }
+    info = {'id': f"bench{connections}", 'title': 'bench', 'url': url, 'ext': 'mp4', 'extractor': 'generic', 'extractor_key': 'Generic'}
+    start = time.perf_counter()
+    with ytdl.YoutubeDL(ydl_opts) as ydl:
+        ydl.process_ie_result(info, download=True)
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(directory, f"{connections}.mp4"), 'rb') as f:
+        return elapsed, hashlib.sha256(f.read()).hexdigest()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do download segmentado")
+    parser.add_argument('--size-mb', type=int, default=32, help="tamanho do arquivo em MB")
+    parser.add_argument('--rate-mb', type=float, default=4, help="limite de velocidade por conexão em MB/s")
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    data = os.urandom(args.size_mb * 1024 * 1024)
+    expected = hashlib.sha256(data).hexdigest()
+    with MediaServer(per_connection_rate=args.rate_mb * 1024 * 1024) as server, tempfile.TemporaryDirectory() as directory:
+        url = server.add('/video.mp4', data, 'video/mp4')
+        baseline = None
+        for connections in args.connections:
+            elapsed, digest = run_download(url, directory, connections)
+            baseline = baseline or elapsed
+            print(f"{connections:>2} conexão(ões): {elapsed:6.2f} s  {args.size_mb / elapsed:7.2f} MB/s  "
+                  f"{baseline / elapsed:5.2f}x  {'idêntico' if digest == expected else 'DIFERENTE'}")
+            if digest != expected:
+                return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,331 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Conjunto de benchmarks offline do Multi Downloader
+Executa o engine completo (agendador, extração, seleção de formato, download segmentado/fragmentado, eventos)
+contra o servidor local com mídias sintéticas progressivas, DASH e HLS e extratores substitutos de cada
+plataforma (ver synthetic.py), sem acessar a rede. Mede:
+    - tempo de importação do engine em um processo novo (o código de saída é 1 se passar da meta
+      COLD_START_TARGET do engine);
+    - latência da URL ao primeiro byte, por tipo de mídia;
+    - vazão sustentada com 1, 4 e 16 downloads simultâneos;
+    - latência do laço de eventos da interface (EventBus esvaziado a cada UI_TICK_MS) durante os downloads;
+    - pico de memória (RSS) do processo;
+    - tempo de pós-processamento para mp3 e, com o mesmo áudio servido localmente, o download seguido da
+      conversão contra a conversão durante o download (apenas com o ffmpeg instalado).
+O resultado é gravado em JSON para acompanhar regressões; com --compare, as métricas são comparadas às de
+uma execução anterior e o código de saída é 1 se alguma piorar além da tolerância.
+Uso:
+    python -m benchmarks.bench_suite [--size-mb 8] [--rate-mb 8] [--concurrency 1 4 16] [-o resultado.json] [--compare base.json]
+Funções:
+    measure_cold_start(repeat):
+        Tempo de importação do engine em um processo Python novo.
+    measure_first_byte(server, args):
+        Latência da URL ao primeiro byte de cada tipo de mídia.
+    measure_throughput(media, concurrency):
+        Vazão e latência do laço de eventos com `concurrency` downloads simultâneos.
+    measure_postprocess(directory, args):
+        Tempo de conversão para mp3 pelo estágio de pós-processamento e pela transmissão ao ffmpeg.
+    find_regressions(baseline, current, tolerance):
+        Lista as métricas que pioraram em relação a uma execução anterior.
+    main(argv=None):
+        Executa os benchmarks e grava o resultado.
+"""
+
+# Importações nativas
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importações externas
+import yt_dlp
+
+# Importações locais
+import engine
+import postprocess
+import segmented
+from benchmarks import synthetic
+from benchmarks.media_server import MediaServer
+
+# Versão do formato do arquivo de resultado
+RESULT_VERSION = 1
+# Intervalo (ms) do laço de eventos simulado (o mesmo da interface gráfica)
+UI_TICK_MS = 100
+# Plataformas com extrator substituto
+PLATFORMS = ('youtube', 'twitter', 'facebook')
+
+# Métricas comparadas com --compare: caminho no resultado e se valores maiores são melhores
+TRACKED_METRICS = [
+    (('cold_start', 'median_ms'), False),
+    *((('first_byte', kind, 'median_ms'), False) for kind in synthetic.MEDIA_KINDS),
+    (('memory', 'peak_mb'), False),
+    (('postprocess', 'encode_seconds'), False),
+    (('postprocess', 'copy_seconds'), False),
+    (('postprocess', 'streamed_seconds'), False),
+]
+
+# Sequência dos IDs dos vídeos publicados (cada download usa um ID novo: sem reaproveitamento pelo índice)
+_video_ids = itertools.count(1)
+
+# Função para publicar no catálogo um novo vídeo com a mídia informada; retorna a URL da plataforma
+def new_video(platform_name, kind, media):
+    number = next(_video_ids)
+    video_id = f"bench{number:06d}" if platform_name == 'youtube' else str(10 ** 9 + number)
+    synthetic.CATALOG[(platform_name, video_id)] = (kind, media)
+    return synthetic.media_url(platform_name, video_id)
+
+# Função para substituir o agendador do engine por um com `workers` vagas em todas as plataformas
+def reset_scheduler(workers):
+    engine._scheduler = engine.JobScheduler(max_workers=workers, platform_limits={name: workers for name in PLATFORMS},
+                                            on_change=engine.on_job_change)
+
+# Função para obter o pico de memória (RSS) do processo em MB, ou None se não for possível medi-lo
+def peak_rss_mb():
+    try:
+        import resource  # Indisponível no Windows
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024, 1)  # bytes no macOS, KiB no Linux
+
+# Função para calcular percentis (em ms) de uma lista de durações em segundos
+def summarize_ms(samples):
+    if not samples:
+        return {'p50': None, 'p95': None, 'max': None}
+    ordered = sorted(samples)
+    return {
+        'p50': round(statistics.median(ordered) * 1000, 2),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        'max': round(ordered[-1] * 1000, 2),
+    }
+
+# Função para medir o tempo de importação do engine em processos Python novos (sem módulos já carregados)
+def measure_cold_start(repeat):
+    code = "import time; start = time.perf_counter(); import engine; print(time.perf_counter() - start)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = [float(subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stdout)
+               for _ in range(repeat)]
+    median_ms = round(statistics.median(samples) * 1000, 2)
+    return {'median_ms': median_ms, 'target_ms': engine.COLD_START_TARGET * 1000,
+            'within_target': median_ms <= engine.COLD_START_TARGET * 1000}
+
+# Função para medir a latência da URL ao primeiro byte de cada tipo de mídia
+# Cada download é executado sozinho; a latência vai da submissão ao primeiro progresso com bytes recebidos
+def measure_first_byte(server, args):
+    reset_scheduler(1)
+    first_progress = {}
+
+    def on_event(event, data):
+        if event == 'progress' and data['job'] is not None and data['percentage'] > 0:
+            first_progress.setdefault(data['job'].id, time.perf_counter())
+
+    engine.listeners.append(on_event)
+    results = {}
+    try:
+        for kind in synthetic.MEDIA_KINDS:
+            media = synthetic.add_media(server, kind, f"first-byte-{kind}", args.size_mb * 1024 * 1024, args.segments)
+            samples = []
+            for repetition in range(args.repeat):
+                url = new_video(PLATFORMS[repetition % len(PLATFORMS)], kind, media)
+                submitted_at = time.perf_counter()
+                job = engine.submit_download(url, 'mp4', 'best', notify=False)
+                while job.is_active():
+                    time.sleep(0.01)
+                if job.state == engine.JOB_DONE and job.id in first_progress:
+                    samples.append(first_progress[job.id] - submitted_at)
+            results[kind] = {
+                'median_ms': round(statistics.median(samples) * 1000, 2) if samples else None,
+                'samples_ms': [round(sample * 1000, 2) for sample in samples],
+                'failed': args.repeat - len(samples),
+            }
+    finally:
+        engine.listeners.remove(on_event)
+    return results
+
+# Função para medir a vazão com `concurrency` downloads simultâneos
+# A thread principal simula o laço da interface: a cada UI_TICK_MS esvazia o EventBus; a latência de cada
+# ciclo é o atraso em relação ao instante previsto somado ao tempo gasto com os eventos
+def measure_throughput(media, concurrency):
+    reset_scheduler(concurrency)
+    bus = engine.EventBus()
+    engine.listeners.append(bus.post)
+    tick_latencies = []
+    try:
+        started_at = time.perf_counter()
+        jobs = []
+        for index in range(concurrency):
+            kind = synthetic.MEDIA_KINDS[index % len(synthetic.MEDIA_KINDS)]
+            platform_name = PLATFORMS[(index // len(synthetic.MEDIA_KINDS)) % len(PLATFORMS)]
+            jobs.append(engine.submit_download(new_video(platform_name, kind, media[kind]), 'mp4', 'best', notify=False))
+
+        next_tick = time.perf_counter() + UI_TICK_MS / 1000
+        while any(job.is_active() for job in jobs):
+            time.sleep(max(next_tick - time.perf_counter(), 0))
+            tick_started_at = time.perf_counter()
+            bus.drain()
+            tick_latencies.append(time.perf_counter() - next_tick)
+            next_tick = max(next_tick + UI_TICK_MS / 1000, tick_started_at)
+        elapsed = time.perf_counter() - started_at
+    finally:
+        engine.listeners.remove(bus.post)
+
+    done = [job for job in jobs if job.state == engine.JOB_DONE]
+    downloaded = sum(os.path.getsize(job.result['path']) for job in done)
+    return {
+        'jobs': concurrency,
+        'failed': concurrency - len(done),
+        'seconds': round(elapsed, 3),
+        'mb_per_s': round(downloaded / 1024 ** 2 / elapsed, 2),
+        'ui_latency_ms': summarize_ms(tick_latencies),
+        'events': {'received': bus.received, 'delivered': bus.delivered},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+# Função para medir o tempo de conversão para mp3 pelo estágio de pós-processamento
+# O áudio de teste é gerado pelo próprio ffmpeg; sem o ffmpeg, a medição é ignorada
+def measure_postprocess(directory, args):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        return {'skipped': "ffmpeg não encontrado"}
+
+    source_path = os.path.join(directory, 'audio.m4a')
+    mp3_path = os.path.join(directory, 'audio.mp3')
+    subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f"sine=frequency=440:duration={args.audio_seconds}",
+                    '-c:a', 'aac', source_path], check=True)
+    stage = postprocess.PostProcessingStage(workers=1, ffmpeg=ffmpeg)
+
+    start = time.perf_counter()
+    stage.extract_audio(source_path, mp3_path, 'mp4a.40.2').result()  # Recodificação AAC -> mp3
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stage.extract_audio(mp3_path, os.path.join(directory, 'copy.mp3'), 'mp3').result()  # Cópia sem recodificação
+    copy_seconds = time.perf_counter() - start
+
+    # Download seguido da conversão contra a conversão durante o download (AAC em ADTS, lido sequencialmente)
+    stream_source = os.path.join(directory, 'stream.aac')
+    subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', f"sine=frequency=440:duration={args.audio_seconds}",
+                    '-c:a', 'aac', '-f', 'adts', stream_source], check=True)
+    with open(stream_source, 'rb') as f:
+        data = f.read()
+    with MediaServer(per_connection_rate=args.rate_mb * 1024 * 1024) as server:
+        open_range = segmented.urllib_opener(server.add('/audio.aac', data, 'audio/aac'))
+        staged_path = os.path.join(directory, 'staged.aac')
+
+        start = time.perf_counter()
+        segmented.download_ranges(open_range, staged_path, len(data), engine.SEGMENT_CONNECTIONS)
+        stage.extract_audio(staged_path, os.path.join(directory, 'staged.mp3'), 'mp4a.40.2').result()
+        staged_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encoder = postprocess.AudioStreamEncoder(os.path.join(directory, 'streamed.mp3'), 'mp4a.40.2', ffmpeg)
+        try:
+            segmented.stream_ranges(open_range, len(data), encoder.write, engine.SEGMENT_CONNECTIONS)
+            encoder.close()
+        except BaseException:
+            encoder.abort()
+            raise
+        streamed_seconds = time.perf_counter() - start
+
+    return {'audio_seconds': args.audio_seconds, 'encode_seconds': round(encode_seconds, 3), 'copy_seconds': round(copy_seconds, 3),
+            'audio_bytes': len(data), 'staged_seconds': round(staged_seconds, 3), 'streamed_seconds': round(streamed_seconds, 3)}
+
+# Função para obter um valor do resultado a partir do seu caminho, ou None se não existir
+def metric_value(result, path):
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result if isinstance(result, (int, float)) else None
+
+# Função para listar as métricas que pioraram mais que `tolerance` (fração) em relação a `baseline`
+def find_regressions(baseline, current, tolerance=0.2):
+    metrics = list(TRACKED_METRICS)
+    for concurrency in current.get('throughput', {}):
+        metrics += [(('throughput', concurrency, 'mb_per_s'), True), (('throughput', concurrency, 'ui_latency_ms', 'p95'), False)]
+
+    regressions = []
+    for path, higher_is_better in metrics:
+        before, after = metric_value(baseline, path), metric_value(current, path)
+        if not before or after is None:
+            continue  # Métrica ausente em uma das execuções
+        change = (after - before) / before
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{'.'.join(path)}: {before} -> {after} ({change:+.0%})")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks offline do Multi Downloader")
+    parser.add_argument('--size-mb', type=int, default=8, help="tamanho de cada mídia em MB")
+    parser.add_argument('--segments', type=int, default=8, help="segmentos das mídias DASH/HLS")
+    parser.add_argument('--rate-mb', type=float, default=8, help="limite de velocidade por conexão em MB/s (0 = sem limite)")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help="downloads simultâneos medidos")
+    parser.add_argument('--repeat', type=int, default=3, help="repetições das medições do primeiro byte e da importação do engine")
+    parser.add_argument('--audio-seconds', type=int, default=60, help="duração do áudio convertido para mp3")
+    parser.add_argument('-o', '--output', help="arquivo JSON do resultado (padrão: exibe no terminal)")
+    parser.add_argument('--compare', help="resultado anterior (JSON) para detectar regressões")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="piora tolerada nas comparações (padrão: 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    engine.load_ytdl = lambda: synthetic  # O engine passa a usar o YoutubeDL com os extratores substitutos
+    result = {
+        'version': RESULT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'yt_dlp': yt_dlp.version.__version__, 'cpus': os.cpu_count()},
+        'config': {'size_mb': args.size_mb, 'segments': args.segments, 'rate_mb': args.rate_mb,
+                   'connections': engine.SEGMENT_CONNECTIONS, 'ui_tick_ms': UI_TICK_MS},
+    }
+
+    result['cold_start'] = measure_cold_start(args.repeat)
+
+    working_dir = os.getcwd()
+    with MediaServer(per_connection_rate=args.rate_mb * 1024 * 1024 or None) as server, tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)  # Pastas de download, cache, diário e índice do engine ficam na pasta temporária
+        try:
+            media = {kind: synthetic.add_media(server, kind, f"throughput-{kind}", args.size_mb * 1024 * 1024, args.segments)
+                     for kind in synthetic.MEDIA_KINDS}
+            result['memory'] = {'baseline_mb': peak_rss_mb()}
+            result['first_byte'] = measure_first_byte(server, args)
+            result['throughput'] = {str(concurrency): measure_throughput(media, concurrency)
+                                    for concurrency in args.concurrency}
+            result['memory']['peak_mb'] = peak_rss_mb()
+            result['postprocess'] = measure_postprocess(directory, args)
+        finally:
+            os.chdir(working_dir)
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    failed = sum(entry['failed'] for entry in [*result['first_byte'].values(), *result['throughput'].values()])
+    if failed:
+        print(f"{failed} download(s) falharam durante os benchmarks.", file=sys.stderr)
+    cold_start = result['cold_start']
+    if not cold_start['within_target']:
+        print(f"Importação do engine em {cold_start['median_ms']} ms, acima da meta de {cold_start['target_ms']} ms.", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = find_regressions(json.load(f), result, args.tolerance)
+        for regression in regressions:
+            print(f"Regressão: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 1 if failed or not cold_start['within_target'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
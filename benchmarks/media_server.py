@@ -0,0 +1,120 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Servidor HTTP local para os benchmarks e testes do Multi Downloader
+Serve arquivos em memória com suporte a requisições Range e, opcionalmente, limita a velocidade
+de cada conexão (simulando a limitação por conexão aplicada pelos sites de vídeo).
+Uso:
+    with MediaServer(per_connection_rate=2 * 1024 * 1024) as server:
+        url = server.add('/video.mp4', dados)
+"""
+
+# Importações nativas
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tamanho de cada escrita na resposta
+WRITE_SIZE = 64 * 1024
+
+# Classe que trata as requisições do servidor local
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Sem logs no terminal durante os benchmarks
+
+    def do_HEAD(self):
+        self._send(head_only=True)
+
+    def do_GET(self):
+        self._send(head_only=False)
+
+    def _send(self, head_only):
+        server = self.server.media_server
+        server.count_request(self.path)
+        data = server.files.get(self.path.split('?')[0])
+        if data is None:
+            self.send_error(404)
+            return
+
+        start, end, status = 0, len(data) - 1, 200
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match and server.accept_ranges:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), end) if match.group(2) else end
+            if start > end:
+                self.send_error(416)
+                return
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', server.content_types.get(self.path, 'application/octet-stream'))
+        self.send_header('Content-Length', str(end - start + 1))
+        if server.accept_ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+        if head_only:
+            return
+
+        started_at = time.perf_counter()
+        sent = 0
+        try:
+            for offset in range(start, end + 1, WRITE_SIZE):
+                chunk = data[offset:min(offset + WRITE_SIZE, end + 1)]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if server.per_connection_rate:  # Limita a velocidade desta conexão
+                    delay = sent / server.per_connection_rate - (time.perf_counter() - started_at)
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # O cliente encerrou a conexão (por exemplo, download cancelado)
+
+# Classe do servidor local, executado em uma thread de fundo
+class MediaServer:
+    def __init__(self, per_connection_rate=None, accept_ranges=True):
+        self.per_connection_rate = per_connection_rate  # Bytes por segundo por conexão (None = sem limite)
+        self.accept_ranges = accept_ranges
+        self.files = {}
+        self.content_types = {}
+        self.requests = {}  # Caminho -> número de requisições recebidas
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), MediaRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.media_server = self
+        self._thread = None
+
+    # Adiciona um arquivo ao servidor e retorna a sua URL
+    def add(self, path, data, content_type='application/octet-stream'):
+        self.files[path] = data
+        self.content_types[path] = content_type
+        return self.url(path)
+
+    # Retorna a URL de um caminho do servidor
+    def url(self, path):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def count_request(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
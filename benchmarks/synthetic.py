@@ -0,0 +1,129 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Mídias sintéticas e extratores substitutos para os benchmarks offline
+As mídias são servidas pelo MediaServer local em três formas: arquivo progressivo (um único arquivo HTTP),
+DASH (manifesto .mpd com segmentos) e HLS (playlist .m3u8 com segmentos .ts). Os extratores substitutos
+reconhecem URLs do YouTube, Twitter e Facebook e retornam formatos que apontam para o servidor local, então o
+engine executa o caminho completo (extração, seleção de formato, download, progresso) sem acessar a rede.
+Funções:
+    add_media(server, kind, name, size, segments):
+        Publica uma mídia sintética no servidor e retorna a URL do arquivo ou do manifesto.
+    media_url(platform, video_id):
+        URL da plataforma (reconhecida pelo engine e pelo extrator substituto) para um vídeo do catálogo.
+Classes:
+    YoutubeIE, TwitterIE, FacebookIE:
+        Extratores substitutos de cada plataforma, que consultam o catálogo `CATALOG`.
+    YoutubeDL:
+        YoutubeDL do engine (ytdl.YoutubeDL) que usa apenas os extratores substitutos.
+"""
+
+# Importações nativas
+import os
+
+# Importações externas
+from yt_dlp.extractor.common import InfoExtractor
+
+# Importações locais
+import ytdl
+
+# Tipos de mídia sintética
+MEDIA_KINDS = ('progressive', 'dash', 'hls')
+
+# Catálogo dos vídeos publicados: (plataforma, ID do vídeo) -> (tipo de mídia, URL no servidor local)
+CATALOG = {}
+
+# Duração (s) atribuída a cada segmento nos manifestos DASH/HLS
+SEGMENT_DURATION = 2
+
+# Manifesto DASH estático com uma única representação (vídeo e áudio no mesmo arquivo, sem junção)
+MPD_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" mediaPresentationDuration="PT{duration}S" minBufferTime="PT2S" profiles="urn:mpeg:dash:profile:isoff-main:2011">
+  <Period>
+    <AdaptationSet mimeType="video/mp4" codecs="avc1.4d401f,mp4a.40.2">
+      <Representation id="720p" bandwidth="2000000" width="1280" height="720">
+        <SegmentList timescale="1" duration="{segment_duration}">
+          <Initialization sourceURL="init.mp4"/>
+{segments}
+        </SegmentList>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+# Função para publicar uma mídia sintética de `size` bytes no servidor
+# Mídias DASH/HLS são divididas em `segments` segmentos; retorna a URL do arquivo ou do manifesto
+def add_media(server, kind, name, size, segments=8):
+    if kind == 'progressive':
+        return server.add(f"/{name}/video.mp4", os.urandom(size), 'video/mp4')
+
+    segment_size = max(size // segments, 1)
+    if kind == 'dash':
+        server.add(f"/{name}/init.mp4", os.urandom(1024), 'video/mp4')
+        lines = []
+        for index in range(segments):
+            server.add(f"/{name}/seg-{index}.m4s", os.urandom(segment_size), 'video/iso.segment')
+            lines.append(f'          <SegmentURL media="seg-{index}.m4s"/>')
+        manifest = MPD_TEMPLATE.format(duration=segments * SEGMENT_DURATION, segment_duration=SEGMENT_DURATION,
+                                       segments='\n'.join(lines))
+        return server.add(f"/{name}/manifest.mpd", manifest.encode(), 'application/dash+xml')
+
+    if kind == 'hls':
+        lines = ['#EXTM3U', '#EXT-X-VERSION:3', f"#EXT-X-TARGETDURATION:{SEGMENT_DURATION}", '#EXT-X-MEDIA-SEQUENCE:0']
+        for index in range(segments):
+            server.add(f"/{name}/seg-{index}.ts", os.urandom(segment_size), 'video/mp2t')
+            lines += [f"#EXTINF:{SEGMENT_DURATION}.0,", f"seg-{index}.ts"]
+        lines.append('#EXT-X-ENDLIST')
+        return server.add(f"/{name}/playlist.m3u8", '\n'.join(lines).encode(), 'application/vnd.apple.mpegurl')
+
+    raise ValueError(f"Tipo de mídia desconhecido: {kind}")
+
+# Função para obter a URL da plataforma de um vídeo do catálogo
+def media_url(platform, video_id):
+    if platform == 'youtube':
+        return f"https://www.youtube.com/watch?v={video_id}"
+    if platform == 'twitter':
+        return f"https://twitter.com/i/status/{video_id}"
+    if platform == 'facebook':
+        return f"https://www.facebook.com/bench/videos/{video_id}/"
+    raise ValueError(f"Plataforma sem extrator substituto: {platform}")
+
+# Extrator substituto: consulta o catálogo em vez do site
+class BenchExtractor(InfoExtractor):
+    _ENABLED = False  # Não é listado entre os extratores padrão do yt_dlp
+    PLATFORM = None
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        kind, media = CATALOG[(self.PLATFORM, video_id)]
+        if kind == 'dash':
+            formats = self._extract_mpd_formats(media, video_id)
+        elif kind == 'hls':
+            formats = self._extract_m3u8_formats(media, video_id, 'mp4', 'm3u8_native')
+        else:
+            formats = [{'url': media, 'ext': 'mp4', 'format_id': 'progressive', 'height': 720,
+                        'vcodec': 'avc1.4d401f', 'acodec': 'mp4a.40.2'}]
+        return {'id': video_id, 'title': f"{self.PLATFORM} {kind} {video_id}", 'formats': formats}
+
+class YoutubeIE(BenchExtractor):
+    PLATFORM = 'youtube'
+    _VALID_URL = r'https://www\.youtube\.com/watch\?v=(?P<id>[\w-]{11})'
+
+class TwitterIE(BenchExtractor):
+    PLATFORM = 'twitter'
+    _VALID_URL = r'https://(?:twitter|x)\.com/[^/]+/status/(?P<id>\d+)'
+
+class FacebookIE(BenchExtractor):
+    PLATFORM = 'facebook'
+    _VALID_URL = r'https://www\.facebook\.com/[^/]+/videos/(?P<id>\d+)'
+
+# YoutubeDL do engine com apenas os extratores substitutos (os nomes das classes mantêm o `extractor_key` real)
+# Sem saída no terminal: o progresso continua chegando aos progress_hooks do engine
+# `auto_init` é ignorado (as instâncias criadas por YoutubeDL.fork passam por aqui)
+class YoutubeDL(ytdl.YoutubeDL):
+    def __init__(self, params=None, auto_init=False):
+        super().__init__({**(params or {}), 'quiet': True, 'noprogress': True, 'no_warnings': True}, auto_init=False)
+        for extractor in (YoutubeIE, TwitterIE, FacebookIE):
+            self.add_info_extractor(extractor())
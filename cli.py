@@ -0,0 +1,227 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Linha de comando do Multi Downloader
+Permite usar o engine sem interface gráfica (por exemplo, em servidores sem display).
+Uso:
+    python cli.py URL [URL ...] [-f mp4|mp3] [-q best|1080p|720p|...] [-i lista.txt] [-w 4] [-c 4] [-p 2] [-r 2M] [--retries 4] [--platform-rate youtube=1M]
+    python cli.py URL [URL ...] -o mp4:1080p,mp4:720p,mp3
+    python cli.py --qualities URL [URL ...]
+    python cli.py --resume
+    python cli.py --rebuild-archive
+    python cli.py --instagram-user USUÁRIO https://www.instagram.com/perfil/ [.../perfil/reels/] [.../perfil/highlights/]
+    python cli.py --watch-add URL [URL ...] [-f mp3] [--watch-interval 60] [--watch-backfill]
+    python cli.py --watch [--watch-forever] | --watch-list | --watch-remove URL [URL ...]
+Funções:
+    print_event(event, data):
+        Exibe no terminal os eventos emitidos pelo engine.
+    parse_platform_rate(value):
+        Interpreta um limite de banda por plataforma, como youtube=1M.
+    print_stage_stats(stages):
+        Exibe a fila e os tempos médios dos estágios de download e de pós-processamento.
+    print_phase_stats(summary):
+        Exibe o tempo médio de cada fase dos downloads (as medições completas ficam em cache/metrics.jsonl).
+    manage_watchlist(args):
+        Acompanha, lista ou deixa de acompanhar canais e playlists.
+    main(argv=None):
+        Interpreta os argumentos, executa os downloads como um lote e retorna o código de saída.
+"""
+
+# Importações nativas
+import argparse
+import getpass
+import os
+import sys
+import time
+
+# Importações locais
+import bandwidth
+import engine
+import renditions
+
+# Último percentual exibido de cada download (o progresso é exibido de 10 em 10%)
+printed_progress = {}
+
+# Função para exibir no terminal os eventos emitidos pelo engine
+def print_event(event, data):
+    if event == 'log':
+        print(data['message'], flush=True)
+    elif event == 'progress' and data['job'] is not None:
+        step = int(data['percentage'] // 10) * 10
+        if step > printed_progress.get(data['job'].id, -1):
+            printed_progress[data['job'].id] = step
+            rate = f" {engine.format_bytes(data['speed'])}/s" if data['speed'] else ""
+            if data.get('allotted'):
+                rate += f" (cota {engine.format_bytes(data['allotted'])}/s)"
+            print(f"[{data['job'].id}] {step}%{rate}", file=sys.stderr, flush=True)
+
+# Função para interpretar um limite de banda por plataforma ('youtube=1M')
+def parse_platform_rate(value):
+    platform, _, rate = value.partition('=')
+    if platform not in engine.PLATFORM_DIRS or not rate:
+        raise ValueError(f"limite por plataforma inválido: {value} (use, por exemplo, youtube=1M)")
+    return platform, bandwidth.parse_rate(rate)
+
+# Nomes dos estágios exibidos ao final da execução
+STAGE_NAMES = {'download': "Download", 'postprocess': "Pós-processamento"}
+
+# Função para exibir a fila e os tempos médios de cada estágio (para ajustar -w e -p separadamente)
+def print_stage_stats(stages):
+    for stage, stats in stages.items():
+        if stage == 'ytdl':
+            print(f"Instâncias do yt_dlp: {stats['created']} criada(s), {stats['reused']} download(s) com instância reaproveitada", file=sys.stderr)
+            continue
+        print(f"{STAGE_NAMES[stage]}: {stats['workers']} vaga(s), {stats['completed']} item(ns), "
+              f"espera média {stats['avg_wait']:.2f} s, tempo médio {stats['avg_time']:.2f} s", file=sys.stderr)
+
+# Nomes das fases dos downloads exibidos ao final da execução
+PHASE_NAMES = {
+    'queued': "fila",
+    'resolve': "resolução",
+    'extract': "extração",
+    'first_byte': "primeiro byte",
+    'transfer': "transferência",
+    'merge': "junção",
+    'postprocess': "pós-processamento",
+    'finalize': "finalização",
+}
+
+# Função para exibir o tempo médio de cada fase dos downloads (onde o tempo é gasto)
+def print_phase_stats(summary):
+    if not summary['jobs']:
+        return
+    phases = ', '.join(f"{PHASE_NAMES[phase]} {seconds:.2f} s" for phase, seconds in summary['phases'].items() if seconds)
+    print(f"Tempo médio por fase: {phases}; {summary['retries']} nova(s) tentativa(s).", file=sys.stderr)
+
+# Função para acompanhar, listar ou deixar de acompanhar canais e playlists; retorna o código de saída
+def manage_watchlist(args):
+    watchlist = engine.get_watchlist()
+    exit_code = 0
+    for url in args.urls if args.watch_add else []:
+        try:
+            engine.watch_source(url, args.format, args.quality, args.watch_interval * 60, args.watch_backfill)
+            print(f"Acompanhando {url} a cada {args.watch_interval:g} min.")
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            exit_code = 1
+    for url in args.urls if args.watch_remove else []:
+        if not watchlist.remove_source(url):
+            print(f"Fonte não acompanhada: {url}", file=sys.stderr)
+            exit_code = 1
+    if args.watch_list:
+        for source in watchlist.sources():
+            checked = time.strftime('%Y-%m-%d %H:%M', time.localtime(source['last_checked'])) if source['last_checked'] else "nunca"
+            status = f", erro: {source['last_error']}" if source['last_error'] else ""
+            print(f"{source['url']} ({source['format']}, {source['quality']}, a cada {source['interval'] / 60:g} min): "
+                  f"consultada {checked}, {source['new_items']} vídeo(s) novo(s){status}")
+    return exit_code
+
+# Função principal da linha de comando
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cli.py', description="Multi Downloader sem interface gráfica")
+    parser.add_argument('urls', nargs='*', help="URLs para baixar (playlists e canais do YouTube são expandidos)")
+    parser.add_argument('-i', '--input', help="arquivo de texto com uma URL por linha")
+    parser.add_argument('-f', '--format', choices=['mp4', 'mp3'], default='mp4', help="formato de saída (padrão: mp4)")
+    parser.add_argument('-q', '--quality', default='best', help="qualidade do vídeo, por exemplo 720p (padrão: best)")
+    parser.add_argument('-o', '--outputs', type=renditions.parse_outputs, default=None, metavar='VERSÕES',
+                        help="várias versões de cada URL em um único download, por exemplo mp4:1080p,mp4:720p,mp3 (ignora -f e -q)")
+    parser.add_argument('-w', '--workers', type=int, default=engine.MAX_WORKERS, help="número máximo de downloads simultâneos")
+    parser.add_argument('-c', '--connections', type=int, default=engine.SEGMENT_CONNECTIONS, help="conexões por arquivo (1 desativa o download segmentado)")
+    parser.add_argument('-p', '--postprocess-workers', type=int, default=None,
+                        help="conversões para mp3 simultâneas (padrão: uma por núcleo)")
+    parser.add_argument('--retries', type=int, default=engine.RETRY_ATTEMPTS,
+                        help="tentativas de cada download em falhas temporárias ou limitação de requisições (1 desativa as novas tentativas)")
+    parser.add_argument('--no-stream-audio', action='store_true',
+                        help="baixa o áudio inteiro antes de convertê-lo para mp3 (em vez de convertê-lo durante o download)")
+    parser.add_argument('--instagram-user', help="usa a sessão salva deste usuário do Instagram (pede a senha no primeiro uso)")
+    parser.add_argument('-r', '--limit-rate', type=bandwidth.parse_rate, default=None,
+                        help="limite total de banda, dividido entre os downloads ativos (ex.: 500K, 2M)")
+    parser.add_argument('--platform-rate', action='append', default=[], metavar='PLATAFORMA=LIMITE',
+                        help="limite de banda de uma plataforma, por exemplo youtube=1M (pode ser repetido)")
+    parser.add_argument('--qualities', action='store_true', help="apenas lista as qualidades disponíveis de cada URL")
+    parser.add_argument('--rebuild-archive', action='store_true', help="reconstrói o índice de downloads a partir das pastas de download")
+    parser.add_argument('--resume', action='store_true', help="retoma os downloads interrompidos registrados no diário")
+    parser.add_argument('--watch-add', action='store_true', help="acompanha os canais e playlists informados (com o formato e a qualidade escolhidos)")
+    parser.add_argument('--watch-remove', action='store_true', help="deixa de acompanhar os canais e playlists informados")
+    parser.add_argument('--watch-list', action='store_true', help="lista os canais e playlists acompanhados")
+    parser.add_argument('--watch-interval', type=float, default=60, help="intervalo entre as consultas de uma fonte, em minutos (padrão: 60)")
+    parser.add_argument('--watch-backfill', action='store_true', help="na primeira consulta, baixa também os vídeos já existentes")
+    parser.add_argument('--watch', action='store_true', help="consulta agora todas as fontes acompanhadas e baixa os vídeos novos")
+    parser.add_argument('--watch-forever', action='store_true', help="com --watch, continua consultando as fontes no intervalo de cada uma")
+    args = parser.parse_args(argv)
+
+    if args.watch_add or args.watch_remove or args.watch_list:
+        return manage_watchlist(args)
+
+    urls = list(args.urls)
+    if args.input:
+        urls.extend(url for url in engine.read_url_file(args.input) if url not in urls)
+    if args.rebuild_archive:
+        count = engine.get_archive().rebuild(engine.PLATFORM_DIRS, hash_files=engine.ARCHIVE_HASH)
+        print(f"{count} arquivo(s) indexado(s).")
+        if not urls and not args.resume:
+            return 0
+
+    if not urls and not args.resume and not args.watch:
+        parser.error("informe ao menos uma URL ou um arquivo com --input")
+
+    if args.qualities:
+        exit_code = 0
+        for url in urls:
+            try:
+                qualities = engine.get_video_qualities(url)
+                print(f"{url}: " + ', '.join(['best'] + [f"{q}p" for q in qualities]))
+            except Exception as e:
+                print(f"Erro ao obter qualidades do vídeo '{url}': {e}", file=sys.stderr)
+                exit_code = 1
+        return exit_code
+
+    engine.MAX_WORKERS = args.workers
+    engine.SEGMENT_CONNECTIONS = args.connections
+    engine.POSTPROCESS_WORKERS = args.postprocess_workers
+    engine.AUDIO_STREAMING = not args.no_stream_audio
+    engine.RETRY_ATTEMPTS = max(args.retries, 1)
+    try:
+        platform_rates = dict(parse_platform_rate(value) for value in args.platform_rate)
+    except ValueError as e:
+        parser.error(str(e))
+    engine.set_bandwidth_limits(total=args.limit_rate, per_platform=platform_rates)
+    if args.instagram_user:
+        engine.INSTAGRAM_SESSION_USER = args.instagram_user
+        if not os.path.exists(os.path.join(engine.INSTAGRAM_SESSION_DIR, f"session-{args.instagram_user}")):
+            engine.get_instagram_pool().login(args.instagram_user, getpass.getpass(f"Senha do Instagram ({args.instagram_user}): "))
+    engine.listeners.append(print_event)
+    resumed = engine.resume_unfinished_jobs() if args.resume else []
+    batch = engine.BatchRun(urls, args.format, args.quality, outputs=args.outputs)
+    watched = engine.sync_due_sources(force=True) if args.watch else []
+    next_check = time.time() + engine.WATCH_CHECK_INTERVAL
+    try:
+        while not batch.is_finished() or any(job.is_active() for job in resumed + watched) or args.watch_forever:
+            time.sleep(0.5)
+            if args.watch_forever and time.time() >= next_check:
+                watched = [job for job in watched if job.is_active()] + engine.sync_due_sources()
+                next_check = time.time() + engine.WATCH_CHECK_INTERVAL
+    except KeyboardInterrupt:
+        batch.cancel()
+        for job in resumed + watched:
+            engine.get_scheduler().cancel(job.id)
+        print("Downloads cancelados.", file=sys.stderr)
+        return 130
+
+    watched_failed = sum(1 for job in watched if job.state != engine.JOB_DONE)
+    if watched:
+        print(f"{len(watched) - watched_failed}/{len(watched)} vídeo(s) novo(s) das fontes acompanhadas baixado(s).")
+
+    resumed_failed = sum(1 for job in resumed if job.state != engine.JOB_DONE)
+    if resumed:
+        print(f"{len(resumed) - resumed_failed}/{len(resumed)} download(s) retomado(s) concluído(s).")
+    stats = batch.stats()
+    print(f"{stats['completed']}/{stats['total']} download(s) concluído(s), {engine.format_bytes(stats['downloaded_bytes'])} "
+          f"a {engine.format_bytes(stats['throughput'])}/s.")
+    print_stage_stats(engine.pipeline_stats())
+    print_phase_stats(engine.get_metrics().summary())
+    return 1 if stats['failed'] or stats['skipped'] or resumed_failed or watched_failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
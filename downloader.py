@@ -4,78 +4,139 @@
 """
 Aplicativo Multi Downloader
 Este script fornece uma interface gráfica de usuário (GUI) para baixar vídeos de várias plataformas, como YouTube, Instagram, Twitter e Facebook. 
-Ele utiliza as bibliotecas `yt_dlp` e `instaloader` para baixar conteúdo e `customtkinter` para a GUI.
+Toda a lógica de download fica no módulo `engine` (também usado pela linha de comando em `cli.py`), que utiliza
+as bibliotecas `yt_dlp` e `instaloader`; este script utiliza `customtkinter` para a GUI.
+A interface só é criada por main(), de modo que importar este módulo não abre nenhuma janela.
 Funções:
-    update_progress_bar(progress, value):
-        Atualiza a barra de progresso com o valor fornecido.
-    reset_progress_bar(progress, delay=3):
-        Reseta a barra de progresso para 0 após um atraso especificado.
+    create_job_row(job) / update_job_row(job, percentage, speed, eta, allotted):
+        Criam e atualizam a linha de progresso de cada download.
     log_message(message):
-        Adiciona uma mensagem à área de log na GUI.
-    sanitize_twitter_url(url):
-        Sanitiza uma URL do Twitter para garantir que esteja no formato correto para download.
-    download_youtube(url, format_choice):
-        Baixa um vídeo do YouTube no formato especificado (mp3 ou mp4).
-    download_instagram(url):
-        Baixa um post do Instagram.
-    download_twitter(url, format_choice):
-        Baixa um vídeo do Twitter no formato especificado (mp3 ou mp4).
-    download_facebook(url, format_choice):
-        Baixa um vídeo do Facebook no formato especificado (mp3 ou mp4).
+        Acumula uma mensagem para a área de log na GUI e a grava no histórico em disco.
+    flush_log_area():
+        Insere em lote as mensagens acumuladas, mantendo apenas as últimas LOG_MAX_LINES linhas no widget.
+    search_log():
+        Pesquisa o texto informado no histórico completo do log (arquivos rotativos) e exibe as linhas encontradas.
+    process_engine_events():
+        Aplica, a cada UI_TICK_MS, os eventos do engine acumulados no EventBus (progresso agrupado por download)
+        e as mensagens de log acumuladas.
+    on_url_change(*args):
+        Aguarda o usuário parar de digitar antes de consultar as qualidades da URL.
     download_file():
-        Determina a função de download apropriada a ser chamada com base na URL fornecida.
+        Submete ao agendador do engine o download da URL informada.
+    selected_outputs():
+        Versões pedidas com a opção MP4 + MP3 (vídeo e áudio baixados uma única vez).
+    cancel_downloads():
+        Cancela os downloads na fila e em execução.
+    apply_bandwidth_limit():
+        Aplica o limite total de banda informado, redistribuído entre os downloads ativos.
+    open_batch_window():
+        Abre a janela de download em lote.
+    parse_arguments(argv):
+        Lê as URLs, o formato e a qualidade informados na linha de comando.
+    main(argv):
+        Cria a interface gráfica, inicia o endpoint local da instância única e o loop de eventos.
+Instância única:
+    Com a janela já aberta, `python downloader.py URL [URL ...]` encaminha as URLs à instância em execução
+    (instance.py) e termina em milissegundos, sem carregar a interface; sem URLs, a janela aberta é trazida
+    para frente, e `--status` exibe os downloads da instância em execução.
 Configuração da GUI:
     A GUI é configurada usando a biblioteca `customtkinter`. Ela inclui:
         - Um rótulo de título
         - Um campo de entrada para a URL
         - Um botão de download
-        - Botões de rádio para selecionar o formato de download (mp3 ou mp4)
-        - Uma barra de progresso
-        - Uma área de log para exibir o histórico de downloads e mensagens
+        - Botões de rádio para selecionar o formato de download (mp3, mp4 ou os dois em um único download)
+        - Uma lista de downloads com uma barra de progresso, velocidade, cota de banda e tempo restante para cada um
+        - Uma área de log para exibir o histórico de downloads e mensagens, com pesquisa no histórico completo
 """
 
 # Importações nativas
+import argparse
+import json
 import os
+import queue
 import subprocess
-import threading
-import time
-from urllib.parse import urlparse, urlunparse
+import sys
+
+# Importações locais (o cliente da instância única é carregado antes da interface)
+import instance
+
+# Função para ler os argumentos da linha de comando: URLs a baixar, formato e qualidade
+def parse_arguments(argv):
+    parser = argparse.ArgumentParser(description="Multi Downloader (interface gráfica)")
+    parser.add_argument('urls', nargs='*', help="URLs a baixar (encaminhadas à janela já aberta, se houver)")
+    parser.add_argument('-f', '--format', choices=('mp4', 'mp3'), default='mp4', help="Formato do download")
+    parser.add_argument('-q', '--quality', default='best', help="Qualidade (best, 1080p, 720p...)")
+    parser.add_argument('--status', action='store_true', help="Exibe os downloads da janela aberta e termina")
+    return parser.parse_args(argv)
+
+# Com a interface já aberta em outra execução, apenas encaminha as URLs (ou a consulta de estado) e termina,
+# sem carregar a interface, o engine e as bibliotecas de download
+if __name__ == '__main__':
+    launch_args = parse_arguments(sys.argv[1:])
+    if launch_args.status:
+        response = instance.request('GET', '/jobs')
+        if response is None:
+            sys.exit("Nenhuma instância do Multi Downloader em execução.")
+        print(json.dumps(response[1], ensure_ascii=False, indent=2))
+        sys.exit(0)
+    forwarded = instance.forward(launch_args.urls, launch_args.format, launch_args.quality)
+    if forwarded is not None:
+        if 'error' in forwarded:
+            sys.exit(forwarded['error'])  # Pedido recusado pela instância em execução (por exemplo, qualidade inválida)
+        for url in forwarded.get('rejected', []):
+            print(f"URL não suportada: {url}", file=sys.stderr)
+        sys.exit(0)
 
 # Importações externas
 import customtkinter as ctk
-from tkinter import messagebox, StringVar
-import yt_dlp
-import instaloader
+from tkinter import filedialog, messagebox, StringVar
+
+# Importações locais
+from adapters import find_adapter
+from bandwidth import parse_rate
+from engine import (JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, BatchRun, EventBus,
+                    QualityProber, format_bytes, get_scheduler, listeners, parse_url_list,
+                    read_url_file, resume_unfinished_jobs, serve_instance, set_bandwidth_limits, start_watching,
+                    submit_download)
+from logview import LogHistory, LogRing
+from retry import describe_error
 
 # Conjunto para armazenar pastas que já foram abertas
 opened_directories = set()
 
-# Função para obter as qualidades disponíveis do vídeo
-def get_video_qualities(url):
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'skip_download': True,
-        }
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(url, download=False)
-            formats = info_dict.get('formats', [])
-            qualities = sorted(set(f['height'] for f in formats if f.get('height')))
-            return qualities
-    except Exception as e:
-            error_message = str(e)
-            if 'JSONDecodeError' in error_message:
-                log_message(f"Erro ao obter qualidades do vídeo: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")
-                messagebox.showerror("Erro", "Erro ao obter qualidades do vídeo: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")
-            else:
-                log_message(f"Erro ao obter qualidades do vídeo: {e}")
-                messagebox.showerror("Erro", f"Erro ao obter qualidades do vídeo: {e}")
-            return []
+# Intervalo (ms) sem digitação antes de consultar as qualidades da URL
+PROBE_DEBOUNCE_MS = 600
+# Intervalo (ms) entre verificações dos resultados das consultas na thread da interface
+PROBE_POLL_MS = 100
+# Intervalo (ms) entre as atualizações da interface com os eventos do engine
+UI_TICK_MS = 100
+# Tempo (ms) que a linha de um download terminado continua visível
+FINISHED_ROW_MS = 5000
+# Número máximo de linhas exibidas na área de log (as mais antigas continuam no histórico em disco)
+LOG_MAX_LINES = 1000
+# Arquivo do histórico completo do log (rotativo: LOG_MAX_LINES não limita o histórico)
+LOG_HISTORY_PATH = os.path.join('cache', 'logs', 'downloader.log')
+
+# Descrição de cada estado de download exibida nas linhas de progresso
+JOB_STATE_LABELS = {
+    JOB_QUEUED: "Na fila",
+    JOB_RUNNING: "Iniciando...",
+    JOB_DONE: "Concluído",
+    JOB_FAILED: "Falhou",
+    JOB_CANCELLED: "Cancelado",
+}
+
+# Fila dos eventos emitidos pelas threads do engine, esvaziada na thread da interface
+event_bus = EventBus()
+# Linhas de progresso de cada download (ID do download -> widgets)
+job_rows = {}
+# Mensagens de log acumuladas até o próximo ciclo da interface (buffer circular da área de log)
+log_ring = LogRing(LOG_MAX_LINES)
+# Histórico completo do log em disco (criado por main)
+log_history = None
 
 # Função para atualizar o OptionMenu com as qualidades disponíveis
-def update_quality_options(url):
-    qualities = get_video_qualities(url)
+def update_quality_options(qualities):
     if qualities:
         quality_options = ["best"] + [f"{q}p" for q in qualities]
         quality_menu.configure(values=quality_options)
@@ -84,24 +145,62 @@ def update_quality_options(url):
         quality_menu.configure(values=["best", "1080p", "720p", "480p", "360p"])
         quality_var.set("best")
 
+# Função para exibir erros ocorridos na consulta de qualidades
+# (falhas temporárias já foram repetidas pelo engine; a mensagem indica quando vale tentar mais tarde)
+def show_probe_error(e):
+    log_message(f"Erro ao obter qualidades do vídeo: {describe_error(e)}")
+    messagebox.showerror("Erro", f"Erro ao obter qualidades do vídeo: {describe_error(e)}")
+
+# Função para iniciar a consulta de qualidades após o intervalo de digitação
+def start_probe(url):
+    global probe_after_id
+    probe_after_id = None
+    if url == url_var.get():  # Ignora URLs que já foram alteradas
+        prober.request(url)
+
+# Função que aplica, na thread da interface, os resultados das consultas
+def poll_probe_results():
+    try:
+        while True:
+            generation, url, qualities, error = prober.results.get_nowait()
+            if not prober.is_current(generation) or url != url_var.get():
+                continue  # Resultado de uma URL que já foi substituída
+            if error is not None:
+                show_probe_error(error)
+            update_quality_options(qualities)
+    except queue.Empty:
+        pass
+    root.after(PROBE_POLL_MS, poll_probe_results)
+
 # Função para ser chamada quando a URL for alterada
 def on_url_change(*args):
+    global probe_after_id
     url = url_var.get()
-    if url:
-        update_quality_options(url) 
-        
-        # Verificar se a URL é do Instagram
-        parsed_url = urlparse(url)
-        if 'instagram.com' in parsed_url.netloc:
-            format_mp3.configure(state='disabled')
-            format_mp4.configure(state='disabled')
-            format_var.set('mp4')
-            quality_menu.configure(state='disabled')
-        else:
-            format_mp3.configure(state='normal')
-            format_mp4.configure(state='normal')
-            on_format_change()  # Chama a função para habilitar/desabilitar o OptionMenu com base no formato selecionado
-        
+
+    # Cancela a consulta agendada e descarta as que estiverem em andamento
+    if probe_after_id is not None:
+        root.after_cancel(probe_after_id)
+        probe_after_id = None
+    prober.cancel()
+
+    adapter = find_adapter(url)
+    if adapter is None:
+        return
+
+    # Plataformas fora do yt_dlp (Instagram) não têm escolha de formato e qualidade
+    if not adapter.ytdl:
+        format_mp3.configure(state='disabled')
+        format_mp4.configure(state='disabled')
+        format_both.configure(state='disabled')
+        format_var.set('mp4')
+        quality_menu.configure(state='disabled')
+    else:
+        format_mp3.configure(state='normal')
+        format_mp4.configure(state='normal')
+        format_both.configure(state='normal')
+        on_format_change()  # Chama a função para habilitar/desabilitar o OptionMenu com base no formato selecionado
+        probe_after_id = root.after(PROBE_DEBOUNCE_MS, start_probe, url)  # Consulta as qualidades apenas após o usuário parar de digitar
+
 # Função para habilitar/desabilitar o OptionMenu com base no formato selecionado
 def on_format_change(*args):
     format_choice = format_var.get()
@@ -110,380 +209,380 @@ def on_format_change(*args):
     else:
         quality_menu.configure(state='normal')
 
-# Função para atualizar a barra de progresso
-def update_progress_bar(progress, value):
-    progress.set(value / 100)  # Atualiza a barra de progresso com o valor fornecido
-    root.update_idletasks()  # Atualiza a interface gráfica
-
-# Função para resetar a barra de progresso após um atraso
-def reset_progress_bar(progress, delay=3):
-    time.sleep(delay)  # Espera pelo tempo especificado
-    progress.set(0)  # Reseta a barra de progresso para 0
-    root.update_idletasks()  # Atualiza a interface gráfica
-
-# Função para adicionar mensagens ao log
+# Função para obter as versões pedidas com a opção MP4 + MP3 (None para um único formato)
+# O vídeo e o áudio são baixados uma única vez e o mp3 é extraído do mesmo áudio usado no mp4
+def selected_outputs():
+    if format_var.get() != 'both':
+        return None
+    return [('mp4', quality_var.get()), ('mp3', 'best')]
+
+# Função para formatar um tempo restante em segundos
+def format_eta(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+# Função para criar a linha de progresso de um download
+def create_job_row(job):
+    frame = ctk.CTkFrame(jobs_frame, fg_color='transparent')
+    frame.pack(fill='x', padx=5, pady=2)
+    label = ctk.CTkLabel(frame, text=job.label[:45], anchor='w', width=300, text_color='white')
+    label.grid(row=0, column=0, padx=5)
+    bar = ctk.CTkProgressBar(frame, orientation='horizontal', width=120)
+    bar.grid(row=0, column=1, padx=5)
+    bar.set(0)
+    status = ctk.CTkLabel(frame, text=JOB_STATE_LABELS[job.state], anchor='w', width=110, text_color='gray70')
+    status.grid(row=0, column=2, padx=5)
+    cancel = ctk.CTkButton(frame, text="✕", width=28, fg_color='gray30', command=lambda: get_scheduler().cancel(job.id))
+    cancel.grid(row=0, column=3, padx=5)
+    job_rows[job.id] = {'frame': frame, 'label': label, 'bar': bar, 'status': status, 'cancel': cancel}
+
+# Função para atualizar a linha de progresso com o progresso, a velocidade e o tempo restante
+def update_job_row(job, percentage, speed=None, eta=None, allotted=None):
+    row = job_rows.get(job.id)
+    if row is None:
+        return
+    row['bar'].set(percentage / 100)  # Atualiza a barra de progresso com o valor fornecido
+    status = f"{percentage:.0f}%"
+    if speed:
+        status += f" {format_bytes(speed)}/s"
+    if allotted:
+        status += f" (cota {format_bytes(allotted)}/s)"  # Parte do limite de banda reservada a este download
+    if eta is not None:
+        status += f" {format_eta(eta)}"
+    row['status'].configure(text=status)
+
+# Função para atualizar a linha de um download que mudou de estado
+def update_job_state(job):
+    if job.id not in job_rows:
+        create_job_row(job)
+    row = job_rows[job.id]
+    row['status'].configure(text=JOB_STATE_LABELS[job.state])
+    if not job.is_active():
+        row['cancel'].configure(state='disabled')
+        if job.state == JOB_DONE:
+            row['bar'].set(1)
+            if job.result:
+                row['label'].configure(text=job.result['title'][:45])
+        root.after(FINISHED_ROW_MS, remove_job_row, job.id)  # Remove a linha após alguns segundos
+
+# Função para remover a linha de um download terminado
+def remove_job_row(job_id):
+    row = job_rows.pop(job_id, None)
+    if row is not None:
+        row['frame'].destroy()
+
+# Função para adicionar mensagens ao log (exibidas no próximo ciclo da interface)
 def log_message(message):
+    log_ring.add(message)
+    if log_history is not None:
+        log_history.write(message)  # Gravada no histórico por uma thread de fundo
+
+# Função para inserir em lote as mensagens acumuladas na área de log
+def flush_log_area():
+    batch = log_ring.take_batch()
+    if batch is None:
+        return
+    text, trim = batch
     log_area.configure(state='normal')  # Permite edição na área de log
-    log_area.insert(ctk.END, message + '\n')  # Insere a mensagem no final do log
+    log_area.insert(ctk.END, text)  # Insere as mensagens do ciclo de uma só vez
+    if trim:
+        log_area.delete('1.0', f"{trim + 1}.0")  # Remove as linhas mais antigas (limite de LOG_MAX_LINES)
     log_area.configure(state='disabled')  # Desabilita edição na área de log
     log_area.see(ctk.END)  # Rola a área de log para a última linha
-    
-# Função para sanitizar a URL do Twitter
-def sanitize_twitter_url(url):
-    parsed_url = urlparse(url)
-    path_parts = parsed_url.path.split('/')
-    if len(path_parts) > 2 and path_parts[1] != 'i':
-        path_parts[1] = 'i'
-        sanitized_path = '/'.join(path_parts)
-        sanitized_url = urlunparse(parsed_url._replace(path=sanitized_path))
-        return sanitized_url
-    return url
-    
-# Função para baixar vídeos do YouTube
-def download_youtube(url, format_choice):
-    try:
-        youtube_dir = os.path.join('downloads-Youtube')  # Define o diretório de download
-        os.makedirs(youtube_dir, exist_ok=True)  # Cria o diretório se não existir
-        
-        start_time = time.time()  # Marca o tempo de início do download
-        
-        # Função de callback para atualizar a barra de progresso
-        def progress_hook(d):
-            if d['status'] == 'downloading':  # Verifica se o status é 'downloading'
-                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')  # Obtém o total de bytes
-                if total_bytes:
-                    percentage = d['downloaded_bytes'] / total_bytes * 100  # Calcula a porcentagem de download
-                    update_progress_bar(progress, percentage)  # Atualiza a barra de progresso
-        
-        # Obter a qualidade selecionada
-        quality = quality_var.get()
-        format_string = f"bestvideo[height<={quality[:-1]}]+bestaudio/best" if quality != "best" else "bestvideo+bestaudio/best"
-        
-        # Ajustar o nome de saída dos arquivos conforme o formato escolhido
-        outtmpl = os.path.join(youtube_dir, f"{format_choice}_%(title)s.%(ext)s") if format_choice == 'mp3' else os.path.join(youtube_dir, f"{format_choice}_{quality}_%(title)s.%(ext)s")
-        
-        # Opções de configuração para o yt_dlp
-        ydl_opts = {
-            'outtmpl': outtmpl,  # Define o padrão de nome do arquivo de saída
-            'cachedir': False,
-            'format': 'bestaudio/best' if format_choice == 'mp3' else format_string, # Define o formato de download: 'bestaudio/best' para mp3, 'mp4' para mp4
-            'progress_hooks': [progress_hook], # Adiciona a função de callback para atualizar a barra de progresso durante o download
-            'postprocessors': [{ # Configurações para pós-processamento: extrai o áudio e converte para mp3 se o formato escolhido for mp3
-                'key': 'FFmpegExtractAudio', # Utiliza o FFmpeg para extrair o áudio
-                'preferredcodec': 'mp3', # Define o codec de áudio como mp3
-                'preferredquality': '192', # Define a qualidade do áudio como 192 kbps
-            }] if format_choice == 'mp3' else [],
-            'merge_output_format': 'mp4' if format_choice == 'mp4' else None  # Define o formato de saída como MP4 se o formato escolhido for MP4
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(url, download=True)  # Extrai informações e baixa o vídeo
-            video_title = info_dict.get('title', 'Vídeo')  # Obtém o título do vídeo
-            
-        end_time = time.time()  # Marca o tempo de término do download
-        elapsed_time = end_time - start_time  # Calcula o tempo decorrido
-        
-        if format_choice == 'mp3':
-            log_message(f"Áudio '{video_title}' do Youtube baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-            messagebox.showinfo("Sucesso", f"Download do áudio '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
-        else:
-            log_message(f"Vídeo '{video_title}' do Youtube em {quality} baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-            messagebox.showinfo("Sucesso", f"Download do vídeo '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
-            
-        threading.Thread(target=reset_progress_bar, args=(progress,)).start()  # Reseta a barra de progresso após alguns segundos
-    
-        # Verificar e abrir a pasta onde o arquivo foi salvo
-        if youtube_dir not in opened_directories:
-            subprocess.Popen(f'explorer "{os.path.abspath(youtube_dir)}"')
-            opened_directories.add(youtube_dir)
-    
-    except Exception as e:
-        error_message = str(e)
-        if 'JSONDecodeError' in error_message:
-            log_message(f"Erro ao baixar o vídeo do Youtube: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", "Erro ao baixar o vídeo do Youtube: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Mostra mensagem de erro
-        else:
-            log_message(f"Erro ao baixar o vídeo do Youtube: {e}")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", f"Erro ao baixar o vídeo do Youtube: {e}")  # Mostra mensagem de erro
-
-# Função para baixar posts do Instagram
-def download_instagram(url):
-    try:
-        instagram_dir = os.path.join('downloads-Instagram')  # Define o diretório de download
-        os.makedirs(instagram_dir, exist_ok=True)  # Cria o diretório se não existir
-        
-        start_time = time.time()  # Marca o tempo de início do download
-        
-        loader = instaloader.Instaloader(
-            download_pictures=False,  # Não baixa imagens
-            download_video_thumbnails=False,  # Não baixa miniaturas de vídeos
-            save_metadata=False,  # Não salva metadados
-            post_metadata_txt_pattern="",  # Não salva metadados em texto
-            filename_pattern='{owner_username} - {mediaid}'  # Define o padrão de nome do arquivo
-        )
-        shortcode = url.strip('/').split('/')[-1]  # Obtém o shortcode do URL
-        post = instaloader.Post.from_shortcode(loader.context, shortcode)  # Obtém o post a partir do shortcode
-        username = post.owner_username  # Obtém o nome de usuário do dono do post
-        
-        # Baixar o post diretamente para o diretório de saída
-        loader.download_post(post, target=instagram_dir)
-
-        # Atualizar a barra de progresso para 100% quando o download estiver completo
-        update_progress_bar(progress, 100)
-
-        end_time = time.time()  # Marca o tempo de término do download
-        elapsed_time = end_time - start_time  # Calcula o tempo decorrido
-        
-        log_message(f"Vídeo de '{username}' do Instagram baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-        messagebox.showinfo("Sucesso", "Download do vídeo do Instagram concluído com sucesso!")  # Mostra mensagem de sucesso
-        threading.Thread(target=reset_progress_bar, args=(progress,)).start()  # Reseta a barra de progresso após alguns segundos
-    
-        # Verificar e abrir a pasta onde o arquivo foi salvo
-        if instagram_dir not in opened_directories:
-            subprocess.Popen(f'explorer "{os.path.abspath(instagram_dir)}"')
-            opened_directories.add(instagram_dir)
-    
-    except Exception as e:
-        error_message = str(e)
-        if 'JSONDecodeError' in error_message:
-            log_message(f"Erro ao baixar o vídeo do Instagram: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", "Erro ao baixar o vídeo do Instagram: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Mostra mensagem de erro
-        else:
-            log_message(f"Erro ao baixar o vídeo do Instagram: {e}")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", f"Erro ao baixar o vídeo do Instagram: {e}")  # Mostra mensagem de erro
-
-# Função para baixar vídeos do Twitter
-def download_twitter(url, format_choice):
-    try:
-        twitter_dir = os.path.join('downloads-Twitter')  # Define o diretório de download
-        os.makedirs(twitter_dir, exist_ok=True)  # Cria o diretório se não existir
-
-        start_time = time.time()  # Marca o tempo de início do download
-        
-        # Função de callback para atualizar a barra de progresso
-        def progress_hook(d):
-            if d['status'] == 'downloading':  # Verifica se o status é 'downloading'
-                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')  # Obtém o total de bytes
-                if total_bytes:
-                    percentage = d['downloaded_bytes'] / total_bytes * 100  # Calcula a porcentagem de download
-                    update_progress_bar(progress, percentage)  # Atualiza a barra de progresso
-        
-        # Obter a qualidade selecionada
-        quality = quality_var.get()
-        format_string = f"bestvideo[height<={quality[:-1]}]+bestaudio/best" if quality != "best" else "bestvideo+bestaudio/best"
-
-        # Ajustar o nome de saída dos arquivos conforme o formato escolhido
-        outtmpl = os.path.join(twitter_dir, f"{format_choice}_%(title)s.%(ext)s") if format_choice == 'mp3' else os.path.join(twitter_dir, f"{format_choice}_{quality}_%(title)s.%(ext)s") # Define o padrão de nome do arquivo de saída, incluindo o sufixo do formato escolhido (mp3 ou mp4)
-
-        # Opções de configuração para o yt_dlp
-        ydl_opts = {
-            'outtmpl': outtmpl,  # Define o padrão de nome do arquivo de saída
-            'cachedir': False,
-            'format': 'bestaudio/best' if format_choice == 'mp3' else format_string, # Define o formato de download: 'bestaudio/best' para mp3, 'mp4' para mp4
-            'progress_hooks': [progress_hook], # Adiciona a função de callback para atualizar a barra de progresso durante o download
-            'postprocessors': [{ # Configurações para pós-processamento: extrai o áudio e converte para mp3 se o formato escolhido for mp3
-                'key': 'FFmpegExtractAudio', # Utiliza o FFmpeg para extrair o áudio
-                'preferredcodec': 'mp3', # Define o codec de áudio como mp3
-                'preferredquality': '192', # Define a qualidade do áudio como 192 kbps
-            }] if format_choice == 'mp3' else [],
-            'restrictfilenames': True,
-            'trim_file_name': 50,
-            'merge_output_format': 'mp4' if format_choice == 'mp4' else None  # Define o formato de saída como MP4 se o formato escolhido for MP4
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(url, download=True)  # Extrai informações e baixa o vídeo
-            video_title = info_dict.get('title', 'Vídeo')  # Obtém o título do vídeo
-            
-        end_time = time.time()  # Marca o tempo de término do download
-        elapsed_time = end_time - start_time  # Calcula o tempo decorrido
-        
-        if format_choice == 'mp3':
-            log_message(f"Áudio '{video_title}' do Twitter baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-            messagebox.showinfo("Sucesso", f"Download do áudio '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
-        else:
-            log_message(f"Vídeo '{video_title}' do Twitter em {quality} baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-            messagebox.showinfo("Sucesso", f"Download do vídeo '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
-            
-        threading.Thread(target=reset_progress_bar, args=(progress,)).start()  # Reseta a barra de progresso após alguns segundos
-    
-        # Verificar e abrir a pasta onde o arquivo foi salvo
-        if twitter_dir not in opened_directories:
-            subprocess.Popen(f'explorer "{os.path.abspath(twitter_dir)}"')
-            opened_directories.add(twitter_dir)
-    
-    except Exception as e:
-        error_message = str(e)
-        if 'JSONDecodeError' in error_message:
-            log_message(f"Erro ao baixar o vídeo do Twitter: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", "Erro ao baixar o vídeo do Twitter: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Mostra mensagem de erro
-        else:
-            log_message(f"Erro ao baixar o vídeo do Twitter: {e}")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", f"Erro ao baixar o vídeo do Twitter: {e}")  # Mostra mensagem de erro
 
-def download_facebook(url, format_choice):
-    try:
-        facebook_dir = os.path.join('downloads-Facebook')  # Define o diretório de download
-        os.makedirs(facebook_dir, exist_ok=True)  # Cria o diretório se não existir
-        
-        start_time = time.time()  # Marca o tempo de início do download
-        
-        # Função de callback para atualizar a barra de progresso
-        def progress_hook(d):
-            if d['status'] == 'downloading':  # Verifica se o status é 'downloading'
-                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')  # Obtém o total de bytes
-                if total_bytes:
-                    percentage = d['downloaded_bytes'] / total_bytes * 100  # Calcula a porcentagem de download
-                    update_progress_bar(progress, percentage)  # Atualiza a barra de progresso
-
-        # Obter a qualidade selecionada
-        quality = quality_var.get()
-        format_string = f"bestvideo[height<={quality[:-1]}]+bestaudio/best" if quality != "best" else "bestvideo+bestaudio/best"
-        
-        # Ajustar o nome de saída dos arquivos conforme o formato escolhido
-        outtmpl = os.path.join(facebook_dir, f"{format_choice}_%(title)s.%(ext)s") if format_choice == 'mp3' else os.path.join(facebook_dir, f"{format_choice}_{quality}_%(title)s.%(ext)s") # Define o padrão de nome do arquivo de saída, incluindo o sufixo do formato escolhido (mp3 ou mp4)
-        
-        # Opções de configuração para o yt_dlp
-        ydl_opts = {
-            'outtmpl': outtmpl,  # Define o padrão de nome do arquivo de saída
-            'cachedir': False,
-            'format': 'bestaudio/best' if format_choice == 'mp3' else format_string, # Define o formato de download: 'bestaudio/best' para mp3, 'mp4' para mp4
-            'progress_hooks': [progress_hook], # Adiciona a função de callback para atualizar a barra de progresso durante o download
-            'postprocessors': [{ # Configurações para pós-processamento: extrai o áudio e converte para mp3 se o formato escolhido for mp3
-                'key': 'FFmpegExtractAudio', # Utiliza o FFmpeg para extrair o áudio
-                'preferredcodec': 'mp3', # Define o codec de áudio como mp3
-                'preferredquality': '192', # Define a qualidade do áudio como 192 kbps
-            }] if format_choice == 'mp3' else [],
-            'merge_output_format': 'mp4' if format_choice == 'mp4' else None  # Define o formato de saída como MP4 se o formato escolhido for MP4
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(url, download=True)  # Extrai informações e baixa o vídeo
-            video_title = info_dict.get('title', 'Vídeo')  # Obtém o título do vídeo
-            
-        end_time = time.time()  # Marca o tempo de término do download
-        elapsed_time = end_time - start_time  # Calcula o tempo decorrido
-        
-        if format_choice == 'mp3':
-            log_message(f"Áudio '{video_title}' do Facebook baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-            messagebox.showinfo("Sucesso", f"Download do áudio '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
-        else:
-            log_message(f"Vídeo '{video_title}' do Facebook em {quality} baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
-            messagebox.showinfo("Sucesso", f"Download do vídeo '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
-            
-        threading.Thread(target=reset_progress_bar, args=(progress,)).start()  # Reseta a barra de progresso após alguns segundos
-    
-        # Verificar e abrir a pasta onde o arquivo foi salvo
-        if facebook_dir not in opened_directories:
-            subprocess.Popen(f'explorer "{os.path.abspath(facebook_dir)}"')
-            opened_directories.add(facebook_dir)
-    
-    except Exception as e:
-        error_message = str(e)
-        if 'JSONDecodeError' in error_message:
-            log_message(f"Erro ao baixar o vídeo do Facebook: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", "Erro ao baixar o vídeo do Facebook: Falha ao analisar JSON. Por favor, tente novamente mais tarde.")  # Mostra mensagem de erro
+# Função para pesquisar no histórico completo do log e exibir as linhas encontradas em uma janela
+def search_log(*args):
+    text = search_var.get().strip()
+    if not text:
+        return
+    matches, total = log_history.search(text)
+    window = ctk.CTkToplevel(root)
+    window.title(f"Histórico: {text}")
+    summary = f"{total} linha(s) encontrada(s)" + (f", exibindo as {len(matches)} mais recentes" if total > len(matches) else "")
+    ctk.CTkLabel(window, text=summary, text_color='white').grid(row=0, column=0, padx=10, pady=10)
+    results_box = ctk.CTkTextbox(window, height=300, width=700)
+    results_box.grid(row=1, column=0, padx=10, pady=10)
+    results_box.insert(ctk.END, '\n'.join(matches))
+    results_box.configure(state='disabled')
+
+# Função para abrir a pasta onde os arquivos foram salvos (apenas na primeira vez)
+def open_directory(directory):
+    if directory in opened_directories:
+        return
+    opened_directories.add(directory)
+    if os.name == 'nt':
+        subprocess.Popen(f'explorer "{os.path.abspath(directory)}"')
+    else:
+        subprocess.Popen(['xdg-open', os.path.abspath(directory)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+# Função que aplica, na thread da interface, um evento emitido pelo engine
+def handle_engine_event(event, data):
+    if event == 'log':
+        log_message(data['message'])
+    elif event == 'progress':
+        if data['job'] is not None:
+            update_job_row(data['job'], data['percentage'], data['speed'], data['eta'], data.get('allotted'))
+    elif event == 'job':
+        update_job_state(data['job'])
+    elif event == 'notify':
+        if data['kind'] == 'error':
+            messagebox.showerror(data['title'], data['message'])
         else:
-            log_message(f"Erro ao baixar o vídeo do Facebook: {e}")  # Adiciona mensagem de erro ao log
-            messagebox.showerror("Erro", f"Erro ao baixar o vídeo do Facebook: {e}")  # Mostra mensagem de erro
+            messagebox.showinfo(data['title'], data['message'])
+    elif event == 'saved':
+        try:
+            open_directory(data['directory'])  # Verificar e abrir a pasta onde o arquivo foi salvo
+        except OSError:
+            pass  # Sem gerenciador de arquivos disponível
+    elif event == 'focus':
+        # Downloads encaminhados por outra execução: traz a janela para frente
+        root.deiconify()
+        root.lift()
+        root.focus_force()
+
+# Função que esvazia periodicamente a fila de eventos do engine, na thread da interface
+def process_engine_events():
+    for event, data in event_bus.drain():
+        handle_engine_event(event, data)
+    flush_log_area()  # Mensagens do ciclo inseridas de uma só vez
+    root.after(UI_TICK_MS, process_engine_events)
 
 # Função para determinar qual método de download usar com base na URL
 def download_file():
     url = url_var.get()  # Obtém a URL do campo de entrada
-    parsed_url = urlparse(url)  # Faz o parsing da URL
-
-    # Reset progress bar
-    progress.set(0)  # Reseta a barra de progresso para 0
-
-    # Verifica a URL e chama a função de download correspondente
-    if 'youtube.com' in parsed_url.netloc or 'youtu.be' in parsed_url.netloc:
-        threading.Thread(target=download_youtube, args=(url, format_var.get())).start()
-    elif 'twitter.com' in parsed_url.netloc or 'x.com' in parsed_url.netloc:
-        sanitized_url = sanitize_twitter_url(url)
-        threading.Thread(target=download_twitter, args=(sanitized_url, format_var.get())).start()
-    elif 'instagram.com' in parsed_url.netloc:
-        threading.Thread(target=download_instagram, args=(url,)).start()
-    elif 'facebook.com' in parsed_url.netloc or 'fb.com' in parsed_url.netloc:
-        threading.Thread(target=download_facebook, args=(url, format_var.get())).start()
-    else:
+
+    # Verifica a URL e submete a função de download correspondente ao agendador
+    if submit_download(url, format_var.get(), quality_var.get(), outputs=selected_outputs()) is None:
         messagebox.showerror("Erro", "URL não suportada")  # Mostra mensagem de erro se a URL não for suportada
 
-# Configuração da interface do usuário (UI) do CustomTkinter
-ctk.set_appearance_mode("dark")  # Define o modo de aparência para escuro
-ctk.set_default_color_theme("dark-blue")  # Define o tema de cores para azul escuro
+# Lote em execução (apenas um lote por vez)
+current_batch = None
+
+# Função para iniciar um lote a partir do texto com as URLs
+def start_batch(text, window):
+    global current_batch
+    urls = parse_url_list(text)
+    if not urls:
+        messagebox.showerror("Erro", "Nenhuma URL informada", parent=window)
+        return
+    if current_batch is not None and not current_batch.is_finished():
+        messagebox.showerror("Erro", "Já existe um lote em andamento", parent=window)
+        return
+    current_batch = BatchRun(urls, format_var.get(), quality_var.get(), outputs=selected_outputs())
+    log_message(f"Lote iniciado com {len(urls)} URL(s).")
+    window.destroy()
+
+# Função para abrir a janela de download em lote
+def open_batch_window():
+    window = ctk.CTkToplevel(root)
+    window.title("Download em lote")
+    window.grab_set()
+
+    ctk.CTkLabel(window, text="Adicione uma URL por linha (playlists e canais do YouTube são expandidos)", text_color='white').grid(row=0, column=0, columnspan=2, padx=10, pady=10)
+    urls_box = ctk.CTkTextbox(window, height=250, width=500)
+    urls_box.grid(row=1, column=0, columnspan=2, padx=10, pady=10)
+
+    # Carregar as URLs de um arquivo de texto
+    def load_file():
+        path = filedialog.askopenfilename(parent=window, filetypes=[("Arquivos de texto", "*.txt"), ("Todos os arquivos", "*.*")])
+        if path:
+            urls_box.delete('1.0', ctk.END)
+            urls_box.insert(ctk.END, '\n'.join(read_url_file(path)))
+
+    ctk.CTkButton(window, text="Abrir arquivo...", command=load_file, fg_color='gray30').grid(row=2, column=0, padx=10, pady=10)
+    ctk.CTkButton(window, text="Iniciar lote", command=lambda: start_batch(urls_box.get('1.0', ctk.END), window)).grid(row=2, column=1, padx=10, pady=10)
+
+# Função para atualizar o status do lote (vazão e ETA agregados)
+def update_batch_status():
+    if current_batch is not None:
+        stats = current_batch.stats()
+        status = f"Lote: {stats['completed']}/{stats['total']} concluídos"
+        if stats['failed']:
+            status += f", {stats['failed']} com falha"
+        status += f" | {format_bytes(stats['downloaded_bytes'])} a {format_bytes(stats['throughput'])}/s"
+        if current_batch.is_finished():
+            status += " | Finalizado"
+        elif stats['eta'] is not None:
+            status += f" | ETA {format_eta(stats['eta'])}"
+        batch_status.configure(text=status)
+    root.after(1000, update_batch_status)
+
+# Função para cancelar os downloads na fila e em execução
+def cancel_downloads():
+    if current_batch is not None:
+        current_batch.cancel()  # Interrompe também a resolução dos itens restantes do lote
+    active_jobs = get_scheduler().active_jobs()
+    get_scheduler().cancel_all()
+    if active_jobs:
+        log_message(f"{len(active_jobs)} download(s) cancelado(s).")
+
+# Função para aplicar o limite total de banda informado (dividido entre os downloads ativos)
+def apply_bandwidth_limit(*args):
+    try:
+        rate = parse_rate(bandwidth_var.get())
+    except ValueError:
+        messagebox.showerror("Erro", "Limite de banda inválido. Use, por exemplo, 500K ou 2M.")
+        return
+    set_bandwidth_limits(total=rate)
+    log_message(f"Limite de banda: {format_bytes(rate) + '/s' if rate else 'sem limite'}.")
+
+# Função para criar a interface gráfica e iniciar o loop de eventos
+def main(argv=None):
+    global root, prober, probe_after_id, url_var, format_var, quality_var, quality_menu
+    global format_mp3, format_mp4, format_both, jobs_frame, log_area, batch_status, bandwidth_var, log_history, search_var
+
+    # Configuração da interface do usuário (UI) do CustomTkinter
+    ctk.set_appearance_mode("dark")  # Define o modo de aparência para escuro
+    ctk.set_default_color_theme("dark-blue")  # Define o tema de cores para azul escuro
+
+    root = ctk.CTk()  # Cria a janela principal
+    root.title("Multi Downloader")  # Define o título da janela
+    root.resizable(0,0) # Desabilita a maximização da janela
+
+    # Adicionar ícone
+    root.after(201, lambda :root.iconbitmap('assets/images/icon.ico'))
+
+    # Configurar cor de fundo
+    root.configure(bg='black')
+
+    # Consultas de qualidade em segundo plano
+    prober = QualityProber()
+    probe_after_id = None  # Identificador da consulta agendada pelo root.after
+
+    # Receber os eventos do engine na fila, consumida pela thread da interface
+    listeners.append(event_bus.post)
+
+    # Histórico completo do log em arquivos rotativos
+    log_history = LogHistory(LOG_HISTORY_PATH)
+
+    # Armazena URL e formato
+    url_var = ctk.StringVar()
+    format_var = StringVar(value='mp4')  # Variável para armazenar a escolha do formato
+
+    # Adicionar título
+    title_label = ctk.CTkLabel(root, text="Multi Downloader", font=('Helvetica', 16, 'bold'), text_color='cyan')
+    title_label.grid(row=0, column=0, columnspan=3, padx=10, pady=10)
 
-root = ctk.CTk()  # Cria a janela principal
-root.title("Multi Downloader")  # Define o título da janela
-root.resizable(0,0) # Desabilita a maximização da janela
+    # Adicionar um trace à variável url_var para chamar a função on_url_change sempre que a URL for alterada
+    url_var.trace_add('write', on_url_change)
 
-# Adicionar ícone
-root.after(201, lambda :root.iconbitmap('assets/images/icon.ico'))
+    # Adicionar um trace à variável format_var para chamar a função on_format_change sempre que o formato for alterado
+    format_var.trace_add('write', on_format_change)
 
-# Configurar cor de fundo
-root.configure(bg='black')
+    # Adicionar label para URL
+    url_label = ctk.CTkLabel(root, text="Adicione a URL no campo abaixo", text_color='white')
+    url_label.grid(row=1, column=0, columnspan=2, padx=10, pady=10)
 
-# Armazena URL e formato
-url_var = ctk.StringVar()
-format_var = StringVar(value='mp4')  # Variável para armazenar a escolha do formato
+    # Campo de entrada para URL
+    ctk.CTkEntry(root, textvariable=url_var, width=400).grid(row=2, column=0, columnspan=2, padx=10, pady=10)
 
-# Adicionar título
-title_label = ctk.CTkLabel(root, text="Multi Downloader", font=('Helvetica', 16, 'bold'), text_color='cyan')
-title_label.grid(row=0, column=0, columnspan=3, padx=10, pady=10)
+    # Botão para iniciar o download
+    ctk.CTkButton(root, text="Download", command=download_file).grid(row=2, column=2, padx=10, pady=10)
 
-# Adicionar um trace à variável url_var para chamar a função on_url_change sempre que a URL for alterada
-url_var.trace_add('write', on_url_change)
+    # Botão para cancelar os downloads em andamento
+    ctk.CTkButton(root, text="Cancelar", command=cancel_downloads, fg_color='gray30').grid(row=4, column=2, padx=10, pady=10)
 
-# Adicionar um trace à variável format_var para chamar a função on_format_change sempre que o formato for alterado
-format_var.trace_add('write', on_format_change)
+    # Botão para abrir a janela de download em lote
+    ctk.CTkButton(root, text="Lote...", command=open_batch_window, fg_color='gray30').grid(row=1, column=2, padx=10, pady=10)
 
-# Adicionar label para URL
-url_label = ctk.CTkLabel(root, text="Adicione a URL no campo abaixo", text_color='white')
-url_label.grid(row=1, column=0, columnspan=3, padx=10, pady=10)
+    # Adicionar opções de formato
+    format_label = ctk.CTkLabel(root, text="Formato:", text_color='white')
+    format_label.grid(row=3, column=0, padx=10, pady=10)
 
-# Campo de entrada para URL
-ctk.CTkEntry(root, textvariable=url_var, width=400).grid(row=2, column=0, columnspan=2, padx=10, pady=10)
+    format_mp4 = ctk.CTkRadioButton(root, text="MP4", variable=format_var, value='mp4')
+    format_mp4.grid(row=3, column=1, padx=10, pady=10, sticky='w')
 
-# Botão para iniciar o download
-ctk.CTkButton(root, text="Download", command=download_file).grid(row=2, column=2, padx=10, pady=10)
+    # MP4 e MP3 do mesmo vídeo em um único download
+    format_both = ctk.CTkRadioButton(root, text="MP4 + MP3", variable=format_var, value='both')
+    format_both.grid(row=3, column=1, padx=10, pady=10, sticky='e')
 
-# Adicionar opções de formato
-format_label = ctk.CTkLabel(root, text="Formato:", text_color='white')
-format_label.grid(row=3, column=0, padx=10, pady=10)
+    format_mp3 = ctk.CTkRadioButton(root, text="MP3", variable=format_var, value='mp3')
+    format_mp3.grid(row=3, column=2, padx=10, pady=10)
 
-format_mp4 = ctk.CTkRadioButton(root, text="MP4", variable=format_var, value='mp4')
-format_mp4.grid(row=3, column=1, padx=10, pady=10)
+    # Adicionar uma variável para a qualidade do vídeo
+    quality_var = StringVar(value="best")
 
-format_mp3 = ctk.CTkRadioButton(root, text="MP3", variable=format_var, value='mp3')
-format_mp3.grid(row=3, column=2, padx=10, pady=10)
+    # Adicionar um OptionMenu para selecionar a qualidade do vídeo
+    quality_label = ctk.CTkLabel(root, text="Qualidade do Vídeo:", text_color='white')
+    quality_label.grid(row=4, column=0, padx=10, pady=10)
 
-# Adicionar uma variável para a qualidade do vídeo
-quality_var = StringVar(value="best")
+    quality_options = ["best", "1080p", "720p", "480p", "360p"]
+    quality_menu = ctk.CTkOptionMenu(root, variable=quality_var, values=quality_options)
+    quality_menu.grid(row=4, column=1, columnspan=1, padx=10, pady=10)
 
-# Adicionar um OptionMenu para selecionar a qualidade do vídeo
-quality_label = ctk.CTkLabel(root, text="Qualidade do Vídeo:", text_color='white')
-quality_label.grid(row=4, column=0, padx=10, pady=10)
+    # Adicionar a lista de downloads, com uma linha de progresso para cada um
+    jobs_frame = ctk.CTkScrollableFrame(root, width=580, height=120, label_text="Downloads")
+    jobs_frame.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
 
-quality_options = ["best", "1080p", "720p", "480p", "360p"]
-quality_menu = ctk.CTkOptionMenu(root, variable=quality_var, values=quality_options)
-quality_menu.grid(row=4, column=1, columnspan=1, padx=10, pady=10)
+    # Adicionar label para área de log
+    log_label = ctk.CTkLabel(root, text="Histórico de Downloads:", text_color='white')
+    log_label.grid(row=6, column=0, padx=10, pady=10)
+
+    # Adicionar a pesquisa no histórico completo do log
+    search_var = StringVar(value="")
+    search_entry = ctk.CTkEntry(root, textvariable=search_var, placeholder_text="Pesquisar no histórico")
+    search_entry.grid(row=6, column=1, padx=10, pady=10)
+    search_entry.bind('<Return>', search_log)
+    ctk.CTkButton(root, text="Pesquisar", command=search_log, fg_color='gray30').grid(row=6, column=2, padx=10, pady=10)
+
+    # Adicionar status do lote em andamento
+    batch_status = ctk.CTkLabel(root, text="", text_color='gray70')
+    batch_status.grid(row=7, column=0, columnspan=3, padx=10, pady=0)
+
+    # Adicionar área de log
+    log_area = ctk.CTkTextbox(root, height=200, width=600, state='disabled', bg_color='black', text_color='white')
+    log_area.grid(row=8, column=0, columnspan=3, padx=10, pady=10)
+
+    # Adicionar scrollbar para a área de log
+    scrollbar = ctk.CTkScrollbar(root, orientation=ctk.VERTICAL, command=log_area.yview)
+    scrollbar.grid(row=8, column=3, sticky='ns')
+    log_area.configure(yscrollcommand=scrollbar.set)
+
+    # Adicionar o limite total de banda, alterável durante os downloads
+    bandwidth_var = StringVar(value="")
+    ctk.CTkLabel(root, text="Limite de banda (ex.: 2M):", text_color='white').grid(row=9, column=0, padx=10, pady=10)
+    bandwidth_entry = ctk.CTkEntry(root, textvariable=bandwidth_var, placeholder_text="sem limite")
+    bandwidth_entry.grid(row=9, column=1, padx=10, pady=10)
+    bandwidth_entry.bind('<Return>', apply_bandwidth_limit)
+    ctk.CTkButton(root, text="Aplicar", command=apply_bandwidth_limit, fg_color='gray30').grid(row=9, column=2, padx=10, pady=10)
+
+    # Aplicar os resultados das consultas de qualidade na thread da interface
+    root.after(PROBE_POLL_MS, poll_probe_results)
+
+    # Aplicar os eventos do engine na thread da interface
+    root.after(UI_TICK_MS, process_engine_events)
+
+    # Atualizar periodicamente o status do lote
+    root.after(1000, update_batch_status)
+
+    # Retomar os downloads interrompidos na última execução (registrados no diário)
+    resume_unfinished_jobs()
+
+    # Consultar periodicamente os canais e playlists acompanhados (cadastrados com python cli.py --watch-add)
+    start_watching()
+
+    # Receber downloads de outras execuções (instância única); o foco é aplicado na thread da interface
+    try:
+        instance_server = serve_instance(focus=lambda: event_bus.post('focus', {}))
+    except OSError as e:
+        instance_server = None
+        log_message(f"Não foi possível iniciar o endpoint local: {e}")
 
-# Adicionar barra de progresso
-progress = ctk.CTkProgressBar(root, orientation='horizontal', width=400)
-progress.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
-progress.set(0) # Iniciar a barra de progresso zerada
+    # Submeter as URLs informadas na linha de comando
+    launch_args = parse_arguments(sys.argv[1:] if argv is None else argv)
+    for url in launch_args.urls:
+        if submit_download(url, launch_args.format, launch_args.quality) is None:
+            log_message(f"URL não suportada: {url}")
 
-# Adicionar label para área de log
-log_label = ctk.CTkLabel(root, text="Histórico de Downloads:", text_color='white')
-log_label.grid(row=6, column=0, columnspan=3, padx=10, pady=10)
+    # Iniciar a interface gráfica
+    root.mainloop()
 
-# Adicionar área de log
-log_area = ctk.CTkTextbox(root, height=200, width=600, state='disabled', bg_color='black', text_color='white')
-log_area.grid(row=8, column=0, columnspan=3, padx=10, pady=10)
+    # Encerrar o endpoint local (a próxima execução passa a ser a instância principal)
+    if instance_server is not None:
+        instance_server.close()
 
-# Adicionar scrollbar para a área de log
-scrollbar = ctk.CTkScrollbar(root, orientation=ctk.VERTICAL, command=log_area.yview)
-scrollbar.grid(row=8, column=3, sticky='ns')
-log_area.configure(yscrollcommand=scrollbar.set)
+    # Gravar as mensagens restantes no histórico
+    log_history.close()
 
-# Iniciar a interface gráfica
-root.mainloop()
\ No newline at end of file
+if __name__ == '__main__':
+    main()
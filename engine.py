@@ -0,0 +1,1780 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Engine do Multi Downloader
+Este módulo contém toda a lógica de download, sem dependência da interface gráfica, e é usado
+tanto pela interface `customtkinter` (downloader.py) quanto pela linha de comando (cli.py).
+As bibliotecas `yt_dlp` (via `ytdl.py`) e `instaloader` só são importadas quando a plataforma correspondente é usada,
+o que mantém a importação deste módulo rápida (meta de COLD_START_TARGET segundos).
+Eventos:
+    As funções do engine não acessam a interface: elas emitem eventos, recebidos pelas funções
+    registradas em `listeners` como listener(evento, dados). Os eventos são:
+        'log' (message), 'progress' (job, percentage, speed, eta, allotted), 'notify' (kind, title, message),
+        'job' (job) a cada mudança de estado e 'saved' (job, directory) ao final de um download.
+Funções:
+    detect_platform(url) / resolve_ie_key(url):
+        Identificam a plataforma (youtube, twitter, instagram ou facebook) de uma URL válida pelo domínio do host e o
+        extrator do yt_dlp pelos padrões de URL pré-compilados de cada plataforma (adapters.py).
+    normalize_url(url):
+        Normaliza uma URL para uso como chave de cache.
+    InfoCache / get_info_cache():
+        Cache (TTL + LRU, opcionalmente persistido em disco) das informações extraídas pelo yt_dlp.
+    get_ytdl_pool():
+        Pool de instâncias do YoutubeDL por plataforma (ytdl.py), reaproveitadas entre os downloads com as
+        opções de cada download aplicadas sem recriar a instância, e cache em disco do yt_dlp em cache/yt-dlp.
+    resolve_info(url) / get_video_qualities(url):
+        Obtém as informações e as alturas de vídeo disponíveis para a URL, sem baixá-la.
+    get_retry_policy() / retry_call(job, func, description):
+        Repetem automaticamente, com espera exponencial e jitter, as etapas que falharam por instabilidade
+        da rede ou do site ou por limitação de requisições (retry.py); falhas permanentes não são repetidas.
+    EventBus:
+        Fila de eventos consumida periodicamente pela interface gráfica, com o progresso agrupado por download.
+    QualityProber:
+        Executa as consultas de qualidade em segundo plano, descartando consultas superadas.
+    JobScheduler / get_scheduler():
+        Executa os downloads em um conjunto limitado de threads, com prioridades, limites por plataforma e cancelamento.
+        Arquivos já baixados são reaproveitados imediatamente (JobScheduler.run_now), sem esperar na fila.
+    set_bandwidth_limits(total, per_platform) / acquire_bandwidth(job, platform):
+        Limite total e por plataforma de banda, divididos de forma justa entre os downloads ativos (bandwidth.py)
+        e ajustáveis em tempo de execução.
+    get_metrics() / mark_phase(job, phase):
+        Medições das fases de cada download (fila, resolução, extração, primeiro byte, transferência, junção,
+        pós-processamento e finalização), com bytes, vazão e novas tentativas, exportadas em JSON lines e no
+        formato de texto do Prometheus (metrics.py).
+    find_archived(url, format_choice, quality) / use_archived(url, path):
+        Localizam no índice de downloads (archive.py) um arquivo já baixado e o reaproveitam sem acessar a rede.
+    convert_audio(job, info_dict, source_path, finish, report_error) / pipeline_stats():
+        Convertem o áudio baixado para mp3 no estágio de pós-processamento (postprocess.py), fora da vaga
+        de download, e informam a fila e os tempos de cada estágio.
+    audio_streaming_available():
+        Indica se o mp3 pode ser gerado durante o download (AUDIO_STREAMING e ffmpeg instalado): o áudio é
+        entregue ao ffmpeg enquanto chega, sem arquivo intermediário.
+    download_media(platform, url, format_choice, quality):
+        Baixa um vídeo de uma plataforma suportada pelo yt_dlp, conforme o adaptador da plataforma, usando
+        diretamente o extrator correspondente.
+    download_renditions(platform, url, outputs):
+        Baixa várias versões de um vídeo (por exemplo, mp4 em 1080p e 720p e mp3) em um único download: cada fluxo
+        distinto é baixado uma vez e as versões são montadas localmente, cada uma com o seu nome (renditions.py).
+    download_youtube, download_instagram, download_twitter, download_facebook:
+        Baixam o conteúdo de cada plataforma (executadas pelo agendador). No Instagram, as instâncias do
+        Instaloader (sessão e limites de requisições) são reaproveitadas (instagram.py) e perfis, reels e
+        destaques são baixados em massa.
+    submit_download(url, format_choice, quality, outputs=None):
+        Submete ao agendador o download correspondente à plataforma da URL (ou o reaproveitamento do arquivo
+        já baixado, ou as várias versões pedidas em `outputs`) e o registra no diário.
+    resume_unfinished_jobs():
+        Retoma os downloads interrompidos registrados no diário (journal.py).
+    BatchRun:
+        Executa um lote de URLs (com playlists e canais expandidos) em pipeline, com vazão e ETA agregados.
+    watch_source(url) / sync_source(source) / start_watching():
+        Acompanham canais e playlists (watch.py): as listagens são consultadas periodicamente com extração "flat",
+        lidas apenas até os vídeos já vistos, e só os vídeos novos são submetidos ao agendador.
+    serve_instance(focus) / describe_job(job):
+        Endpoint HTTP local da instância única (instance.py): outras execuções submetem downloads e consultam o
+        estado dos downloads da instância em execução.
+"""
+
+# Importações nativas
+import copy
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Importações locais
+from adapters import all_adapters, find_adapter, get_adapter, sanitize_twitter_url
+
+# Meta de tempo (em segundos) para importar este módulo, acompanhada pelo benchmark (benchmarks/bench_suite.py)
+COLD_START_TARGET = 0.1
+
+# Protege a criação dos objetos compartilhados (cache e agendador)
+_singletons_lock = threading.Lock()
+
+# Número de conexões por arquivo: intervalos paralelos para formatos HTTP progressivos
+# e fragmentos simultâneos para formatos DASH/HLS
+SEGMENT_CONNECTIONS = 4
+
+# Importações tardias: as bibliotecas de extração só são carregadas quando a plataforma é usada
+def load_ytdl():
+    import ytdl  # Integração com o yt_dlp (importa o yt_dlp)
+    return ytdl
+
+def load_instaloader():
+    import instaloader
+    return instaloader
+
+# Funções que recebem os eventos do engine (a interface gráfica e a linha de comando registram as suas)
+listeners = []
+
+# Função para enviar um evento a todos os listeners
+def emit(event, **data):
+    for listener in list(listeners):
+        listener(event, data)
+
+# Função para adicionar mensagens ao log
+def log_message(message):
+    emit('log', message=message)
+
+# Função para informar o progresso (0 a 100), a velocidade (bytes/s) e o tempo restante (s) de um download
+# O progresso inclui a cota de banda do download (`allotted`, bytes/s ou None se não houver limite)
+def update_progress(job, percentage, speed=None, eta=None):
+    allotted = job.bandwidth.allotted if job is not None and job.bandwidth is not None else None
+    emit('progress', job=job, percentage=percentage, speed=speed, eta=eta, allotted=allotted)
+
+# Função para notificar o usuário sobre o resultado de um download ('info' ou 'error')
+def notify_user(kind, title, message):
+    emit('notify', kind=kind, title=title, message=message)
+
+# Classe que recebe os eventos das threads de download em uma fila, para serem consumidos
+# periodicamente por outra thread (a interface gráfica a esvazia a cada root.after)
+# Eventos de progresso de um mesmo download são agrupados: apenas o mais recente é entregue
+class EventBus:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.received = 0  # Total de eventos recebidos
+        self.delivered = 0  # Total de eventos entregues após o agrupamento
+
+    # Adiciona um evento à fila (pode ser registrado diretamente em `listeners`)
+    def post(self, event, data):
+        self._queue.put((event, data))
+
+    # Retira todos os eventos da fila, agrupando o progresso de cada download
+    def drain(self):
+        events = []
+        progress_index = {}  # ID do download -> posição do seu evento de progresso em `events`
+        while True:
+            try:
+                event, data = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self.received += 1
+            job = data.get('job')
+            if event == 'progress' and job is not None:
+                if job.id in progress_index:
+                    events[progress_index[job.id]] = (event, data)  # Mantém só o progresso mais recente
+                    continue
+                progress_index[job.id] = len(events)
+            elif event == 'job' and job is not None:
+                progress_index.pop(job.id, None)  # O progresso posterior à mudança de estado não é agrupado com o anterior
+            events.append((event, data))
+        self.delivered += len(events)
+        return events
+
+# Função para identificar a plataforma de uma URL (pelo domínio do host, na tabela dos adaptadores)
+def detect_platform(url):
+    adapter = find_adapter(url)
+    return adapter.platform if adapter else None
+
+# Função para obter o extrator do yt_dlp de uma URL, ou None se ele não puder ser identificado pela URL
+def resolve_ie_key(url):
+    adapter = find_adapter(url)
+    return adapter.resolve_ie_key(url) if adapter else None
+
+# Parâmetros de rastreamento removidos ao normalizar URLs
+TRACKING_PARAMS = {'si', 'feature', 'fbclid', 'igshid', 'ref_src', 's', 'pp'}
+
+# Função para normalizar uma URL, gerando a mesma chave para variações do mesmo vídeo
+def normalize_url(url):
+    parsed_url = urlparse(url.strip())
+    netloc = parsed_url.netloc.lower()
+    for prefix in ('www.', 'm.', 'mobile.'):
+        if netloc.startswith(prefix):
+            netloc = netloc[len(prefix):]
+    path = parsed_url.path.rstrip('/')
+    query = [(k, v) for k, v in parse_qsl(parsed_url.query) if k not in TRACKING_PARAMS and not k.startswith('utm_')]
+
+    if netloc == 'youtu.be' and path:  # Links curtos do YouTube
+        netloc, query, path = 'youtube.com', [('v', path.lstrip('/'))] + query, '/watch'
+    elif netloc in ('x.com', 'twitter.com'):  # Links do Twitter no mesmo formato de sanitize_twitter_url
+        netloc = 'twitter.com'
+        path = urlparse(sanitize_twitter_url(urlunparse(parsed_url._replace(path=path)))).path
+
+    return urlunparse(('https', netloc, path, '', urlencode(sorted(query)), ''))
+
+# Classe de cache das informações extraídas pelo yt_dlp
+# As entradas são indexadas pela URL normalizada e pelo ID do vídeo no extrator,
+# expiram após `ttl` segundos (as URLs dos formatos também expiram) e as menos usadas
+# são descartadas ao atingir `max_entries`. Se `path` for informado, o cache é salvo em disco.
+class InfoCache:
+    def __init__(self, ttl=1800, max_entries=32, path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # Chave do vídeo -> (instante de armazenamento, info)
+        self._aliases = {}  # URL normalizada -> chave do vídeo
+        self._load()
+
+    # Função para gerar a chave do vídeo a partir do extrator e do ID
+    @staticmethod
+    def video_key(info):
+        if info.get('extractor_key') and info.get('id'):
+            return f"{info['extractor_key']}:{info['id']}"
+        return None
+
+    # Obtém as informações em cache para uma URL, ou None se não houver entrada válida
+    def get(self, url):
+        with self._lock:
+            return self._get(self._aliases.get(normalize_url(url)))
+
+    # Obtém as informações em cache pelo extrator e ID do vídeo
+    def get_by_id(self, extractor_key, video_id):
+        with self._lock:
+            return self._get(f"{extractor_key}:{video_id}")
+
+    # Armazena as informações extraídas para a URL
+    def put(self, url, info):
+        key = self.video_key(info) or normalize_url(url)
+        with self._lock:
+            self._entries[key] = (time.time(), info)
+            self._entries.move_to_end(key)
+            self._aliases[normalize_url(url)] = key
+            if info.get('webpage_url'):
+                self._aliases[normalize_url(info['webpage_url'])] = key
+            while len(self._entries) > self.max_entries:  # Descarta as entradas menos usadas
+                self._entries.popitem(last=False)
+            self._prune_aliases()
+            self._save()
+
+    # Remove a entrada associada à URL (por exemplo, quando as URLs dos formatos expiraram)
+    def invalidate(self, url):
+        with self._lock:
+            key = self._aliases.pop(normalize_url(url), None)
+            if key is not None:
+                self._entries.pop(key, None)
+                self._prune_aliases()
+                self._save()
+
+    def _get(self, key):
+        if key is None or key not in self._entries:
+            return None
+        stored_at, info = self._entries[key]
+        if time.time() - stored_at > self.ttl:  # Entrada expirada
+            del self._entries[key]
+            self._prune_aliases()
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(info)  # O yt_dlp modifica o dicionário durante o download
+
+    def _prune_aliases(self):
+        self._aliases = {alias: key for alias, key in self._aliases.items() if key in self._entries}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            for key, stored_at, info in data.get('entries', []):
+                if now - stored_at <= self.ttl:
+                    self._entries[key] = (stored_at, info)
+            self._aliases = data.get('aliases', {})
+            self._prune_aliases()
+        except (OSError, ValueError):
+            self._entries.clear()  # Cache corrompido: começa vazio
+            self._aliases = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            data = {
+                'entries': [[key, stored_at, info] for key, (stored_at, info) in self._entries.items()],
+                'aliases': self._aliases,
+            }
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)  # Substituição atômica do arquivo
+        except (OSError, TypeError, ValueError):
+            pass  # A persistência é opcional: falhas não impedem o uso do cache em memória
+
+# Cache compartilhado entre a consulta de qualidades e os downloads (criado no primeiro uso)
+INFO_CACHE_PATH = os.path.join('cache', 'info_cache.json')
+_info_cache = None
+
+# Função para obter o cache compartilhado
+def get_info_cache():
+    global _info_cache
+    with _singletons_lock:
+        if _info_cache is None:
+            _info_cache = InfoCache(path=INFO_CACHE_PATH)
+        return _info_cache
+
+# Pasta do cache em disco do yt_dlp (no YouTube, as funções de assinatura extraídas do player)
+YTDL_CACHE_DIR = os.path.join('cache', 'yt-dlp')
+_ytdl_pool = None
+
+# Função para obter o pool de instâncias do YoutubeDL (criado no primeiro uso)
+# As instâncias são mantidas entre os downloads de cada plataforma, com o cache em disco persistente
+def get_ytdl_pool():
+    global _ytdl_pool
+    with _singletons_lock:
+        if _ytdl_pool is None:
+            from ytdl import YoutubeDLPool  # Importação tardia (carrega o yt_dlp)
+            _ytdl_pool = YoutubeDLPool(lambda params: load_ytdl().YoutubeDL(params), {'cachedir': YTDL_CACHE_DIR})
+        return _ytdl_pool
+
+# Função para extrair as informações de uma URL usando o cache compartilhado
+# Com `ie_key`, o yt_dlp usa diretamente o extrator indicado, sem testar a URL contra todos os extratores
+def extract_info_cached(ydl, url, download, ie_key=None):
+    info_dict = get_info_cache().get(url)
+    if info_dict is None:
+        return ydl.extract_info(url, download=download, ie_key=ie_key)
+    if not download:
+        return info_dict
+    try:
+        return ydl.process_ie_result(info_dict, download=True)  # Reaproveita as informações já extraídas
+    except JobCancelled:
+        raise
+    except Exception:
+        get_info_cache().invalidate(url)  # URLs dos formatos podem ter expirado: extrai novamente
+        return ydl.extract_info(url, download=True, ie_key=ie_key)
+
+# Função para obter as informações de um vídeo sem baixá-lo, usando o cache compartilhado
+def resolve_info(url):
+    info_dict = get_info_cache().get(url)
+    if info_dict is None:
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+        }
+        with get_ytdl_pool().lease(detect_platform(url), ydl_opts) as ydl:
+            info_dict = ydl.sanitize_info(ydl.extract_info(url, download=False, ie_key=resolve_ie_key(url)), remove_private_keys=True)
+        get_info_cache().put(url, info_dict)
+    return info_dict
+
+# Função para obter as qualidades disponíveis do vídeo (pode lançar exceções)
+# Falhas temporárias são repetidas uma vez (a consulta é interativa: o usuário aguarda o resultado)
+def get_video_qualities(url):
+    from retry import RetryPolicy
+    policy = RetryPolicy(max_attempts=PROBE_RETRY_ATTEMPTS)
+    formats = retry_call(None, lambda: resolve_info(url), "Consulta de qualidades", policy=policy).get('formats', [])
+    qualities = sorted(set(f['height'] for f in formats if f.get('height')))
+    return qualities
+
+# Classe que executa as consultas de qualidade em uma thread de fundo
+# Apenas a consulta mais recente é mantida: pedidos ainda não iniciados são substituídos
+# e resultados de consultas superadas são descartados
+class QualityProber:
+    def __init__(self):
+        self.results = queue.Queue()  # Resultados entregues à thread da interface
+        self._lock = threading.Lock()
+        self._generation = 0  # Identifica a consulta mais recente
+        self._pending = None  # Próxima consulta a ser executada (geração, URL)
+        self._wakeup = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    # Agenda uma nova consulta, invalidando todas as anteriores
+    def request(self, url):
+        with self._lock:
+            self._generation += 1
+            self._pending = (self._generation, url)
+        self._wakeup.set()
+
+    # Invalida a consulta pendente e a que estiver em andamento
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self._pending = None
+
+    # Verifica se a geração informada ainda corresponde à consulta mais recente
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                self._wakeup.clear()
+                pending, self._pending = self._pending, None
+            if pending is None:
+                continue
+            generation, url = pending
+            try:
+                qualities, error = get_video_qualities(url), None
+            except Exception as e:
+                qualities, error = [], e
+            if self.is_current(generation):  # Descarta resultados de consultas superadas
+                self.results.put((generation, url, qualities, error))
+
+# Número máximo de downloads simultâneos e limite por plataforma
+MAX_WORKERS = 4
+PLATFORM_LIMITS = {'youtube': 2, 'twitter': 2, 'facebook': 2, 'instagram': 1}
+
+# Estados possíveis de um download
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# Exceção lançada dentro de um download quando o usuário o cancela
+class JobCancelled(Exception):
+    pass
+
+# Classe que representa um download submetido ao agendador
+class Job:
+    def __init__(self, job_id, platform, target, args, kwargs, priority, label=None, journal_id=None, lock=None):
+        self.id = job_id
+        self.label = label or f"Download {job_id}"  # Descrição exibida ao usuário
+        self.platform = platform
+        self.target = target  # Função de download executada pelo agendador
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.state = JOB_QUEUED
+        self.submitted_at = time.perf_counter()
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.journal_id = journal_id  # ID do registro no diário de downloads
+        self.bandwidth = None  # Cota de banda do download (BandwidthLease), definida durante a transferência
+        self.metrics = None  # Medições das fases do download (metrics.JobMetrics), criadas quando ele sai da fila
+        self._journal_saved_at = 0  # Instante da última gravação do progresso no diário
+        self.downloaded_bytes = 0  # Bytes baixados por este download (todos os arquivos)
+        self._finished_bytes = 0  # Bytes dos arquivos já concluídos (vídeo e áudio são baixados separadamente)
+        self._done_callbacks = []
+        self._lock = lock or threading.RLock()  # Protege o estado e as funções registradas (a trava do agendador)
+
+    # Atualiza os bytes baixados a partir de um dicionário de progresso do yt_dlp
+    def update_bytes(self, d):
+        if d['status'] == 'downloading':
+            self.downloaded_bytes = self._finished_bytes + (d.get('downloaded_bytes') or 0)
+        elif d['status'] == 'finished':
+            self._finished_bytes += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+            self.downloaded_bytes = self._finished_bytes
+
+    # Registra uma função chamada com o Job quando o download terminar (com sucesso ou não)
+    # A verificação e o registro são feitos com a trava do agendador: um download que termina nesse intervalo
+    # ainda chama a função (ver JobScheduler._finish)
+    def add_done_callback(self, callback):
+        with self._lock:
+            if self.is_active():
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+
+    # Lança JobCancelled se o download tiver sido cancelado (chamada pelas funções de download)
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Download {self.id} cancelado")
+
+    # Indica se o download ainda não terminou
+    def is_active(self):
+        return self.state in (JOB_QUEUED, JOB_RUNNING)
+
+# Classe que agenda os downloads em um conjunto limitado de threads
+# Os downloads são executados por prioridade (maior primeiro) e, com a mesma prioridade,
+# na ordem de chegada, respeitando o limite de downloads simultâneos de cada plataforma
+class JobScheduler:
+    def __init__(self, max_workers=MAX_WORKERS, platform_limits=None, on_change=None):
+        self.platform_limits = dict(PLATFORM_LIMITS if platform_limits is None else platform_limits)
+        self.on_change = on_change  # Chamada (na thread do download) a cada mudança de estado
+        self.jobs = {}
+        self._queue = []  # Lista de (-prioridade, sequência, job) ordenada
+        self._running = {}  # Plataforma -> downloads em execução
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self.max_workers = max_workers
+        self.completed = 0  # Downloads que já deixaram o estágio de download
+        self.wait_time = 0.0  # Tempo total de espera na fila
+        self.work_time = 0.0  # Tempo total no estágio de download
+        for _ in range(max_workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    # Submete uma função de download; ela recebe o Job no argumento `job`
+    def submit(self, platform, target, *args, priority=0, label=None, journal_id=None, **kwargs):
+        with self._condition:
+            self._sequence += 1
+            job = Job(self._sequence, platform, target, args, kwargs, priority, label, journal_id, self._condition)
+            self.jobs[job.id] = job
+            self._queue.append((-priority, self._sequence, job))
+            self._queue.sort(key=lambda item: item[:2])
+            self._condition.notify_all()
+        self._notify(job)
+        return job
+
+    # Executa imediatamente, na thread que a chama, uma função curta que não acessa a rede (reaproveitamento de um
+    # arquivo já baixado): não espera na fila, não ocupa uma vaga das threads nem conta nos limites das plataformas
+    # Retorna o Job já terminado
+    def run_now(self, platform, target, *args, label=None, journal_id=None, **kwargs):
+        with self._condition:
+            self._sequence += 1
+            job = Job(self._sequence, platform, target, args, kwargs, 0, label, journal_id, self._condition)
+            job.state = JOB_RUNNING
+            self.jobs[job.id] = job
+        self._notify(job)
+        try:
+            result, state = target(*args, job=job, **kwargs), JOB_DONE
+        except JobCancelled:
+            result, state = None, JOB_CANCELLED
+        except Exception as e:
+            result, state = None, JOB_FAILED
+            job.error = e
+        with self._condition:
+            job.result = result
+            job.state = state
+        self._finish(job)
+        return job
+
+    # Marca o download como terminado e chama as funções registradas no Job
+    # O estado final já foi definido com a trava; as funções são retiradas do Job com a mesma trava
+    def _finish(self, job):
+        self._notify(job)
+        with self._condition:
+            callbacks, job._done_callbacks = job._done_callbacks, []
+        for callback in callbacks:
+            callback(job)
+
+    # Cancela um download: se estiver na fila é removido, se estiver em execução é interrompido
+    def cancel(self, job_id):
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if job is None or not job.is_active():
+                return False
+            job.cancel_event.set()
+            queued = job.state == JOB_QUEUED
+            if queued:
+                self._queue = [item for item in self._queue if item[2] is not job]
+                job.state = JOB_CANCELLED
+        if queued:
+            self._finish(job)
+        return True
+
+    # Cancela todos os downloads que ainda não terminaram
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    # Lista os downloads na fila ou em execução
+    def active_jobs(self):
+        with self._condition:
+            return [job for job in self.jobs.values() if job.is_active()]
+
+    # Lista todos os downloads submetidos, na ordem de chegada
+    def all_jobs(self):
+        with self._condition:
+            return list(self.jobs.values())
+
+    # Estatísticas do estágio de download: profundidade da fila, downloads em execução e tempos médios (s)
+    def stats(self):
+        with self._condition:
+            return {
+                'workers': self.max_workers,
+                'queued': len(self._queue),
+                'running': sum(self._running.values()),
+                'completed': self.completed,
+                'avg_wait': self.wait_time / self.completed if self.completed else 0.0,
+                'avg_time': self.work_time / self.completed if self.completed else 0.0,
+            }
+
+    def _notify(self, job):
+        if self.on_change is not None:
+            self.on_change(job)
+
+    # Retira da fila o próximo download cuja plataforma ainda tem vagas
+    def _take_next(self):
+        for index, (_, _, job) in enumerate(self._queue):
+            if self._running.get(job.platform, 0) < self.platform_limits.get(job.platform, MAX_WORKERS):
+                del self._queue[index]
+                return job
+        return None
+
+    def _worker(self):
+        from concurrent.futures import Future  # Importação tardia (mantém a importação do engine rápida)
+        while True:
+            with self._condition:
+                job = self._take_next()
+                while job is None:
+                    self._condition.wait()
+                    job = self._take_next()
+                self._running[job.platform] = self._running.get(job.platform, 0) + 1
+                job.state = JOB_RUNNING
+            self._notify(job)
+
+            started_at = time.perf_counter()
+            try:
+                job.check_cancelled()
+                result = job.target(*job.args, job=job, **job.kwargs)
+                state = JOB_DONE
+            except JobCancelled:
+                state = JOB_CANCELLED
+            except Exception as e:
+                job.error = e
+                state = JOB_FAILED
+
+            with self._condition:
+                self._running[job.platform] -= 1
+                self.completed += 1
+                self.wait_time += started_at - job.submitted_at
+                self.work_time += time.perf_counter() - started_at
+                self._condition.notify_all()  # Libera a vaga da plataforma para os downloads na fila
+                if state == JOB_DONE and isinstance(result, Future):
+                    # Etapa seguinte em outro estágio (por exemplo, conversão para mp3): a vaga já foi liberada
+                    # e o Job continua em execução até o Future terminar
+                    result.add_done_callback(lambda future, job=job: self._complete(job, future))
+                    continue
+                if state == JOB_DONE:
+                    job.result = result
+                job.state = state
+            self._finish(job)
+
+    # Conclui um download cuja etapa final foi executada em outro estágio
+    def _complete(self, job, future):
+        try:
+            result, state = future.result(), JOB_DONE
+        except JobCancelled:
+            result, state = None, JOB_CANCELLED
+        except Exception as e:
+            result, state = None, JOB_FAILED
+            job.error = e
+        with self._condition:
+            job.result = result
+            job.state = state
+        self._finish(job)
+
+# Agendador compartilhado dos downloads (criado no primeiro uso)
+_scheduler = None
+
+# Função para obter o agendador compartilhado
+def get_scheduler():
+    global _scheduler
+    with _singletons_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler(max_workers=MAX_WORKERS, on_change=on_job_change)
+        return _scheduler
+
+# Diário dos downloads, usado para retomar downloads interrompidos (criado no primeiro uso)
+JOURNAL_PATH = os.path.join('cache', 'journal.sqlite3')
+# Intervalo mínimo (s) entre as gravações do progresso de um download no diário
+JOURNAL_INTERVAL = 1.0
+_journal = None
+
+# Função para obter o diário compartilhado
+def get_journal():
+    global _journal
+    with _singletons_lock:
+        if _journal is None:
+            import journal
+            _journal = journal.JobJournal(JOURNAL_PATH)
+        return _journal
+
+# Função para executar uma operação no diário; falhas no diário não interrompem os downloads
+def journal_call(method, *args):
+    try:
+        return getattr(get_journal(), method)(*args)
+    except Exception as e:
+        log_message(f"Erro ao gravar o diário de downloads: {e}")
+        return None
+
+# Função chamada pelo agendador a cada mudança de estado de um download
+def on_job_change(job):
+    record_metrics(job)
+    if job.journal_id is not None:
+        journal_call('set_state', job.journal_id, job.state, str(job.error) if job.error else None)
+        if job.state == JOB_DONE and job.result and job.result.get('path'):
+            journal_call('update_progress', job.journal_id, JOB_DONE, job.downloaded_bytes or None, None, job.result['path'])
+    emit('job', job=job)
+
+# Função para registrar o progresso de um download (estatísticas do lote, medições e diário)
+def record_progress(job, d):
+    job.update_bytes(d)
+    if job.metrics is not None:
+        job.metrics.on_progress(d)
+    if job.journal_id is None:
+        return
+    if d['status'] == 'finished':
+        journal_call('update_progress', job.journal_id, 'downloaded', job.downloaded_bytes, None, d.get('filename'))
+    elif time.time() - job._journal_saved_at >= JOURNAL_INTERVAL:
+        job._journal_saved_at = time.time()
+        total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
+        journal_call('update_progress', job.journal_id, 'downloading', job.downloaded_bytes,
+                     job._finished_bytes + total_bytes if total_bytes else None, d.get('tmpfilename'))
+
+# Função para registrar a fase de pós-processamento (junção dos formatos ou extração do áudio)
+def record_postprocessing(job, d):
+    if d['status'] == 'started':
+        if d.get('postprocessor') == 'MoveFiles':
+            mark_phase(job, 'finalize')  # Último passo do yt_dlp: move os arquivos para o destino final
+        else:
+            mark_phase(job, 'merge' if d.get('postprocessor') == 'Merger' else 'postprocess')
+        if job.journal_id is not None:
+            journal_call('update_progress', job.journal_id, 'merging' if d.get('postprocessor') == 'Merger' else 'postprocessing')
+    elif d['status'] == 'finished':
+        mark_phase(job, 'finalize')
+
+# Medições das fases de cada download, acrescentadas a um arquivo JSON lines ao final de cada download
+METRICS_PATH = os.path.join('cache', 'metrics.jsonl')
+# Totais das medições no formato de texto do Prometheus (reescrito ao final de cada download)
+METRICS_PROMETHEUS_PATH = os.path.join('cache', 'metrics.prom')
+_metrics = None
+
+# Função para obter o registro de medições compartilhado
+def get_metrics():
+    global _metrics
+    with _singletons_lock:
+        if _metrics is None:
+            import metrics
+            _metrics = metrics.MetricsRecorder(METRICS_PATH, METRICS_PROMETHEUS_PATH)
+        return _metrics
+
+# Função para iniciar as medições de um download que saiu da fila e gravá-las quando ele terminar
+# Falhas na gravação das medições não interrompem os downloads
+def record_metrics(job):
+    try:
+        if job.metrics is None and job.state != JOB_QUEUED:
+            job.metrics = get_metrics().start(job.id, job.platform, job.label, job.submitted_at)
+        if not job.is_active():
+            get_metrics().finish(job.metrics, job.state, job.downloaded_bytes, job.error)
+    except Exception as e:
+        log_message(f"Erro ao gravar as métricas de download: {e}")
+
+# Função para iniciar uma fase do download nas suas medições (a fase anterior é encerrada)
+def mark_phase(job, phase):
+    if job is not None and job.metrics is not None:
+        job.metrics.mark(phase)
+
+# Função para obter as opções do yt_dlp que alimentam as medições do download:
+# o início do downloader (o tempo até o primeiro byte é contado a partir dele) e as novas tentativas
+def metrics_options(job):
+    def download_started(info):
+        if job is not None and job.metrics is not None:
+            job.metrics.download_started()
+
+    def count_retry():
+        if job is not None and job.metrics is not None:
+            job.metrics.count_retry()
+
+    # As requisições repetidas pelo próprio yt_dlp (páginas, intervalos e fragmentos) esperam de forma
+    # exponencial com jitter; a limitação de requisições é tratada como falha do download inteiro (retry_call)
+    policy = get_retry_policy()
+    sleep = policy.sleep_function(on_retry=count_retry)
+    return {
+        'download_start_hook': download_started,
+        'retry_sleep_functions': {'http': sleep, 'fragment': sleep, 'extractor': sleep},
+    }
+
+# Número de tentativas de cada download e de cada consulta de qualidades
+# Falhas temporárias e limitação de requisições são repetidas automaticamente (retry.py)
+RETRY_ATTEMPTS = 4
+PROBE_RETRY_ATTEMPTS = 2
+_retry_policy = None
+
+# Função para obter a política de novas tentativas dos downloads (criada no primeiro uso)
+def get_retry_policy():
+    global _retry_policy
+    with _singletons_lock:
+        if _retry_policy is None:
+            from retry import RetryPolicy  # Importação tardia (mantém a importação do engine rápida)
+            _retry_policy = RetryPolicy(max_attempts=RETRY_ATTEMPTS)
+        return _retry_policy
+
+# Função para executar uma etapa repetindo-a nas falhas temporárias e na limitação de requisições
+# A espera é interrompida pelo cancelamento do download; `on_retry()` é chamada antes de cada repetição
+# (por exemplo, para descartar informações em cache cujas URLs expiraram)
+def retry_call(job, func, description, on_retry=None, policy=None):
+    from retry import KIND_LABELS, run_with_retry
+
+    def report_retry(attempt, kind, delay, e):
+        if job is not None and job.metrics is not None:
+            job.metrics.count_retry()
+        if on_retry is not None:
+            on_retry()
+        log_message(f"{description}: {KIND_LABELS[kind]} ({e}). Nova tentativa em {delay:.0f} s ({attempt + 1}/{(policy or get_retry_policy()).max_attempts}).")
+
+    def wait(delay):
+        if job is None:
+            time.sleep(delay)
+            return
+        job.cancel_event.wait(delay)
+        job.check_cancelled()
+
+    return run_with_retry(func, policy or get_retry_policy(), report_retry, wait)
+
+# Limite total de banda (bytes/s) dividido entre os downloads ativos (None = sem limite)
+BANDWIDTH_TOTAL = None
+# Limites de banda (bytes/s) por plataforma, divididos entre os downloads ativos da plataforma
+BANDWIDTH_PER_PLATFORM = {}
+_bandwidth_governor = None
+
+# Função para obter o controle de banda compartilhado
+def get_bandwidth_governor():
+    global _bandwidth_governor
+    with _singletons_lock:
+        if _bandwidth_governor is None:
+            import bandwidth
+            _bandwidth_governor = bandwidth.BandwidthGovernor(BANDWIDTH_TOTAL, BANDWIDTH_PER_PLATFORM)
+        return _bandwidth_governor
+
+# Função para alterar os limites de banda em tempo de execução (as cotas dos downloads ativos são recalculadas)
+# `total`: bytes/s ou None para remover o limite; `per_platform`: plataforma -> bytes/s (None remove o limite)
+def set_bandwidth_limits(total=..., per_platform=None):
+    global BANDWIDTH_TOTAL
+    if total is not ...:
+        BANDWIDTH_TOTAL = total
+    for platform, rate in (per_platform or {}).items():
+        if rate:
+            BANDWIDTH_PER_PLATFORM[platform] = rate
+        else:
+            BANDWIDTH_PER_PLATFORM.pop(platform, None)
+    get_bandwidth_governor().set_limits(total, per_platform)
+
+# Função para obter a cota de banda de um download da plataforma (devolvida ao sair do bloco `with`)
+def acquire_bandwidth(job, platform):
+    lease = get_bandwidth_governor().acquire(platform)
+    if job is not None:
+        lease.check_cancelled = job.check_cancelled  # O cancelamento interrompe as esperas da cota
+        job.bandwidth = lease
+    return lease
+
+# Índice das mídias já baixadas (criado no primeiro uso; reconstruído a partir das pastas de download se estiver vazio)
+ARCHIVE_PATH = os.path.join('cache', 'archive.sqlite3')
+# Calcula e confere o hash SHA-256 dos arquivos indexados (mais seguro, porém lento para arquivos grandes)
+ARCHIVE_HASH = False
+_archive = None
+
+# Função para obter o índice compartilhado
+def get_archive():
+    global _archive
+    with _singletons_lock:
+        if _archive is None:
+            import archive
+            _archive = archive.MediaArchive(ARCHIVE_PATH)
+            if _archive.count() == 0:
+                _archive.rebuild(PLATFORM_DIRS, hash_files=ARCHIVE_HASH)
+        return _archive
+
+# Função para executar uma operação no índice; falhas no índice não interrompem os downloads
+def archive_call(method, *args):
+    try:
+        return getattr(get_archive(), method)(*args)
+    except Exception as e:
+        log_message(f"Erro ao acessar o índice de downloads: {e}")
+        return None
+
+# Função para obter a chave (extrator, ID do vídeo) de uma URL sem acessar a rede
+# O ID vem da própria URL ou, se ela não o contiver, das informações já consultadas em cache
+def archive_key(url):
+    import archive
+    key = archive.media_key(url)
+    if key is None:
+        info_dict = get_info_cache().get(url)
+        if info_dict and info_dict.get('extractor_key') and info_dict.get('id'):
+            key = (info_dict['extractor_key'], info_dict['id'])
+    return key
+
+# Função para localizar o arquivo já baixado de uma URL no formato e qualidade pedidos
+def find_archived(url, format_choice, quality):
+    key = archive_key(url)
+    if key is None:
+        return None
+    return archive_call('lookup', *key, format_choice, quality, ARCHIVE_HASH)
+
+# Função para registrar no índice o arquivo baixado, pela chave do extrator e pela chave da URL (se diferente)
+def record_archive(url, info_dict, format_choice, quality, output_path):
+    if not output_path or not os.path.isfile(output_path):
+        return
+    keys = {archive_key(url)}
+    if info_dict.get('extractor_key') and info_dict.get('id'):
+        keys.add((info_dict['extractor_key'], info_dict['id']))
+    keys.discard(None)
+    if not keys:
+        return
+    if ARCHIVE_HASH:
+        import archive
+        sha256 = archive.file_sha256(output_path)
+    else:
+        sha256 = None
+    for extractor, video_id in keys:
+        archive_call('add', extractor, video_id, format_choice, quality, output_path, sha256)
+
+# Função para concluir um download reaproveitando o arquivo já baixado (sem acessar a rede)
+def use_archived(url, path, job=None, notify=True):
+    mark_phase(job, 'finalize')
+    start_time = time.time()
+    directory = os.path.dirname(path)
+    file_name = os.path.basename(path)
+    update_progress(job, 100)
+    elapsed_time = time.time() - start_time
+
+    log_message(f"'{file_name}' já havia sido baixado: arquivo existente reaproveitado ({url}).")  # Adiciona mensagem ao log
+    if notify:  # Em lotes, apenas o log é atualizado
+        notify_user('info', "Sucesso", f"O arquivo '{file_name}' já havia sido baixado.")  # Mostra mensagem de sucesso
+
+    # Informar a pasta onde o arquivo está (a interface gráfica a abre)
+    emit('saved', job=job, directory=directory)
+    return {'title': os.path.splitext(file_name)[0], 'directory': directory, 'path': path, 'elapsed': elapsed_time, 'archived': True}
+
+# Número de conversões simultâneas no estágio de pós-processamento (None = uma por núcleo)
+POSTPROCESS_WORKERS = None
+_postprocessing_stage = None
+
+# Função para obter o estágio de pós-processamento compartilhado
+def get_postprocessing_stage():
+    global _postprocessing_stage
+    with _singletons_lock:
+        if _postprocessing_stage is None:
+            import postprocess
+            _postprocessing_stage = postprocess.PostProcessingStage(workers=POSTPROCESS_WORKERS)
+        return _postprocessing_stage
+
+# Conversão para mp3 durante o download (o ffmpeg recebe o áudio enquanto ele chega); desativada, ou sem o
+# ffmpeg instalado, o áudio é baixado inteiro e convertido depois no estágio de pós-processamento
+AUDIO_STREAMING = True
+_ffmpeg_found = None
+
+# Função para verificar se a conversão durante o download pode ser usada
+def audio_streaming_available():
+    global _ffmpeg_found
+    if not AUDIO_STREAMING:
+        return False
+    if _ffmpeg_found is None:
+        import shutil
+        _ffmpeg_found = shutil.which('ffmpeg') is not None
+    return _ffmpeg_found
+
+# Função para converter para mp3 o áudio baixado, no estágio de pós-processamento
+# `finish(caminho do mp3)` conclui o download e `report_error(erro)` informa falhas na conversão.
+# Com um Job, retorna um Future (o agendador libera a vaga de download enquanto a conversão é feita);
+# sem Job, aguarda a conversão e retorna o resultado de `finish`
+def convert_audio(job, info_dict, source_path, finish, report_error):
+    mark_phase(job, 'postprocess')  # Inclui a espera na fila do estágio de pós-processamento
+    requested = (info_dict.get('requested_downloads') or [info_dict])[0]
+    acodec = requested.get('acodec') or info_dict.get('acodec')
+    target_path = os.path.splitext(source_path)[0] + '.mp3'
+    if job is not None and job.journal_id is not None:
+        journal_call('update_progress', job.journal_id, 'postprocessing')
+    conversion = get_postprocessing_stage().extract_audio(source_path, target_path, acodec,
+                                                          job.check_cancelled if job is not None else None)
+    if job is None:
+        return finish(conversion.result())
+
+    from concurrent.futures import Future
+    result = Future()
+
+    # Função chamada quando a conversão terminar (na thread do estágio de pós-processamento)
+    def on_converted(conversion):
+        try:
+            result.set_result(finish(conversion.result()))
+        except JobCancelled as e:
+            log_message(f"Conversão para mp3 cancelada: {source_path}")  # Adiciona mensagem ao log
+            result.set_exception(e)
+        except Exception as e:
+            report_error(e)
+            result.set_exception(e)
+
+    conversion.add_done_callback(on_converted)
+    return result
+
+# Função para obter as estatísticas de cada estágio (download e pós-processamento)
+def pipeline_stats():
+    stats = {'download': get_scheduler().stats()}
+    if _postprocessing_stage is not None:
+        stats['postprocess'] = _postprocessing_stage.stats()
+    if _ytdl_pool is not None:
+        stats['ytdl'] = _ytdl_pool.stats()  # Instâncias do YoutubeDL criadas e reaproveitadas
+    return stats
+
+# Função para baixar um vídeo de uma plataforma suportada pelo yt_dlp, descrita pelo seu adaptador (adapters.py)
+# A URL já deve estar ajustada pelo adaptador (submit_download); o extrator é resolvido pelos padrões do adaptador
+def download_media(platform, url, format_choice, quality='best', job=None, notify=True):
+    adapter = get_adapter(platform)
+    name = adapter.name  # Nome da plataforma nas mensagens
+
+    # Função para informar um erro no download ou na conversão
+    # Chamada apenas quando a falha é permanente ou as novas tentativas se esgotaram
+    def report_error(e):
+        from retry import describe_error
+        log_message(f"Erro ao baixar o vídeo do {name}: {describe_error(e)}")  # Adiciona mensagem de erro ao log
+        notify_user('error', "Erro", f"Erro ao baixar o vídeo do {name}: {describe_error(e)}")  # Mostra mensagem de erro
+
+    try:
+        platform_dir = adapter.directory  # Define o diretório de download
+        os.makedirs(platform_dir, exist_ok=True)  # Cria o diretório se não existir
+
+        start_time = time.time()  # Marca o tempo de início do download
+
+        # Função de callback para informar o progresso do download
+        def progress_hook(d):
+            if job is not None:
+                job.check_cancelled()  # Interrompe o download se ele tiver sido cancelado
+                record_progress(job, d)  # Contabiliza os bytes para as estatísticas do lote e o diário
+            if d['status'] == 'downloading':  # Verifica se o status é 'downloading'
+                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')  # Obtém o total de bytes
+                if total_bytes:
+                    percentage = d['downloaded_bytes'] / total_bytes * 100  # Calcula a porcentagem de download
+                    update_progress(job, percentage, d.get('speed'), d.get('eta'))  # Informa o progresso do download
+
+        # Função de callback para registrar a fase de pós-processamento
+        def postprocessor_hook(d):
+            if job is not None:
+                record_postprocessing(job, d)
+
+        # Qualidade selecionada (lida na thread da interface e recebida como argumento)
+        import renditions
+        format_string = renditions.format_spec(format_choice, quality)
+
+        # Ajustar o nome de saída dos arquivos conforme o formato escolhido
+        outtmpl = renditions.output_template(platform_dir, format_choice, quality)
+
+        # Opções de configuração para o yt_dlp
+        ydl_opts = {
+            'outtmpl': outtmpl,  # Define o padrão de nome do arquivo de saída
+            'continuedl': True,  # Novas tentativas continuam dos arquivos parciais (.part e .segments)
+            'segmented_connections': SEGMENT_CONNECTIONS,  # Conexões paralelas para formatos HTTP progressivos
+            'concurrent_fragment_downloads': SEGMENT_CONNECTIONS,  # Fragmentos simultâneos para formatos DASH/HLS
+            'format': format_string, # Define o formato de download: 'bestaudio/best' para mp3, vídeo e áudio na qualidade escolhida para mp4
+            'progress_hooks': [progress_hook], # Adiciona a função de callback para atualizar a barra de progresso durante o download
+            'postprocessor_hooks': [postprocessor_hook], # Registra no diário a fase de pós-processamento
+            **metrics_options(job),  # Início do downloader e novas tentativas, para as medições do download
+            **adapter.ydl_options,  # Opções próprias da plataforma
+            'merge_output_format': 'mp4' if format_choice == 'mp4' else None  # Define o formato de saída como MP4 se o formato escolhido for MP4
+        }
+
+        # Função que extrai as informações e baixa o vídeo (uma tentativa)
+        def fetch():
+            # A cota de banda do download é dividida de forma justa com os demais downloads ativos
+            # A instância do YoutubeDL vem do pool: extratores, cookies e conexões dos downloads anteriores são reaproveitados
+            with acquire_bandwidth(job, platform) as lease, get_ytdl_pool().lease(platform, {**ydl_opts, 'bandwidth_lease': lease}) as ydl:
+                mark_phase(job, 'extract')  # Extração das informações (ou reaproveitamento do cache)
+                ie_key = adapter.resolve_ie_key(url)
+                if format_choice == 'mp3' and audio_streaming_available():
+                    # O áudio é convertido para mp3 enquanto é baixado, sem arquivo intermediário
+                    resolved = extract_info_cached(ydl, url, download=False, ie_key=ie_key)
+                    info_dict = ydl.stream_audio(resolved)
+                    if info_dict is not None:
+                        return info_dict, True
+                    # Formato que o ffmpeg não lê sequencialmente: download normal e conversão depois
+                    return ydl.process_ie_result(resolved, download=True), False
+                return extract_info_cached(ydl, url, download=True, ie_key=ie_key), False  # Reaproveita as informações já consultadas e baixa o vídeo
+
+        # Falhas temporárias e limitação de requisições são repetidas sem intervenção do usuário; a nova tentativa
+        # extrai as informações novamente (as URLs dos formatos podem ter expirado) e continua dos arquivos parciais
+        info_dict, streamed = retry_call(job, fetch, f"Download do {name}", on_retry=lambda: get_info_cache().invalidate(url))
+        video_title = info_dict.get('title', 'Vídeo')  # Obtém o título do vídeo
+        output_path = (info_dict.get('requested_downloads') or [{}])[0].get('filepath')  # Obtém o arquivo final
+
+        # Função para concluir o download (após a conversão para mp3, se houver)
+        def finish(output_path):
+            mark_phase(job, 'finalize')
+            record_archive(url, info_dict, format_choice, quality, output_path)  # Registra o arquivo no índice de downloads
+            end_time = time.time()  # Marca o tempo de término do download
+            elapsed_time = end_time - start_time  # Calcula o tempo decorrido
+
+            if format_choice == 'mp3':
+                log_message(f"Áudio '{video_title}' do {name} baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
+                if notify:  # Em lotes, apenas o log é atualizado
+                    notify_user('info', "Sucesso", f"Download do áudio '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
+            else:
+                log_message(f"Vídeo '{video_title}' do {name} em {quality} baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
+                if notify:  # Em lotes, apenas o log é atualizado
+                    notify_user('info', "Sucesso", f"Download do vídeo '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
+
+            # Informar a pasta onde o arquivo foi salvo (a interface gráfica a abre)
+            emit('saved', job=job, directory=platform_dir)
+            return {'title': video_title, 'directory': platform_dir, 'path': output_path, 'elapsed': elapsed_time}
+
+        if format_choice == 'mp3' and not streamed:
+            # A conversão para mp3 é feita no estágio de pós-processamento, liberando a vaga de download
+            return convert_audio(job, info_dict, output_path, finish, report_error)
+        return finish(output_path)
+
+    except JobCancelled:
+        log_message(f"Download do {name} cancelado: {url}")  # Adiciona mensagem ao log
+        raise
+    except Exception as e:
+        report_error(e)
+        raise  # Informa a falha ao agendador
+
+# Funções para baixar vídeos de cada plataforma
+def download_youtube(url, format_choice, quality='best', job=None, notify=True):
+    return download_media('youtube', url, format_choice, quality, job, notify)
+
+def download_twitter(url, format_choice, quality='best', job=None, notify=True):
+    return download_media('twitter', url, format_choice, quality, job, notify)
+
+def download_facebook(url, format_choice, quality='best', job=None, notify=True):
+    return download_media('facebook', url, format_choice, quality, job, notify)
+
+# Pasta dos fluxos baixados pelos downloads com várias versões (cada vídeo em uma subpasta, removida ao final)
+RENDITIONS_DIR = os.path.join('cache', 'renditions')
+
+# Função para baixar várias versões de um vídeo em um único download (`outputs`: pares (formato, qualidade),
+# ver renditions.py): as informações são extraídas uma vez, cada fluxo distinto é baixado uma única vez e as
+# versões são montadas localmente no estágio de pós-processamento (junção sem recodificação ou extração do mp3)
+# Com um Job, retorna um Future (o agendador libera a vaga de download enquanto as versões são montadas)
+def download_renditions(platform, url, outputs, job=None, notify=True):
+    import renditions
+    adapter = get_adapter(platform)
+    name = adapter.name  # Nome da plataforma nas mensagens
+
+    # Função para informar um erro no download ou na montagem das versões
+    def report_error(e):
+        from retry import describe_error
+        log_message(f"Erro ao baixar as versões do vídeo do {name}: {describe_error(e)}")  # Adiciona mensagem de erro ao log
+        notify_user('error', "Erro", f"Erro ao baixar as versões do vídeo do {name}: {describe_error(e)}")  # Mostra mensagem de erro
+
+    try:
+        platform_dir = adapter.directory  # Define o diretório de download
+        os.makedirs(platform_dir, exist_ok=True)  # Cria o diretório se não existir
+
+        start_time = time.time()  # Marca o tempo de início do download
+
+        # Versões já baixadas são reaproveitadas; apenas as demais são baixadas
+        archived = {output: find_archived(url, *output) for output in outputs}
+        pending = [output for output in outputs if not archived[output]]
+        progress = {'done': 0, 'total': 0}  # Bytes dos fluxos já concluídos e tamanho estimado de todos os fluxos
+
+        # Função de callback para informar o progresso agregado de todos os fluxos
+        def progress_hook(d):
+            if job is not None:
+                job.check_cancelled()  # Interrompe o download se ele tiver sido cancelado
+                record_progress(job, d)  # Contabiliza os bytes para as estatísticas do lote e o diário
+            if d['status'] == 'finished':
+                progress['done'] += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+            elif d['status'] == 'downloading':
+                file_total = d.get('total_bytes') or d.get('total_bytes_estimate')
+                if progress['total']:
+                    percentage = min((progress['done'] + d['downloaded_bytes']) / progress['total'] * 100, 100)
+                    update_progress(job, percentage, d.get('speed'))
+                elif file_total:
+                    update_progress(job, d['downloaded_bytes'] / file_total * 100, d.get('speed'), d.get('eta'))
+
+        # Opções de configuração para o yt_dlp (o formato e o nome de saída são definidos por versão)
+        ydl_opts = {
+            'continuedl': True,  # Novas tentativas continuam dos arquivos parciais e não baixam de novo os fluxos completos
+            'segmented_connections': SEGMENT_CONNECTIONS,  # Conexões paralelas para formatos HTTP progressivos
+            'concurrent_fragment_downloads': SEGMENT_CONNECTIONS,  # Fragmentos simultâneos para formatos DASH/HLS
+            'progress_hooks': [progress_hook],
+            **metrics_options(job),  # Início do downloader e novas tentativas, para as medições do download
+            **adapter.ydl_options,  # Opções próprias da plataforma
+        }
+
+        # Função que extrai as informações, seleciona os formatos de cada versão e baixa cada fluxo distinto (uma tentativa)
+        def fetch():
+            with acquire_bandwidth(job, platform) as lease, get_ytdl_pool().lease(platform, {**ydl_opts, 'bandwidth_lease': lease}) as ydl:
+                mark_phase(job, 'extract')  # Extração das informações (ou reaproveitamento do cache)
+                info_dict = extract_info_cached(ydl, url, download=False, ie_key=adapter.resolve_ie_key(url))
+                selections = [ydl.select_formats(info_dict, renditions.format_spec(*output)) for output in pending]
+                streams, planned = renditions.plan_renditions(pending, selections)
+                progress['done'] = 0
+                progress['total'] = sum(stream.get('filesize') or stream.get('filesize_approx') or 0 for stream in streams.values())
+                if not all(stream.get('filesize') or stream.get('filesize_approx') for stream in streams.values()):
+                    progress['total'] = 0  # Tamanho desconhecido de algum fluxo: progresso de cada arquivo
+                source_dir = os.path.join(RENDITIONS_DIR, f"{info_dict.get('extractor_key')}_{info_dict.get('id')}")
+                sources = {}
+                for stream_id, stream in streams.items():
+                    sources[stream_id] = ydl.download_format(info_dict, stream, renditions.stream_filename(source_dir, stream))
+                targets = [ydl.prepare_filename({**info_dict, 'ext': rendition.ext},
+                                                outtmpl=renditions.output_template(platform_dir, rendition.format_choice, rendition.quality))
+                           for rendition in planned]
+                return info_dict, streams, planned, sources, targets, source_dir
+
+        paths = {output: path for output, path in archived.items() if path}
+        info_dict, planned, targets, source_dir, derivations = {}, [], [], None, []
+        if pending:
+            # Falhas temporárias são repetidas como nos downloads individuais; os fluxos já completos não são baixados de novo
+            info_dict, streams, planned, sources, targets, source_dir = retry_call(
+                job, fetch, f"Download das versões do {name}", on_retry=lambda: get_info_cache().invalidate(url))
+            log_message(f"{len(planned)} versão(ões) de '{info_dict.get('title', 'Vídeo')}' a partir de {len(streams)} fluxo(s) baixado(s).")
+
+            # Montagem das versões no estágio de pós-processamento (os fluxos são mantidos até a última versão)
+            mark_phase(job, 'postprocess')
+            if job is not None and job.journal_id is not None:
+                journal_call('update_progress', job.journal_id, 'postprocessing')
+            stage = get_postprocessing_stage()
+            check_cancelled = job.check_cancelled if job is not None else None
+            for rendition, target_path in zip(planned, targets):
+                stream_paths = [sources[stream_id] for stream_id in rendition.streams]
+                if rendition.format_choice == 'mp3':
+                    acodec = streams[rendition.streams[0]].get('acodec')
+                    derivations.append(stage.extract_audio(stream_paths[0], target_path, acodec, check_cancelled, keep_source=True))
+                elif len(stream_paths) > 1:
+                    derivations.append(stage.merge_streams(stream_paths[0], stream_paths[1], target_path, check_cancelled))
+                else:
+                    renditions.link_or_copy(stream_paths[0], target_path)  # A versão é o próprio formato baixado
+
+        # Obtém o título do vídeo (sem nada a baixar, o nome da primeira versão já baixada)
+        video_title = info_dict.get('title') or (os.path.splitext(os.path.basename(paths[outputs[0]]))[0] if not pending else 'Vídeo')
+
+        # Função para concluir o download após a montagem de todas as versões
+        def finish():
+            mark_phase(job, 'finalize')
+            for rendition, target_path in zip(planned, targets):
+                output = (rendition.format_choice, rendition.quality)
+                paths[output] = target_path
+                record_archive(url, info_dict, *output, target_path)  # Registra cada versão no índice de downloads
+            if source_dir is not None:
+                import shutil
+                shutil.rmtree(source_dir, ignore_errors=True)  # Remove os fluxos baixados
+            elapsed_time = time.time() - start_time
+            saved = [paths[output] for output in outputs if output in paths]
+            log_message(f"{len(saved)} versão(ões) de '{video_title}' do {name} ({renditions.format_outputs(outputs)}) "
+                        f"concluída(s) em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
+            if notify:  # Em lotes, apenas o log é atualizado
+                notify_user('info', "Sucesso", f"Download das versões de '{video_title}' concluído com sucesso!")  # Mostra mensagem de sucesso
+
+            # Informar a pasta onde os arquivos foram salvos (a interface gráfica a abre)
+            emit('saved', job=job, directory=platform_dir)
+            return {'title': video_title, 'directory': platform_dir, 'path': saved[0] if saved else None, 'paths': saved, 'elapsed': elapsed_time}
+
+        if not derivations:
+            return finish()
+        if job is None:
+            for derivation in derivations:
+                derivation.result()
+            return finish()
+
+        from concurrent.futures import Future
+        result = Future()
+        remaining = [len(derivations)]
+        remaining_lock = threading.Lock()
+
+        # Função chamada quando cada versão for montada (na thread do estágio de pós-processamento); a última conclui o download
+        def on_derived(derivation):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                for pending_derivation in derivations:
+                    pending_derivation.result()  # Lança a falha da primeira versão que não pôde ser montada
+                result.set_result(finish())
+            except JobCancelled as e:
+                log_message(f"Montagem das versões cancelada: {url}")  # Adiciona mensagem ao log
+                result.set_exception(e)
+            except Exception as e:
+                report_error(e)
+                result.set_exception(e)
+
+        for derivation in derivations:
+            derivation.add_done_callback(on_derived)
+        return result
+
+    except JobCancelled:
+        log_message(f"Download das versões do {name} cancelado: {url}")  # Adiciona mensagem ao log
+        raise
+    except Exception as e:
+        report_error(e)
+        raise  # Informa a falha ao agendador
+
+# Sessão do Instagram: usuário cuja sessão salva é carregada (None = sem login; destaques exigem login)
+INSTAGRAM_SESSION_USER = None
+# Pasta dos arquivos de sessão do Instagram
+INSTAGRAM_SESSION_DIR = os.path.join('cache', 'instagram')
+# Intervalo (em itens) entre as mensagens de progresso nos downloads de perfis
+INSTAGRAM_LOG_EVERY = 25
+_instagram_pool = None
+
+# Função para carregar o módulo de sessões do Instagram (importa o instaloader)
+def load_instagram():
+    import instagram
+    return instagram
+
+# Função para obter o pool de instâncias do Instaloader compartilhado
+def get_instagram_pool():
+    global _instagram_pool
+    with _singletons_lock:
+        if _instagram_pool is None:
+            _instagram_pool = load_instagram().InstaloaderPool(
+                size=PLATFORM_LIMITS.get('instagram', 1),  # Uma instância por download simultâneo do Instagram
+                session_dir=INSTAGRAM_SESSION_DIR,
+                username=INSTAGRAM_SESSION_USER,
+                loader_options={
+                    'download_pictures': False,  # Não baixa imagens
+                    'download_video_thumbnails': False,  # Não baixa miniaturas de vídeos
+                    'save_metadata': False,  # Não salva metadados
+                    'post_metadata_txt_pattern': "",  # Não salva metadados em texto
+                    'filename_pattern': '{owner_username} - {mediaid}',  # Define o padrão de nome do arquivo
+                })
+        return _instagram_pool
+
+# Função para baixar os vídeos de um perfil do Instagram (posts, reels ou destaques) com uma única instância
+# Os vídeos já registrados no índice de downloads são ignorados
+def download_instagram_profile(loader, url, kind, value, instagram_dir, start_time, job, notify):
+    instagram = load_instagram()
+    mark_phase(job, 'extract')
+    items, total = instagram.iter_media(loader, kind, value)
+    counts = {'seen': 0, 'downloaded': 0}
+
+    # Função para ignorar os vídeos já baixados
+    def skip(item):
+        return bool(find_archived(f"https://www.instagram.com/p/{item.shortcode}/", 'mp4', 'best'))
+
+    # Função chamada após cada item: registra o vídeo no índice e informa o progresso
+    def on_item(item, downloaded):
+        counts['seen'] += 1
+        if downloaded:
+            counts['downloaded'] += 1
+            record_archive(f"https://www.instagram.com/p/{item.shortcode}/", {}, 'mp4', 'best',
+                           os.path.join(instagram_dir, f"{item.owner_username} - {item.mediaid}.mp4"))
+        if total:
+            update_progress(job, min(counts['seen'] / total * 100, 100))
+        if counts['seen'] % INSTAGRAM_LOG_EVERY == 0:
+            log_message(f"Instagram '{value}': {counts['seen']} item(ns) verificado(s), {counts['downloaded']} vídeo(s) baixado(s)...")
+        if job is not None:
+            job.check_cancelled()
+
+    mark_phase(job, 'transfer')  # Os posts são listados durante a transferência, página por página
+    instagram.download_items(loader, items, instagram_dir, on_item=on_item, skip=skip)
+    mark_phase(job, 'finalize')
+    update_progress(job, 100)
+    elapsed_time = time.time() - start_time
+
+    log_message(f"{counts['downloaded']} vídeo(s) de '{value}' do Instagram baixado(s) em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
+    if notify:  # Em lotes, apenas o log é atualizado
+        notify_user('info', "Sucesso", f"Download dos vídeos de '{value}' do Instagram concluído com sucesso!")  # Mostra mensagem de sucesso
+
+    emit('saved', job=job, directory=instagram_dir)
+    return {'title': value, 'directory': instagram_dir, 'elapsed': elapsed_time, 'count': counts['downloaded']}
+
+# Função para baixar posts do Instagram
+def download_instagram(url, job=None, notify=True):
+    try:
+        instagram_dir = os.path.join('downloads-Instagram')  # Define o diretório de download
+        os.makedirs(instagram_dir, exist_ok=True)  # Cria o diretório se não existir
+
+        start_time = time.time()  # Marca o tempo de início do download
+
+        instaloader = load_instaloader()
+        instagram = load_instagram()
+        kind, value = instagram.parse_instagram_url(url)  # Identifica o post (shortcode) ou o perfil da URL
+
+        # Usa uma instância do pool: a sessão e os limites de requisições são compartilhados entre os downloads
+        with acquire_bandwidth(job, 'instagram') as lease, \
+                get_instagram_pool().lease(job.check_cancelled if job is not None else None, lease) as loader:
+            if kind != 'post':
+                return download_instagram_profile(loader, url, kind, value, instagram_dir, start_time, job, notify)
+
+            # Função que obtém e baixa o post (uma tentativa; os arquivos já baixados não são baixados novamente)
+            def fetch():
+                mark_phase(job, 'extract')
+                post = instaloader.Post.from_shortcode(loader.context, value)  # Obtém o post a partir do shortcode
+                if job is not None:
+                    job.check_cancelled()  # O instaloader não pode ser interrompido durante o download do post
+
+                # Baixar o post diretamente para o diretório de saída
+                mark_phase(job, 'transfer')  # O instaloader não informa o progresso: o primeiro byte não é medido
+                loader.download_post(post, target=instagram_dir)
+                return post
+
+            post = retry_call(job, fetch, "Download do Instagram")
+            username = post.owner_username  # Obtém o nome de usuário do dono do post
+        mark_phase(job, 'finalize')
+        if post.is_video:  # Registra o vídeo no índice de downloads
+            record_archive(url, {}, 'mp4', 'best', os.path.join(instagram_dir, f"{username} - {post.mediaid}.mp4"))
+
+        # Informar 100% de progresso quando o download estiver completo
+        update_progress(job, 100)
+
+        end_time = time.time()  # Marca o tempo de término do download
+        elapsed_time = end_time - start_time  # Calcula o tempo decorrido
+
+        log_message(f"Vídeo de '{username}' do Instagram baixado em {elapsed_time:.2f} segundos!")  # Adiciona mensagem ao log
+        if notify:  # Em lotes, apenas o log é atualizado
+            notify_user('info', "Sucesso", "Download do vídeo do Instagram concluído com sucesso!")  # Mostra mensagem de sucesso
+
+        # Informar a pasta onde o arquivo foi salvo (a interface gráfica a abre)
+        emit('saved', job=job, directory=instagram_dir)
+        return {'title': username, 'directory': instagram_dir, 'elapsed': elapsed_time}
+
+    except JobCancelled:
+        log_message(f"Download do Instagram cancelado: {url}")  # Adiciona mensagem ao log
+        raise
+    except Exception as e:
+        from retry import describe_error
+        log_message(f"Erro ao baixar o vídeo do Instagram: {describe_error(e)}")  # Adiciona mensagem de erro ao log
+        notify_user('error', "Erro", f"Erro ao baixar o vídeo do Instagram: {describe_error(e)}")  # Mostra mensagem de erro
+        raise  # Informa a falha ao agendador
+
+# Pasta de download de cada plataforma
+PLATFORM_DIRS = {adapter.platform: adapter.directory for adapter in all_adapters()}
+
+# Função para submeter ao agendador o download correspondente à plataforma da URL
+# O download é registrado no diário (exceto ao retomar um registro existente, informado em `journal_id`)
+# Com `outputs` (pares (formato, qualidade), ver renditions.py), as várias versões são baixadas em um único download
+# Retorna o Job criado, ou None se a URL não for suportada
+def submit_download(url, format_choice, quality, priority=0, journal_id=None, outputs=None, **kwargs):
+    adapter = find_adapter(url)
+    if adapter is None:
+        return None
+    platform = adapter.platform
+    scheduler = get_scheduler()
+
+    if outputs and adapter.ytdl:
+        if len(outputs) == 1:
+            format_choice, quality = outputs[0]  # Uma única versão: download normal
+        else:
+            import renditions
+            if journal_id is None:
+                # O diário guarda a lista de versões na qualidade, para retomar o download
+                journal_id = journal_call('add', url, platform, renditions.MULTIPLE, renditions.format_outputs(outputs), adapter.directory)
+            return scheduler.submit(platform, download_renditions, platform, adapter.prepare_url(url), outputs,
+                                    priority=priority, label=url, journal_id=journal_id, **kwargs)
+
+    # Mídia já baixada no mesmo formato e qualidade: reaproveita o arquivo existente sem acessar a rede
+    # O Job é concluído imediatamente, sem esperar pelos downloads que ocupam as threads do agendador
+    if not adapter.ytdl:
+        archived_path = find_archived(url, 'mp4', 'best')
+    else:
+        archived_path = find_archived(url, format_choice, quality)
+    if archived_path:
+        if journal_id is None:
+            journal_id = journal_call('add', url, platform, format_choice, quality, os.path.dirname(archived_path))
+        return scheduler.run_now('archive', use_archived, url, archived_path, label=url, journal_id=journal_id, **kwargs)
+
+    if journal_id is None:
+        if not adapter.ytdl:
+            journal_id = journal_call('add', url, platform, None, None, adapter.directory)
+        else:
+            journal_id = journal_call('add', url, platform, format_choice, quality, adapter.directory)
+
+    if platform == 'instagram':
+        return scheduler.submit(platform, download_instagram, url, priority=priority, label=url, journal_id=journal_id, **kwargs)
+    # Demais plataformas: download pelo yt_dlp, com a URL ajustada pelo adaptador
+    return scheduler.submit(platform, download_media, platform, adapter.prepare_url(url), format_choice, quality, priority=priority, label=url, journal_id=journal_id, **kwargs)
+
+# Função para retomar os downloads interrompidos registrados no diário
+# O yt_dlp e o download segmentado continuam a partir dos arquivos parciais (.part)
+def resume_unfinished_jobs():
+    jobs = []
+    for row in journal_call('unfinished') or []:
+        import renditions
+        if row['format'] == renditions.MULTIPLE:  # Download com várias versões
+            job = submit_download(row['url'], 'mp4', 'best', journal_id=row['id'], outputs=renditions.parse_outputs(row['quality']), notify=False)
+        else:
+            job = submit_download(row['url'], row['format'] or 'mp4', row['quality'] or 'best', journal_id=row['id'], notify=False)
+        if job is None:
+            journal_call('set_state', row['id'], JOB_FAILED, "URL não suportada")
+        else:
+            jobs.append(job)
+    if jobs:
+        log_message(f"Retomando {len(jobs)} download(s) interrompido(s).")
+    return jobs
+
+# Número de itens do lote resolvidos à frente dos downloads em andamento
+BATCH_LOOKAHEAD = 2
+
+# Função para ler uma lista de URLs (uma por linha; linhas vazias e iniciadas por # são ignoradas)
+def parse_url_list(text):
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#') and line not in urls:
+            urls.append(line)
+    return urls
+
+# Função para ler uma lista de URLs de um arquivo de texto
+def read_url_file(path):
+    with open(path, encoding='utf-8') as f:
+        return parse_url_list(f.read())
+
+# Função para identificar playlists e canais do YouTube
+def is_youtube_collection(url):
+    if detect_platform(url) != 'youtube':
+        return False
+    parsed_url = urlparse(url)
+    query = dict(parse_qsl(parsed_url.query))
+    if parsed_url.path.startswith('/watch') and 'v' in query:
+        return False  # Vídeo (mesmo que pertença a uma playlist)
+    return parsed_url.path.startswith(('/playlist', '/@', '/channel/', '/c/', '/user/'))
+
+# Função para expandir playlists e canais do YouTube em URLs de vídeos, com extração "flat"
+# (apenas a listagem é consultada, sem resolver cada vídeo)
+def expand_url(url):
+    if not is_youtube_collection(url):
+        return [url]
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+    }
+    with get_ytdl_pool().lease('youtube', ydl_opts) as ydl:
+        info_dict = ydl.extract_info(url, download=False, ie_key=resolve_ie_key(url))
+    urls = []
+    for entry in info_dict.get('entries') or []:
+        entry_url = entry.get('url') or entry.get('webpage_url')
+        if not entry_url:
+            continue
+        if entry.get('_type') in ('playlist', 'url') and entry.get('ie_key') == 'YoutubeTab':
+            urls.extend(expand_url(entry_url))  # Abas do canal (vídeos, shorts, lives)
+        else:
+            urls.append(entry_url)
+    return urls
+
+# Classe que executa um lote de URLs como um pipeline: enquanto o item N é baixado pelo
+# agendador, as informações do item N+1 já estão sendo resolvidas (e ficam no cache compartilhado)
+class BatchRun:
+    def __init__(self, urls, format_choice, quality, lookahead=BATCH_LOOKAHEAD, outputs=None):
+        self.urls = urls
+        self.format_choice = format_choice
+        self.quality = quality
+        self.outputs = outputs  # Várias versões de cada item (ver submit_download)
+        self.jobs = []
+        self.total_items = len(urls)  # Atualizado conforme playlists e canais são expandidos
+        self.completed_items = 0
+        self.failed_items = 0
+        self.skipped_items = 0  # URLs não suportadas
+        self.resolving_done = False
+        self.cancelled = threading.Event()
+        self._expected_bytes = {}  # Tamanho estimado de cada item resolvido
+        self._slots = threading.Semaphore(lookahead + MAX_WORKERS)  # Limita os itens resolvidos à frente
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        threading.Thread(target=self._resolve_items, daemon=True).start()
+
+    # Cancela os itens ainda não submetidos e os downloads do lote
+    def cancel(self):
+        self.cancelled.set()
+        for job in self.jobs:
+            get_scheduler().cancel(job.id)
+
+    # Indica se todos os itens do lote terminaram
+    def is_finished(self):
+        with self._lock:
+            return self.resolving_done and self.completed_items + self.failed_items >= len(self.jobs)
+
+    # Estatísticas agregadas: itens concluídos, bytes baixados, vazão média (bytes/s) e ETA (segundos)
+    def stats(self):
+        with self._lock:
+            downloaded = sum(job.downloaded_bytes for job in self.jobs)
+            known_sizes = [size for size in self._expected_bytes.values() if size]
+            average_size = sum(known_sizes) / len(known_sizes) if known_sizes else 0
+            expected = sum(self._expected_bytes.values()) + average_size * (self.total_items - len(self._expected_bytes))
+            elapsed = max(time.time() - self.started_at, 1e-6)
+            throughput = downloaded / elapsed
+            eta = max(expected - downloaded, 0) / throughput if throughput and expected else None
+            return {
+                'total': self.total_items,
+                'completed': self.completed_items,
+                'failed': self.failed_items,
+                'skipped': self.skipped_items,
+                'downloaded_bytes': downloaded,
+                'throughput': throughput,
+                'eta': eta,
+            }
+
+    def _on_job_done(self, job):
+        with self._lock:
+            if job.state == JOB_DONE:
+                self.completed_items += 1
+            else:
+                self.failed_items += 1
+        self._slots.release()
+
+    def _resolve_items(self):
+        try:
+            for url in self.urls:
+                try:
+                    item_urls = expand_url(url)
+                except Exception as e:
+                    log_message(f"Erro ao expandir a playlist '{url}': {e}")
+                    item_urls = []
+                with self._lock:
+                    self.total_items += len(item_urls) - 1
+                for item_url in item_urls:
+                    self._slots.acquire()  # Aguarda até que haja espaço no pipeline
+                    if self.cancelled.is_set():
+                        return
+                    self._submit_item(item_url)
+        finally:
+            with self._lock:
+                self.resolving_done = True
+                self.total_items = len(self.jobs)
+
+    def _submit_item(self, url):
+        expected_bytes = 0
+        adapter = find_adapter(url)
+        if adapter is not None and adapter.ytdl:
+            try:
+                info_dict = resolve_info(url)  # Resolve as informações enquanto o item anterior é baixado
+                expected_bytes = info_dict.get('filesize') or info_dict.get('filesize_approx') or 0
+            except Exception:
+                pass  # O erro será reportado pelo próprio download
+        job = submit_download(url, self.format_choice, self.quality, outputs=self.outputs, notify=False)
+        if job is None:
+            log_message(f"URL não suportada no lote: {url}")
+            self._slots.release()
+            with self._lock:
+                self.total_items -= 1
+                self.skipped_items += 1
+            return
+        with self._lock:
+            self.jobs.append(job)
+            self._expected_bytes[job.id] = expected_bytes
+        job.add_done_callback(self._on_job_done)
+
+# Banco das inscrições (canais e playlists acompanhados)
+WATCH_PATH = os.path.join('cache', 'watch.sqlite3')
+# Intervalo (s) entre as verificações das fontes com consulta pendente
+WATCH_CHECK_INTERVAL = 60
+_watchlist = None
+_watcher = None
+
+# Função para obter o banco das inscrições compartilhado
+def get_watchlist():
+    global _watchlist
+    with _singletons_lock:
+        if _watchlist is None:
+            import watch
+            _watchlist = watch.WatchList(WATCH_PATH)
+        return _watchlist
+
+# Função para acompanhar um canal ou playlist (intervalo em segundos); retorna o ID da fonte
+# Gera ValueError se a URL não for de uma plataforma baixada pelo yt_dlp
+def watch_source(url, format_choice='mp4', quality='best', interval=None, backfill=False):
+    adapter = find_adapter(url)
+    if adapter is None or not adapter.ytdl:
+        raise ValueError(f"Fonte não suportada para acompanhamento: {url}")
+    import watch
+    return get_watchlist().add_source(url, adapter.platform, format_choice, quality, interval or watch.DEFAULT_INTERVAL, backfill)
+
+# Função para obter as listagens de uma fonte com extração "flat", sem processar as entradas
+# As entradas são consumidas aos poucos (cada página é pedida apenas quando lida); as abas de um canal
+# (vídeos, shorts, lives) são listagens separadas, cada uma dos vídeos mais recentes para os mais antigos
+def iter_feeds(ydl, url, ie_key=None):
+    result = ydl.extract_info(url, download=False, process=False, ie_key=ie_key)
+    while result.get('_type') in ('url', 'url_transparent'):  # Redirecionamento (por exemplo, para a aba de vídeos)
+        result = ydl.extract_info(result['url'], download=False, process=False, ie_key=result.get('ie_key'))
+    entries = iter(result.get('entries') or [])
+    first = next(entries, None)
+    if first is None:
+        return
+    if first.get('_type') in ('playlist', 'url') and first.get('ie_key') == 'YoutubeTab':
+        for tab in itertools.chain([first], entries):
+            yield from iter_feeds(ydl, tab['url'], tab.get('ie_key'))
+    else:
+        yield itertools.chain([first], entries)
+
+# Função para sincronizar uma fonte acompanhada: submete ao agendador apenas os vídeos ainda não vistos
+# Na primeira sincronização (sem `backfill`), os vídeos mais recentes apenas são marcados como vistos
+# Retorna os Jobs criados
+def sync_source(source):
+    import watch
+    watchlist = get_watchlist()
+    source_id, url = source['id'], source['url']
+    baseline = not source['backfill'] and watchlist.seen_count(source_id) == 0
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+    }
+    new_entries = []
+    scanned = 0
+    try:
+        with get_ytdl_pool().lease(source['platform'], ydl_opts) as ydl:
+            for feed in iter_feeds(ydl, url, resolve_ie_key(url)):
+                entries, count = watch.scan_feed(feed, lambda video_id: watchlist.is_seen(source_id, video_id),
+                                                 limit=watch.BASELINE_ENTRIES if baseline else None)
+                new_entries.extend(entries)
+                scanned += count
+    except Exception as e:
+        watchlist.mark_checked(source_id, 0, str(e))
+        log_message(f"Erro ao consultar a fonte acompanhada '{url}': {e}")
+        return []
+
+    if baseline:
+        watchlist.add_seen(source_id, [entry['id'] for entry in new_entries])
+        watchlist.mark_checked(source_id, 0)
+        log_message(f"Acompanhando '{url}': {len(new_entries)} vídeo(s) existente(s) marcado(s) como visto(s).")
+        return []
+
+    jobs = []
+    for entry in reversed(new_entries):  # Do mais antigo para o mais recente
+        entry_url = entry.get('url') or entry.get('webpage_url')
+        job = submit_download(entry_url, source['format'], source['quality'], notify=False) if entry_url else None
+        if job is None:
+            log_message(f"URL não suportada na fonte acompanhada '{url}': {entry_url}")
+        else:
+            jobs.append(job)
+    # Os vídeos submetidos ficam no diário (e são retomados se o aplicativo for fechado)
+    watchlist.add_seen(source_id, [entry['id'] for entry in new_entries])
+    watchlist.mark_checked(source_id, len(jobs))
+    log_message(f"'{url}': {len(jobs)} vídeo(s) novo(s), {scanned} entrada(s) lida(s).")
+    return jobs
+
+# Função para sincronizar as fontes cuja consulta está pendente (ou todas, com `force`); retorna os Jobs criados
+def sync_due_sources(force=False):
+    watchlist = get_watchlist()
+    jobs = []
+    for source in watchlist.sources() if force else watchlist.due_sources():
+        jobs.extend(sync_source(source))
+    return jobs
+
+# Classe que consulta as fontes acompanhadas periodicamente em uma thread de fundo
+class Watcher:
+    def __init__(self, check_interval=WATCH_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Antecipa a próxima verificação (por exemplo, após acompanhar uma nova fonte)
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sync_due_sources()
+            except Exception as e:
+                log_message(f"Erro ao sincronizar as fontes acompanhadas: {e}")
+            self._wakeup.wait(self.check_interval)
+            self._wakeup.clear()
+
+# Função para iniciar (uma única vez) a consulta periódica das fontes acompanhadas
+def start_watching():
+    global _watcher
+    with _singletons_lock:
+        if _watcher is None:
+            _watcher = Watcher()
+        return _watcher
+
+# Função para converter um download em dicionário (respostas do endpoint da instância única)
+def describe_job(job):
+    result = job.result if isinstance(job.result, dict) else {}
+    return {
+        'id': job.id,
+        'label': job.label,
+        'platform': job.platform,
+        'state': job.state,
+        'downloaded_bytes': job.downloaded_bytes,
+        'error': str(job.error) if job.error is not None else None,
+        'path': result.get('path'),
+    }
+
+# Função para iniciar o endpoint local da instância única (instance.py), que recebe downloads de outras execuções
+# `focus` é chamada (na thread do servidor) para trazer a janela para frente; retorna o InstanceServer
+def serve_instance(focus=None, path=None):
+    from instance import INSTANCE_PATH, InstanceServer  # Importação tardia (mantém a importação do engine rápida)
+    return InstanceServer(
+        submit=submit_download,
+        jobs=lambda: get_scheduler().all_jobs(),
+        describe=describe_job,
+        focus=focus,
+        status=pipeline_stats,
+        metrics=lambda: get_metrics().prometheus_text(),
+        path=path or INSTANCE_PATH,
+    )
+
+# Função para formatar um tamanho em bytes
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}"
+        size /= 1024
@@ -0,0 +1,221 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Sessões e downloads em massa do Instagram
+Mantém um conjunto (pool) de instâncias do Instaloader reaproveitadas entre os downloads: cada instância
+guarda a sua sessão (login, cookies) e o controle de limites de requisições do Instaloader, que assim
+valem para todos os posts baixados, em vez de recomeçarem a cada post. As sessões são salvas em arquivos
+e carregadas na próxima execução.
+Funções:
+    parse_instagram_url(url):
+        Identifica o conteúdo de uma URL do Instagram: post, perfil, reels ou destaques de um perfil.
+    session_path(session_dir, username):
+        Caminho do arquivo de sessão de um usuário.
+    iter_media(loader, kind, value):
+        Itera os posts (ou itens dos destaques) de um perfil, com o total quando conhecido.
+    download_items(loader, items, target, on_item, skip):
+        Baixa uma sequência de posts/itens com a mesma instância (mesma sessão e limites de requisições).
+Classes:
+    CancellableRateController:
+        Controle de limites do Instaloader cujas esperas podem ser interrompidas pelo cancelamento do download.
+    InstaloaderPool:
+        Conjunto de instâncias do Instaloader com sessões persistidas.
+"""
+
+# Importações nativas
+import os
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Importações externas
+import instaloader
+
+# Importações locais
+import bandwidth
+
+# Intervalo (s) entre as verificações de cancelamento durante as esperas impostas pelos limites do Instagram
+SLEEP_STEP = 0.5
+# Intervalo mínimo (s) entre as gravações do arquivo de sessão
+SESSION_SAVE_INTERVAL = 300
+
+# Caminhos de URL de posts (/p/, /reel/, /reels/, /tv/), com ou sem o nome do usuário antes
+POST_PATH = re.compile(r'^/(?:[\w.]+/)?(?:p|reel|reels|tv)/([\w-]+)/?$')
+# Caminhos de perfil: /usuário/, /usuário/reels/ e /usuário/highlights/ (destaques, exige login)
+PROFILE_PATH = re.compile(r'^/([\w.]+)/?(?:(reels|highlights)/?)?$')
+# Caminhos reservados do Instagram que não são perfis
+RESERVED_PATHS = {'explore', 'accounts', 'stories', 'direct', 'about', 'legal', 'developer', 'p', 'reel', 'reels', 'tv'}
+
+# Função para identificar o conteúdo de uma URL do Instagram
+# Retorna ('post', shortcode), ('profile', usuário), ('reels', usuário) ou ('highlights', usuário)
+def parse_instagram_url(url):
+    path = urlparse(url.strip()).path
+    match = POST_PATH.match(path)
+    if match:
+        return 'post', match.group(1)
+    match = PROFILE_PATH.match(path)
+    if match and match.group(1).lower() not in RESERVED_PATHS:
+        return match.group(2) or 'profile', match.group(1)
+    raise ValueError(f"URL do Instagram não suportada: {url}")
+
+# Função para obter o caminho do arquivo de sessão de um usuário
+def session_path(session_dir, username):
+    return os.path.join(session_dir, f"session-{username}")
+
+# Classe de controle de limites do Instaloader com esperas interrompíveis
+# O Instaloader conta as requisições por tipo e espera quando o limite do Instagram seria atingido;
+# aqui a espera é dividida em passos para que o cancelamento do download seja atendido
+class CancellableRateController(instaloader.RateController):
+    def __init__(self, context):
+        super().__init__(context)
+        self.check_cancelled = None  # Definida pelo pool enquanto a instância está em uso por um download
+
+    def sleep(self, secs):
+        deadline = time.monotonic() + secs
+        while True:
+            if self.check_cancelled is not None:
+                self.check_cancelled()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(SLEEP_STEP, remaining))
+
+# Classe do conjunto de instâncias do Instaloader
+# `size` instâncias no máximo (o Instagram limita as requisições por sessão: o padrão é 1);
+# com `username`, a sessão salva em `session_dir` é carregada em cada instância
+class InstaloaderPool:
+    def __init__(self, size=1, session_dir=None, username=None, loader_options=None):
+        self.size = size
+        self.session_dir = session_dir
+        self.username = username
+        self.loader_options = dict(loader_options or {})
+        self._idle = queue.LifoQueue()  # Instâncias livres (a mais recente é reutilizada primeiro)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._saved_at = {}  # Instância -> instante da última gravação da sessão
+
+    # Cria uma instância, carregando a sessão salva (se houver)
+    def _create(self):
+        loader = instaloader.Instaloader(rate_controller=CancellableRateController, **self.loader_options)
+        loader.bandwidth_lease = None  # Cota de banda do download que está usando a instância
+        get_raw = loader.context.get_raw
+
+        # Limita a leitura dos arquivos de mídia pela cota de banda do download
+        def throttled_get_raw(url, _attempt=1):
+            response = get_raw(url, _attempt)
+            if loader.bandwidth_lease is not None and not isinstance(response.raw, bandwidth.ThrottledStream):
+                response.raw = bandwidth.ThrottledStream(response.raw, loader.bandwidth_lease)
+            return response
+
+        loader.context.get_raw = throttled_get_raw
+        if self.username and self.session_dir:
+            path = session_path(self.session_dir, self.username)
+            if os.path.exists(path):
+                loader.load_session_from_file(self.username, path)
+        return loader
+
+    # Empresta uma instância para um download; `check_cancelled` interrompe as esperas por limite de requisições
+    # e `bandwidth_lease` limita a banda usada pelos arquivos de mídia
+    @contextmanager
+    def lease(self, check_cancelled=None, bandwidth_lease=None):
+        loader = self._acquire(check_cancelled)
+        loader.bandwidth_lease = bandwidth_lease
+        controller = loader.context._rate_controller
+        if isinstance(controller, CancellableRateController):
+            controller.check_cancelled = check_cancelled
+        try:
+            yield loader
+        finally:
+            if isinstance(controller, CancellableRateController):
+                controller.check_cancelled = None
+            loader.bandwidth_lease = None
+            self._save_session(loader)
+            self._idle.put(loader)
+
+    def _acquire(self, check_cancelled):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    break
+            try:
+                return self._idle.get(timeout=SLEEP_STEP)  # Aguarda uma instância ser devolvida
+            except queue.Empty:
+                if check_cancelled is not None:
+                    check_cancelled()
+        try:
+            return self._create()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    # Faz login com usuário e senha e salva a sessão para as próximas execuções
+    def login(self, username, password):
+        with self.lease() as loader:
+            loader.login(username, password)
+            self.username = username
+            self._save_session(loader, force=True)
+
+    # Salva a sessão da instância (no máximo a cada SESSION_SAVE_INTERVAL segundos)
+    def _save_session(self, loader, force=False):
+        if not self.session_dir or not loader.context.is_logged_in:
+            return
+        now = time.monotonic()
+        if not force and now - self._saved_at.get(id(loader), float('-inf')) < SESSION_SAVE_INTERVAL:
+            return
+        self._saved_at[id(loader)] = now
+        loader.save_session_to_file(session_path(self.session_dir, loader.context.username))
+
+    # Salva as sessões e encerra as instâncias livres
+    def close(self):
+        while True:
+            try:
+                loader = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._save_session(loader, force=True)
+            loader.close()
+
+# Função para iterar o conteúdo de um perfil: posts, reels ou itens dos destaques
+# Retorna (iterador, total), com total None quando não é conhecido antecipadamente
+def iter_media(loader, kind, value):
+    profile = instaloader.Profile.from_username(loader.context, value)
+    if kind == 'profile':
+        return profile.get_posts(), profile.mediacount
+    if kind == 'reels':
+        return profile.get_reels(), None
+    if kind == 'highlights':
+        return (item for highlight in loader.get_highlights(profile) for item in highlight.get_items()), None
+    raise ValueError(f"Tipo de conteúdo do Instagram desconhecido: {kind}")
+
+# Função para indicar se um post tem vídeo (os posts com apenas imagens são ignorados, sem novas requisições)
+def has_video(item):
+    return item.is_video or getattr(item, 'typename', None) == 'GraphSidecar'
+
+# Função para baixar uma sequência de posts/itens com a mesma instância
+# `on_item(item, baixado)` é chamada após cada item; `skip(item)` permite ignorar itens já baixados
+# Retorna o número de itens baixados
+def download_items(loader, items, target, on_item=None, skip=None):
+    downloaded = 0
+    for item in items:
+        if not has_video(item) or (skip is not None and skip(item)):
+            if on_item is not None:
+                on_item(item, False)
+            continue
+        if isinstance(item, instaloader.StoryItem):
+            loader.download_storyitem(item, target)
+        else:
+            loader.download_post(item, target=target)
+        downloaded += 1
+        if on_item is not None:
+            on_item(item, True)
+    return downloaded
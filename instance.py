@@ -0,0 +1,237 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Instância única do Multi Downloader
+A interface em execução atende um endpoint HTTP local (127.0.0.1, porta escolhida pelo sistema) que aceita
+novos downloads e consultas de estado. A porta e um token aleatório ficam em `cache/instance.json`, na pasta do programa; somente
+quem pode ler esse arquivo (o mesmo usuário) consegue usar o endpoint. Uma segunda execução com URLs apenas
+as encaminha à instância em execução e termina: o cliente usa só `socket` e `json`, sem importar a
+interface, o engine ou o yt_dlp, e o encaminhamento leva poucos milissegundos.
+Endpoints (todos exigem o cabeçalho X-Instance-Token):
+    POST /jobs {"urls": [...], "format": "mp4", "quality": "best"}:
+        Submete os downloads; retorna os IDs criados e as URLs não suportadas. Formato ou qualidade
+        inválidos são recusados (400) antes de qualquer submissão.
+    GET /jobs e GET /jobs/ID:
+        Estado dos downloads (fila, execução, bytes baixados, erro, arquivo salvo).
+    GET /status:
+        PID da instância e estatísticas do agendador. POST /focus traz a janela para frente.
+    GET /metrics:
+        Totais das medições no formato de texto do Prometheus.
+Funções:
+    read_instance(path) / request(method, path, body):
+        Leem o arquivo da instância e enviam uma requisição ao endpoint (None se não houver instância em execução).
+    forward(urls, format_choice, quality):
+        Encaminha URLs (ou, sem URLs, um pedido de foco) à instância em execução.
+Classes:
+    InstanceServer:
+        Servidor do endpoint local, executado em uma thread de fundo.
+"""
+
+# Importações nativas
+import json
+import os
+import socket
+
+# Arquivo com o PID, a porta e o token da instância em execução
+# Fica na pasta do programa (e não na pasta atual), para que execuções iniciadas de qualquer pasta o encontrem
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'instance.json')
+# Tempo máximo (s) de espera pela resposta da instância em execução
+CLIENT_TIMEOUT = 5.0
+# Tamanho máximo (bytes) aceito no corpo de uma requisição
+MAX_BODY = 1024 * 1024
+# Cabeçalho com o token da instância
+TOKEN_HEADER = 'X-Instance-Token'
+
+# Função para ler o arquivo da instância; retorna None se ele não existir ou estiver corrompido
+def read_instance(path=INSTANCE_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            info = json.load(f)
+        return info if isinstance(info, dict) and 'port' in info and 'token' in info else None
+    except (OSError, ValueError):
+        return None
+
+# Função para enviar uma requisição à instância em execução
+# Retorna (status HTTP, corpo decodificado) ou None se não houver instância atendendo (arquivo ausente
+# ou antigo, conexão recusada); o cliente é um HTTP/1.0 mínimo sobre `socket` para iniciar rapidamente
+def request(method, path, body=None, instance_path=INSTANCE_PATH, timeout=CLIENT_TIMEOUT):
+    info = read_instance(instance_path)
+    if info is None:
+        return None
+    payload = b'' if body is None else json.dumps(body).encode('utf-8')
+    head = (f"{method} {path} HTTP/1.0\r\nHost: 127.0.0.1\r\n{TOKEN_HEADER}: {info['token']}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n")
+    try:
+        with socket.create_connection(('127.0.0.1', int(info['port'])), timeout=timeout) as connection:
+            connection.sendall(head.encode('ascii') + payload)
+            chunks = []
+            while True:
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except (OSError, ValueError):
+        return None  # Instância encerrada sem remover o arquivo: a execução atual assume o papel
+    response = b''.join(chunks)
+    header, _, content = response.partition(b'\r\n\r\n')
+    try:
+        status = int(header.split(None, 2)[1])
+    except (IndexError, ValueError):
+        return None
+    try:
+        data = json.loads(content) if content.strip() else None
+    except ValueError:
+        data = content.decode('utf-8', 'replace')  # Respostas em texto (por exemplo, /metrics)
+    return status, data
+
+# Função para encaminhar URLs à instância em execução (sem URLs, apenas traz a janela para frente)
+# Retorna a resposta da instância, ou None se nenhuma instância estiver atendendo
+def forward(urls, format_choice='mp4', quality='best', instance_path=INSTANCE_PATH):
+    if not urls:
+        response = request('POST', '/focus', {}, instance_path)
+    else:
+        response = request('POST', '/jobs', {'urls': list(urls), 'format': format_choice, 'quality': quality}, instance_path)
+    if response is None:
+        return None
+    status, data = response
+    if status == 403:
+        return None  # Token diferente (arquivo de outra instância): a execução atual assume o papel
+    return data if isinstance(data, dict) else {}
+
+# Classe do servidor do endpoint local
+# `submit(url, format_choice, quality)` retorna o Job criado (ou None para URLs não suportadas),
+# `jobs()` lista os downloads, `describe(job)` converte um Job em dicionário e `focus()` traz a janela para frente
+class InstanceServer:
+    def __init__(self, submit, jobs, describe, focus=None, status=None, metrics=None, path=INSTANCE_PATH, port=0):
+        # Importações tardias: o cliente (segunda execução) não paga pelo servidor HTTP
+        import secrets
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.path = path
+        self.token = secrets.token_urlsafe(24)
+        self._submit = submit
+        self._jobs = jobs
+        self._describe = describe
+        self._focus = focus
+        self._status = status
+        self._metrics = metrics
+        server = self
+
+        # Classe que atende cada requisição (uma thread por conexão)
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Sem registro das requisições no terminal
+
+            def do_GET(self):
+                if self._authorized():
+                    self._reply(*server.handle('GET', self.path, None))
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    if length > MAX_BODY:
+                        self._reply(413, {'error': "Requisição muito grande"})
+                        return
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self._reply(400, {'error': "JSON inválido"})
+                    return
+                self._reply(*server.handle('POST', self.path, body))
+
+            def _authorized(self):
+                if secrets.compare_digest(self.headers.get(TOKEN_HEADER) or '', server.token):
+                    return True
+                self._reply(403, {'error': "Token inválido"})
+                return False
+
+            def _reply(self, status, data):
+                if isinstance(data, str):
+                    content, content_type = data.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    content, content_type = json.dumps(data).encode('utf-8'), 'application/json'
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        # Apenas a interface local: o endpoint não é acessível por outras máquinas
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._write_instance()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    # Grava o arquivo da instância de forma atômica (arquivo temporário + os.replace), legível só pelo usuário
+    def _write_instance(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'port': self.port, 'token': self.token}, f)
+        os.replace(temp_path, self.path)
+
+    # Executa uma requisição; retorna (status HTTP, resposta)
+    def handle(self, method, path, body):
+        route = path.split('?', 1)[0].rstrip('/')
+        try:
+            if method == 'POST' and route == '/jobs':
+                return self._post_jobs(body)
+            if method == 'GET' and route == '/jobs':
+                return 200, {'jobs': [self._describe(job) for job in self._jobs()]}
+            if method == 'GET' and route.startswith('/jobs/'):
+                job_id = route[len('/jobs/'):]
+                for job in self._jobs():
+                    if str(job.id) == job_id:
+                        return 200, self._describe(job)
+                return 404, {'error': "Download não encontrado"}
+            if method == 'POST' and route == '/focus':
+                if self._focus is not None:
+                    self._focus()
+                return 200, {}
+            if method == 'GET' and route == '/status':
+                return 200, {'pid': os.getpid(), **(self._status() if self._status else {})}
+            if method == 'GET' and route == '/metrics' and self._metrics is not None:
+                return 200, self._metrics()
+        except Exception as e:
+            return 500, {'error': str(e)}
+        return 404, {'error': "Endpoint não encontrado"}
+
+    def _post_jobs(self, body):
+        urls = body.get('urls') if isinstance(body, dict) else None
+        if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+            return 400, {'error': "Informe as URLs em 'urls'"}
+        format_choice = body.get('format') or 'mp4'
+        quality = body.get('quality') or 'best'
+        # Formato e qualidade conferidos com as regras das versões antes de submeter (e registrar no diário)
+        import renditions  # Importação tardia (o cliente da instância não precisa dele)
+        if not isinstance(format_choice, str) or format_choice not in renditions.FORMATS:
+            return 400, {'error': "Formato inválido"}
+        if not renditions.valid_quality(quality):
+            return 400, {'error': "Qualidade inválida"}
+        submitted, rejected = [], []
+        for url in urls:
+            job = self._submit(url.strip(), format_choice, quality)
+            if job is None:
+                rejected.append(url)
+            else:
+                submitted.append(job.id)
+        if self._focus is not None and submitted:
+            self._focus()
+        return 200, {'jobs': submitted, 'rejected': rejected}
+
+    # Encerra o servidor e remove o arquivo da instância (se ele ainda for desta instância)
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        info = read_instance(self.path)
+        if info is not None and info.get('token') == self.token:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
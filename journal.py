@@ -0,0 +1,96 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Diário (journal) de downloads do Multi Downloader
+Registra em um banco SQLite cada download submetido (URL, plataforma, formato, qualidade, pasta e
+arquivo de saída, bytes baixados e fase), com cada alteração gravada em uma transação. Se o aplicativo
+for fechado durante um download, o registro continua pendente e o download é retomado na próxima
+execução a partir dos arquivos parciais; downloads concluídos ou cancelados não são retomados.
+Classes:
+    JobJournal:
+        Acesso ao banco do diário, seguro para uso a partir de várias threads.
+"""
+
+# Importações nativas
+import os
+import sqlite3
+import threading
+import time
+
+# Estados que indicam um download interrompido (retomado na próxima execução)
+PENDING_STATES = ('queued', 'running')
+
+# Classe de acesso ao diário de downloads
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")  # Escritas atômicas e leituras sem bloqueio
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    format TEXT,
+                    quality TEXT,
+                    output_dir TEXT,
+                    output_path TEXT,
+                    bytes_done INTEGER NOT NULL DEFAULT 0,
+                    total_bytes INTEGER,
+                    phase TEXT NOT NULL DEFAULT 'queued',
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+
+    # Executa um comando em uma transação
+    def _execute(self, sql, parameters=()):
+        with self._lock, self._connection:
+            return self._connection.execute(sql, parameters)
+
+    # Registra um download submetido e retorna o seu ID no diário
+    def add(self, url, platform, format_choice=None, quality=None, output_dir=None):
+        now = time.time()
+        cursor = self._execute(
+            "INSERT INTO jobs (url, platform, format, quality, output_dir, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, platform, format_choice, quality, output_dir, now, now))
+        return cursor.lastrowid
+
+    # Atualiza o estado de um download ('queued', 'running', 'done', 'failed' ou 'cancelled')
+    def set_state(self, journal_id, state, error=None):
+        phase = state if state not in PENDING_STATES else None
+        self._execute("UPDATE jobs SET state = ?, phase = COALESCE(?, phase), error = ?, updated_at = ? WHERE id = ?",
+                      (state, phase, error, time.time(), journal_id))
+
+    # Atualiza o progresso de um download: fase ('downloading', 'merging', 'postprocessing'...), bytes e arquivo de saída
+    def update_progress(self, journal_id, phase, bytes_done=None, total_bytes=None, output_path=None):
+        self._execute("""
+            UPDATE jobs SET phase = ?, bytes_done = COALESCE(?, bytes_done), total_bytes = COALESCE(?, total_bytes),
+                output_path = COALESCE(?, output_path), updated_at = ?
+            WHERE id = ?
+        """, (phase, bytes_done, total_bytes, output_path, time.time(), journal_id))
+
+    # Retorna um registro do diário
+    def get(self, journal_id):
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM jobs WHERE id = ?", (journal_id,)).fetchone()
+        return dict(row) if row else None
+
+    # Retorna os downloads interrompidos, na ordem em que foram submetidos
+    def unfinished(self):
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM jobs WHERE state IN ({', '.join('?' * len(PENDING_STATES))}) ORDER BY id", PENDING_STATES).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
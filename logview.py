@@ -0,0 +1,94 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Área de log da interface do Multi Downloader
+A área de log exibe apenas as últimas linhas (buffer circular) e recebe as mensagens em lotes, uma vez por
+ciclo da interface, em vez de uma inserção no widget a cada mensagem. O histórico completo é gravado em
+arquivos rotativos por uma thread de fundo e pode ser pesquisado sem ser carregado no widget.
+Classes:
+    LogRing:
+        Acumula as mensagens de um ciclo e calcula o texto a inserir e as linhas antigas a remover do widget.
+    LogHistory:
+        Grava o histórico em arquivos rotativos (RotatingFileHandler) e pesquisa as linhas gravadas.
+"""
+
+# Importações nativas
+import logging
+import os
+import queue
+from collections import deque
+from logging.handlers import QueueListener, RotatingFileHandler
+
+# Tamanho máximo (bytes) de cada arquivo do histórico e número de arquivos antigos mantidos
+HISTORY_MAX_BYTES = 1024 * 1024
+HISTORY_BACKUPS = 5
+# Número máximo de linhas retornadas por uma pesquisa no histórico (as mais recentes)
+SEARCH_LIMIT = 500
+
+# Classe do buffer circular da área de log
+class LogRing:
+    def __init__(self, max_lines):
+        self.max_lines = max_lines
+        self.visible = 0  # Linhas exibidas no widget
+        self._pending = deque(maxlen=max_lines)  # Linhas ainda não exibidas (em excesso, as mais antigas são descartadas)
+
+    # Acumula uma mensagem para o próximo lote (mensagens com várias linhas ocupam várias linhas)
+    def add(self, message):
+        self._pending.extend(message.split('\n'))
+
+    # Retira o lote acumulado: retorna (texto a inserir no final, linhas a remover do início) ou None se estiver vazio
+    def take_batch(self):
+        if not self._pending:
+            return None
+        lines = list(self._pending)
+        self._pending.clear()
+        trim = max(self.visible + len(lines) - self.max_lines, 0)
+        self.visible += len(lines) - trim
+        return '\n'.join(lines) + '\n', trim
+
+# Classe do histórico do log em arquivos rotativos
+# As gravações são feitas por uma thread de fundo (QueueListener): a thread da interface apenas enfileira as mensagens
+class LogHistory:
+    def __init__(self, path, max_bytes=HISTORY_MAX_BYTES, backups=HISTORY_BACKUPS):
+        self.path = path
+        self.backups = backups
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s', '%Y-%m-%d %H:%M:%S'))
+        self._handler = handler
+        self._queue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    # Enfileira uma mensagem para gravação (com data e hora)
+    def write(self, message):
+        self._queue.put(logging.makeLogRecord({'msg': message.replace('\n', ' | ')}))
+
+    # Aguarda a gravação das mensagens enfileiradas
+    def flush(self):
+        self._listener.stop()  # Processa toda a fila antes de encerrar a thread
+        self._handler.flush()
+        self._listener.start()
+
+    # Pesquisa o texto (sem diferenciar maiúsculas) em todos os arquivos do histórico, do mais antigo ao atual
+    # Retorna (linhas encontradas, total de ocorrências); apenas as `limit` linhas mais recentes são retornadas
+    def search(self, text, limit=SEARCH_LIMIT):
+        self.flush()
+        needle = text.lower()
+        matches = deque(maxlen=limit)
+        total = 0
+        for path in [f"{self.path}.{index}" for index in range(self.backups, 0, -1)] + [self.path]:
+            try:
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    for line in f:  # Leitura linha a linha: o histórico não é carregado inteiro na memória
+                        if needle in line.lower():
+                            matches.append(line.rstrip('\n'))
+                            total += 1
+            except FileNotFoundError:
+                continue
+        return list(matches), total
+
+    def close(self):
+        self._listener.stop()
+        self._handler.close()
@@ -0,0 +1,178 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Métricas dos downloads do Multi Downloader
+Cada download é dividido em fases (fila, resolução da URL, extração das informações, primeiro byte,
+transferência, junção, pós-processamento e finalização), com o tempo de cada uma, os bytes baixados,
+a vazão média e de pico e o número de novas tentativas. Ao final de cada download, as medições são
+acrescentadas a um arquivo JSON lines e os totais por plataforma são reescritos em um arquivo de texto
+no formato do Prometheus (coletado, por exemplo, pelo textfile collector do node_exporter).
+Classes:
+    JobMetrics:
+        Medições de um download: a fase atual é encerrada quando a seguinte começa.
+    MetricsRecorder:
+        Grava as medições dos downloads concluídos e mantém os totais por plataforma.
+"""
+
+# Importações nativas
+import json
+import os
+import threading
+import time
+
+# Fases de um download, na ordem em que ocorrem
+PHASES = ('queued', 'resolve', 'extract', 'first_byte', 'transfer', 'merge', 'postprocess', 'finalize')
+# Fases que antecedem a chegada dos dados (a transferência começa no primeiro byte recebido)
+WAITING_PHASES = ('queued', 'resolve', 'extract', 'first_byte')
+# Prefixo dos nomes das métricas no formato do Prometheus
+PROMETHEUS_PREFIX = 'multidownloader'
+
+# Classe das medições de um download
+class JobMetrics:
+    def __init__(self, job_id, platform, url, submitted_at=None):
+        self.job_id = job_id
+        self.platform = platform
+        self.url = url
+        self.started_at = time.time()  # Instante (época) em que o download saiu da fila
+        self.phases = dict.fromkeys(PHASES, 0.0)  # Fase -> segundos
+        self.phase = 'resolve'
+        self._phase_started_at = time.perf_counter()
+        if submitted_at is not None:
+            self.phases['queued'] = max(self._phase_started_at - submitted_at, 0.0)
+        self.bytes = 0
+        self.peak_throughput = 0.0  # Maior velocidade (bytes/s) informada durante a transferência
+        self.retries = 0  # Novas tentativas de requisições, fragmentos e extração
+
+    # Encerra a fase atual e começa `phase` (o tempo de fases repetidas é somado)
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[self.phase] += now - self._phase_started_at
+        self.phase, self._phase_started_at = phase, now
+
+    # O downloader começou: o tempo até o primeiro byte é contado a partir daqui (apenas no primeiro arquivo)
+    def download_started(self):
+        if self.phase in ('resolve', 'extract'):
+            self.mark('first_byte')
+
+    # Registra um progresso do yt_dlp: o primeiro byte recebido inicia a transferência
+    def on_progress(self, d):
+        if d['status'] != 'downloading':
+            return
+        if self.phase in WAITING_PHASES and d.get('downloaded_bytes'):
+            self.mark('transfer')
+        if d.get('speed'):
+            self.peak_throughput = max(self.peak_throughput, d['speed'])
+
+    def count_retry(self):
+        self.retries += 1
+
+    # Encerra a fase atual e retorna as medições como dicionário
+    def finish(self, state, downloaded_bytes=0, error=None):
+        self.mark(None)
+        self.bytes = downloaded_bytes or 0
+        transfer = self.phases['transfer']
+        return {
+            'job': self.job_id,
+            'url': self.url,
+            'platform': self.platform,
+            'state': state,
+            'error': str(error) if error else None,
+            'started_at': round(self.started_at, 3),
+            'total_seconds': round(sum(self.phases.values()), 4),
+            'phases': {phase: round(seconds, 4) for phase, seconds in self.phases.items()},
+            'bytes': self.bytes,
+            'avg_throughput': round(self.bytes / transfer, 1) if transfer > 0 else None,
+            'peak_throughput': round(max(self.peak_throughput, self.bytes / transfer if transfer > 0 else 0.0), 1),
+            'retries': self.retries,
+        }
+
+# Classe que grava as medições dos downloads concluídos
+class MetricsRecorder:
+    def __init__(self, jsonl_path=None, prometheus_path=None):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._lock = threading.Lock()
+        self.jobs = {}  # (plataforma, estado) -> downloads concluídos
+        self.phase_seconds = {}  # (plataforma, fase) -> segundos
+        self.job_seconds = {}  # Plataforma -> segundos de todos os downloads
+        self.bytes = {}  # Plataforma -> bytes baixados
+        self.retries = {}  # Plataforma -> novas tentativas
+        self.peak_throughput = {}  # Plataforma -> maior vazão de pico (bytes/s)
+        for path in (jsonl_path, prometheus_path):
+            if path:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    # Cria as medições de um download que saiu da fila (`submitted_at` em time.perf_counter)
+    def start(self, job_id, platform, url, submitted_at=None):
+        return JobMetrics(job_id, platform, url, submitted_at)
+
+    # Encerra as medições de um download, acrescenta-as ao arquivo JSON lines e atualiza os totais
+    # Retorna o registro gravado
+    def finish(self, job_metrics, state, downloaded_bytes=0, error=None):
+        record = job_metrics.finish(state, downloaded_bytes, error)
+        platform = record['platform']
+        with self._lock:
+            self.jobs[(platform, state)] = self.jobs.get((platform, state), 0) + 1
+            for phase, seconds in record['phases'].items():
+                self.phase_seconds[(platform, phase)] = self.phase_seconds.get((platform, phase), 0.0) + seconds
+            self.job_seconds[platform] = self.job_seconds.get(platform, 0.0) + record['total_seconds']
+            self.bytes[platform] = self.bytes.get(platform, 0) + record['bytes']
+            self.retries[platform] = self.retries.get(platform, 0) + record['retries']
+            self.peak_throughput[platform] = max(self.peak_throughput.get(platform, 0.0), record['peak_throughput'])
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if self.prometheus_path:
+                self._write_prometheus()
+        return record
+
+    # Tempo médio (s) de cada fase entre todos os downloads concluídos, para identificar onde o tempo é gasto
+    def summary(self):
+        with self._lock:
+            count = sum(self.jobs.values())
+            phases = {phase: sum(seconds for (_, name), seconds in self.phase_seconds.items() if name == phase) / count if count else 0.0
+                      for phase in PHASES}
+            return {'jobs': count, 'phases': phases, 'bytes': sum(self.bytes.values()), 'retries': sum(self.retries.values())}
+
+    # Totais no formato de texto do Prometheus
+    def prometheus_text(self):
+        with self._lock:
+            return self._render_prometheus()
+
+    def _render_prometheus(self):
+        lines = []
+
+        # Acrescenta uma métrica; `samples` contém (sufixo do nome, rótulos, valor)
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+            for suffix, labels, value in sorted(samples):
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{PROMETHEUS_PREFIX}_{name}{suffix}{{{label_text}}} {round(value, 4) if isinstance(value, float) else value}")
+
+        job_counts = {}
+        for (platform, _), count in self.jobs.items():
+            job_counts[platform] = job_counts.get(platform, 0) + count
+
+        metric('jobs_total', 'counter', "Downloads concluídos por plataforma e estado.",
+               [('', (('platform', platform), ('state', state)), count) for (platform, state), count in self.jobs.items()])
+        metric('phase_seconds_total', 'counter', "Tempo gasto em cada fase dos downloads.",
+               [('', (('platform', platform), ('phase', phase)), seconds) for (platform, phase), seconds in self.phase_seconds.items()])
+        metric('job_seconds', 'summary', "Duração dos downloads, da submissão à conclusão.",
+               [sample for platform, seconds in self.job_seconds.items()
+                for sample in (('_sum', (('platform', platform),), seconds), ('_count', (('platform', platform),), job_counts[platform]))])
+        metric('bytes_total', 'counter', "Bytes baixados.",
+               [('', (('platform', platform),), size) for platform, size in self.bytes.items()])
+        metric('retries_total', 'counter', "Novas tentativas de requisições, fragmentos e extração.",
+               [('', (('platform', platform),), count) for platform, count in self.retries.items()])
+        metric('peak_throughput_bytes', 'gauge', "Maior vazão (bytes/s) observada em um download.",
+               [('', (('platform', platform),), rate) for platform, rate in self.peak_throughput.items()])
+        return '\n'.join(lines) + '\n'
+
+    # Reescreve o arquivo do Prometheus de forma atômica (o coletor nunca lê um arquivo incompleto)
+    def _write_prometheus(self):
+        temporary_path = self.prometheus_path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as f:
+            f.write(self._render_prometheus())
+        os.replace(temporary_path, self.prometheus_path)
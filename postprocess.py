@@ -0,0 +1,216 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Estágio de pós-processamento do Multi Downloader
+A conversão para mp3 deixa de ser feita dentro do download: o arquivo de áudio baixado é entregue a
+este estágio, que executa o ffmpeg em um conjunto próprio de threads (uma por núcleo, por padrão), e a
+vaga de download fica livre para o próximo item. O trabalho pesado é feito pelos processos do ffmpeg,
+então as threads apenas os acompanham. Áudio que já chega em mp3 é copiado sem recodificação.
+No modo de transmissão, o ffmpeg recebe o áudio pela entrada padrão enquanto ele é baixado e grava o mp3
+aos poucos: não há arquivo intermediário e a conversão acontece junto com a transferência.
+Funções:
+    audio_command(ffmpeg, source_path, target_path, acodec, bitrate):
+        Monta o comando do ffmpeg: cópia do áudio se o codec já for adequado, recodificação caso contrário.
+    stream_command(ffmpeg, target_path, acodec, bitrate):
+        Monta o comando do ffmpeg que lê o áudio da entrada padrão.
+    merge_command(ffmpeg, video_path, audio_path, target_path):
+        Monta o comando do ffmpeg que junta um fluxo de vídeo e um de áudio já baixados, sem recodificação.
+    needs_encoding(acodec):
+        Indica se o áudio precisa ser recodificado para mp3.
+    can_stream(ext, container):
+        Indica se o contêiner pode ser lido pelo ffmpeg sequencialmente (sem acesso aleatório ao arquivo).
+Classes:
+    PostProcessingStage:
+        Executa as conversões (e as junções das versões de um download com várias versões) em segundo plano e
+        mantém as estatísticas do estágio (fila, execução, tempos).
+    AudioStreamEncoder:
+        Processo do ffmpeg que converte para mp3 o áudio recebido aos poucos.
+"""
+
+# Importações nativas
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Taxa de bits do mp3 gerado (a mesma usada anteriormente pelo FFmpegExtractAudio do yt_dlp)
+AUDIO_BITRATE = '192k'
+# Codecs que já são mp3 e só precisam ser copiados para o arquivo final
+COPY_CODECS = {'mp3'}
+# Intervalo (s) entre as verificações de cancelamento enquanto o ffmpeg é executado
+POLL_INTERVAL = 0.2
+# Extensões de contêineres que o ffmpeg lê sequencialmente (mp4/m4a comuns têm o índice no final do arquivo)
+STREAM_EXTS = {'webm', 'weba', 'mka', 'ogg', 'opus', 'mp3', 'aac', 'flac', 'wav'}
+
+# Erro do ffmpeg durante o pós-processamento
+class PostProcessingError(Exception):
+    pass
+
+# Função para indicar se o áudio precisa ser recodificado para mp3
+def needs_encoding(acodec):
+    return (acodec or '').split('.')[0].lower() not in COPY_CODECS
+
+# Função para montar o comando do ffmpeg que extrai o áudio para mp3
+def audio_command(ffmpeg, source_path, target_path, acodec, bitrate=AUDIO_BITRATE):
+    codec_args = ['-c:a', 'libmp3lame', '-b:a', bitrate] if needs_encoding(acodec) else ['-c:a', 'copy']
+    return [ffmpeg, '-y', '-loglevel', 'error', '-i', source_path, '-vn', *codec_args, target_path]
+
+# Função para montar o comando do ffmpeg que lê o áudio da entrada padrão e grava o mp3 em `target_path`
+# O formato de saída é explícito, pois o arquivo é gravado com um nome temporário (.part)
+def stream_command(ffmpeg, target_path, acodec, bitrate=AUDIO_BITRATE):
+    codec_args = ['-c:a', 'libmp3lame', '-b:a', bitrate] if needs_encoding(acodec) else ['-c:a', 'copy']
+    return [ffmpeg, '-y', '-loglevel', 'error', '-i', 'pipe:0', '-vn', *codec_args, '-f', 'mp3', target_path]
+
+# Função para montar o comando do ffmpeg que junta o vídeo de `video_path` e o áudio de `audio_path` em `target_path`
+# Os fluxos são copiados sem recodificação (como a junção feita pelo yt_dlp com merge_output_format)
+def merge_command(ffmpeg, video_path, audio_path, target_path):
+    return [ffmpeg, '-y', '-loglevel', 'error', '-i', video_path, '-i', audio_path,
+            '-map', '0:v:0', '-map', '1:a:0', '-c', 'copy', target_path]
+
+# Função para indicar se o contêiner pode ser transmitido ao ffmpeg (formatos DASH fragmentados também podem)
+def can_stream(ext, container=None):
+    return (ext or '').lower() in STREAM_EXTS or (container or '').endswith('_dash')
+
+# Classe do estágio de pós-processamento
+class PostProcessingStage:
+    def __init__(self, workers=None, ffmpeg='ffmpeg'):
+        self.workers = workers or os.cpu_count() or 1
+        self.ffmpeg = ffmpeg
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='postprocess')
+        self._lock = threading.Lock()
+        self.queued = 0  # Conversões aguardando uma thread livre
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_time = 0.0  # Tempo total de espera na fila
+        self.work_time = 0.0  # Tempo total de conversão
+
+    # Converte o áudio de `source_path` para mp3 em `target_path` e remove o arquivo original (exceto com
+    # `keep_source`, quando o mesmo arquivo ainda é usado por outras versões)
+    # `check_cancelled` é chamada periodicamente e pode lançar uma exceção para interromper a conversão
+    # Retorna um Future com o caminho do arquivo final
+    def extract_audio(self, source_path, target_path, acodec, check_cancelled=None, keep_source=False):
+        def work():
+            if os.path.abspath(source_path) == os.path.abspath(target_path):
+                return  # O arquivo baixado já é o mp3 final
+            self._execute(audio_command(self.ffmpeg, source_path, target_path, acodec), target_path, check_cancelled)
+            if not keep_source:
+                os.remove(source_path)
+        return self._submit(work, target_path, check_cancelled)
+
+    # Junta um fluxo de vídeo e um de áudio já baixados em `target_path`, sem recodificação e sem remover os
+    # originais (usados também por outras versões). Retorna um Future com o caminho do arquivo final
+    def merge_streams(self, video_path, audio_path, target_path, check_cancelled=None):
+        def work():
+            self._execute(merge_command(self.ffmpeg, video_path, audio_path, target_path), target_path, check_cancelled)
+        return self._submit(work, target_path, check_cancelled)
+
+    # Enfileira um trabalho do estágio (`work` grava `target_path`); retorna um Future com o caminho do arquivo final
+    def _submit(self, work, target_path, check_cancelled):
+        with self._lock:
+            self.queued += 1
+        return self._executor.submit(self._run, time.perf_counter(), work, target_path, check_cancelled)
+
+    # Estatísticas do estágio: profundidade da fila, conversões em execução e tempos médios (s)
+    def stats(self):
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                'workers': self.workers,
+                'queued': self.queued,
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_wait': self.wait_time / finished if finished else 0.0,
+                'avg_time': self.work_time / finished if finished else 0.0,
+            }
+
+    def _run(self, submitted_at, work, target_path, check_cancelled):
+        started_at = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_time += started_at - submitted_at
+        succeeded = False
+        try:
+            if check_cancelled is not None:
+                check_cancelled()
+            work()
+            succeeded = True
+            return target_path
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.work_time += time.perf_counter() - started_at
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    # Executa um comando do ffmpeg que grava `target_path`; o arquivo incompleto é removido em caso de erro
+    def _execute(self, command, target_path, check_cancelled):
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            while True:
+                try:
+                    _, stderr = process.communicate(timeout=POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if check_cancelled is not None:
+                        check_cancelled()
+        except BaseException:
+            process.kill()  # Conversão cancelada: encerra o ffmpeg e descarta o arquivo incompleto
+            process.wait()
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            raise
+        if process.returncode != 0:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            raise PostProcessingError(stderr.decode('utf-8', 'replace').strip() or f"ffmpeg terminou com o código {process.returncode}")
+
+# Classe do processo do ffmpeg que converte para mp3 o áudio recebido aos poucos pela entrada padrão
+# `write` bloqueia quando o ffmpeg está atrasado (o buffer do pipe está cheio), limitando o áudio em memória
+class AudioStreamEncoder:
+    def __init__(self, target_path, acodec, ffmpeg='ffmpeg', bitrate=AUDIO_BITRATE):
+        self.target_path = target_path
+        self.process = subprocess.Popen(stream_command(ffmpeg, target_path, acodec, bitrate),
+                                        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        self._stderr = []
+        # As mensagens de erro são lidas em outra thread para que o ffmpeg nunca bloqueie ao escrevê-las
+        self._stderr_reader = threading.Thread(target=lambda: self._stderr.append(self.process.stderr.read()), daemon=True)
+        self._stderr_reader.start()
+
+    # Entrega mais bytes do áudio ao ffmpeg
+    def write(self, data):
+        try:
+            self.process.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            self.close()  # O ffmpeg terminou antes do fim do áudio: informa o erro dele
+            raise PostProcessingError("ffmpeg terminou antes do fim do áudio")
+
+    # Encerra a entrada e aguarda o ffmpeg gravar o restante do mp3
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+        self._stderr_reader.join()
+        if self.process.returncode != 0:
+            self._remove_target()
+            stderr = b''.join(self._stderr).decode('utf-8', 'replace').strip()
+            raise PostProcessingError(stderr or f"ffmpeg terminou com o código {self.process.returncode}")
+
+    # Interrompe a conversão (download cancelado ou com erro) e descarta o arquivo incompleto
+    def abort(self):
+        self.process.kill()
+        self.process.wait()
+        self._stderr_reader.join()
+        self._remove_target()
+
+    def _remove_target(self):
+        if os.path.exists(self.target_path):
+            os.remove(self.target_path)
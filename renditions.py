@@ -0,0 +1,130 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Várias versões de um mesmo vídeo em um único download
+Um download com várias versões (por exemplo, mp4 em 1080p, mp4 em 720p e mp3) extrai as informações uma vez,
+seleciona os formatos de cada versão e baixa cada fluxo distinto uma única vez: o áudio usado pelos mp4 e pelo
+mp3 é o mesmo arquivo, e versões que selecionam os mesmos formatos compartilham todos os fluxos. Cada versão é
+então montada localmente (junção sem recodificação dos fluxos de vídeo e áudio, ou extração do mp3), com o
+nome de saída de cada formato e qualidade, como nos downloads individuais.
+Este módulo usa apenas a biblioteca padrão; a seleção dos formatos é feita pelo yt_dlp (ytdl.py).
+Funções:
+    parse_outputs(text) / format_outputs(outputs):
+        Convertem a lista de versões ("mp4:1080p,mp4:720p,mp3") em pares (formato, qualidade) e vice-versa.
+    valid_quality(quality):
+        Indica se uma qualidade é aceita (best ou a altura do vídeo, por exemplo 720p).
+    format_spec(format_choice, quality):
+        Especificação de formato do yt_dlp de uma versão (a mesma dos downloads individuais).
+    output_template(directory, format_choice, quality):
+        Modelo de nome de saída de uma versão (a mesma dos downloads individuais).
+    plan_renditions(outputs, selections):
+        Agrupa os formatos selecionados para cada versão em fluxos distintos a baixar.
+    stream_filename(directory, stream):
+        Caminho do arquivo baixado de um fluxo compartilhado.
+    link_or_copy(source_path, target_path):
+        Cria a versão que é o próprio fluxo baixado (link físico ou, se não for possível, cópia).
+Classes:
+    Rendition:
+        Uma versão pedida: formato, qualidade, fluxos usados e extensão do arquivo final.
+"""
+
+# Importações nativas
+import os
+import re
+import shutil
+
+# Formato registrado no diário para os downloads com várias versões (a qualidade guarda a lista de versões)
+MULTIPLE = 'multi'
+# Formatos aceitos em cada versão
+FORMATS = ('mp4', 'mp3')
+
+# Função para indicar se uma qualidade é aceita: best ou a altura do vídeo em pixels (por exemplo 720p)
+def valid_quality(quality):
+    return isinstance(quality, str) and (quality == 'best' or re.fullmatch(r'\d+p', quality) is not None)
+
+# Função para converter a lista de versões em pares (formato, qualidade)
+# Aceita "mp4:1080p,mp4:720p,mp3" (a qualidade padrão é best; a do mp3 é sempre best); versões repetidas são ignoradas
+def parse_outputs(text):
+    outputs = []
+    for item in re.split(r'[,\s]+', text.strip()):
+        if not item:
+            continue
+        format_choice, _, quality = item.lower().partition(':')
+        if format_choice not in FORMATS:
+            raise ValueError(f"Formato inválido: {item}")
+        quality = 'best' if format_choice == 'mp3' or not quality else quality
+        if not valid_quality(quality):
+            raise ValueError(f"Qualidade inválida: {item}")
+        if (format_choice, quality) not in outputs:
+            outputs.append((format_choice, quality))
+    if not outputs:
+        raise ValueError("Informe ao menos uma versão, por exemplo mp4:720p,mp3")
+    return outputs
+
+# Função para converter os pares (formato, qualidade) na lista de versões
+def format_outputs(outputs):
+    return ','.join(format_choice if format_choice == 'mp3' else f"{format_choice}:{quality}" for format_choice, quality in outputs)
+
+# Função para obter a especificação de formato do yt_dlp de uma versão
+def format_spec(format_choice, quality):
+    if format_choice == 'mp3':
+        return 'bestaudio/best'
+    return f"bestvideo[height<={quality[:-1]}]+bestaudio/best" if quality != "best" else "bestvideo+bestaudio/best"
+
+# Função para obter o modelo de nome de saída de uma versão (o formato, e a qualidade no mp4, diferenciam as versões)
+def output_template(directory, format_choice, quality):
+    if format_choice == 'mp3':
+        return os.path.join(directory, f"{format_choice}_[%(id)s]_%(title)s.%(ext)s")
+    return os.path.join(directory, f"{format_choice}_{quality}_[%(id)s]_%(title)s.%(ext)s")
+
+# Classe de uma versão pedida
+# `streams` são os IDs dos fluxos usados: vídeo e áudio separados (junção) ou um único formato com os dois;
+# no mp3, apenas o fluxo que contém o áudio
+class Rendition:
+    def __init__(self, format_choice, quality, streams, ext):
+        self.format_choice = format_choice
+        self.quality = quality
+        self.streams = streams
+        self.ext = ext
+
+    def __repr__(self):
+        return f"Rendition({self.format_choice!r}, {self.quality!r}, {self.streams!r}, {self.ext!r})"
+
+# Função para indicar se um formato contém áudio (formatos sem informação são considerados com áudio)
+def has_audio(stream):
+    return stream.get('acodec') != 'none'
+
+# Função para agrupar os formatos selecionados em fluxos distintos
+# `selections[i]` são os formatos selecionados pelo yt_dlp para `outputs[i]` (vídeo e áudio ou um único formato)
+# Retorna (fluxos por ID, na ordem do primeiro uso, e a lista de versões)
+def plan_renditions(outputs, selections):
+    streams = {}
+    renditions = []
+    for (format_choice, quality), selected in zip(outputs, selections):
+        for stream in selected:
+            streams.setdefault(stream['format_id'], stream)
+        if format_choice == 'mp3':
+            # Fluxo com o áudio (o próprio formato de áudio, ou o vídeo com áudio quando não há um formato só de áudio)
+            source = next((stream for stream in selected if has_audio(stream)), selected[0])
+            renditions.append(Rendition(format_choice, quality, [source['format_id']], 'mp3'))
+        elif len(selected) > 1:
+            renditions.append(Rendition(format_choice, quality, [stream['format_id'] for stream in selected], 'mp4'))
+        else:
+            renditions.append(Rendition(format_choice, quality, [selected[0]['format_id']], selected[0].get('ext') or 'mp4'))
+    return streams, renditions
+
+# Função para obter o caminho do arquivo baixado de um fluxo compartilhado
+def stream_filename(directory, stream):
+    format_id = re.sub(r'[^\w.-]', '_', str(stream['format_id']))
+    return os.path.join(directory, f"{format_id}.{stream.get('ext') or 'bin'}")
+
+# Função para criar a versão que é o próprio fluxo baixado, sem ocupar espaço em disco quando possível
+def link_or_copy(source_path, target_path):
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copyfile(source_path, target_path)  # Outro sistema de arquivos ou sem suporte a links físicos
+    return target_path
@@ -0,0 +1,197 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Novas tentativas do Multi Downloader
+As falhas são classificadas em temporárias (rede instável, erros 5xx, respostas truncadas ou JSON inválido),
+limitação de requisições (429/503, "Too Many Requests") e permanentes (vídeo indisponível ou privado, URL não
+suportada). As duas primeiras são repetidas automaticamente com espera exponencial e variação aleatória
+(jitter), que evita que vários downloads repitam a requisição ao mesmo tempo; a limitação de requisições
+espera mais e respeita o cabeçalho Retry-After. Falhas permanentes e desconhecidas não são repetidas.
+Este módulo usa apenas a biblioteca padrão e não importa o yt_dlp nem o instaloader: as exceções deles são
+reconhecidas pelo nome, pelo código HTTP e pela mensagem, percorrendo as causas encadeadas.
+Funções:
+    classify_error(error):
+        Classifica uma falha; retorna (tipo, espera pedida pelo servidor em segundos ou None).
+    describe_error(error):
+        Mensagem da falha para o usuário, indicando quando ela é temporária.
+    run_with_retry(func, policy, on_retry, wait):
+        Executa a função repetindo-a nas falhas temporárias e na limitação de requisições.
+Classes:
+    RetryPolicy:
+        Número de tentativas e cálculo da espera entre elas (exponencial com jitter).
+"""
+
+# Importações nativas
+import random
+import time
+
+# Tipos de falha
+TRANSIENT = 'transient'
+THROTTLED = 'throttled'
+PERMANENT = 'permanent'
+
+# Número padrão de tentativas (a primeira e as repetições)
+MAX_ATTEMPTS = 4
+# Espera base (s) antes da primeira repetição; dobra a cada tentativa
+BASE_DELAY = 2.0
+# Espera base (s) na limitação de requisições
+THROTTLED_DELAY = 15.0
+# Espera máxima (s) entre duas tentativas
+MAX_DELAY = 120.0
+# Fração da espera usada nas requisições repetidas pelo próprio yt_dlp (uma página, intervalo ou fragmento)
+REQUEST_DELAY_SCALE = 0.25
+
+# Códigos HTTP de cada tipo de falha (os demais 4xx são permanentes)
+TRANSIENT_STATUS = {408, 500, 502, 504, 520, 521, 522, 523, 524}
+THROTTLED_STATUS = {429, 503}
+# Exceções reconhecidas pelo nome da classe ou de uma classe base (yt_dlp, urllib, http.client, instaloader)
+TRANSIENT_TYPES = {
+    'ConnectionError', 'TimeoutError', 'JSONDecodeError', 'IncompleteRead', 'RemoteDisconnected',
+    'ContentTooShortError', 'TransportError', 'ConnectionException', 'RangeNotSupported',
+}
+THROTTLED_TYPES = {'TooManyRequestsException'}
+PERMANENT_TYPES = {
+    'UnsupportedError', 'GeoRestrictedError', 'QueryReturnedNotFoundException', 'LoginRequiredException',
+    'PrivateProfileNotFollowedException', 'ProfileNotExistsException', 'PostProcessingError', 'PermissionError',
+    'FileNotFoundError', 'JobCancelled',
+}
+# Trechos de mensagens de cada tipo de falha (em minúsculas), verificados quando o tipo não é reconhecido
+THROTTLED_MESSAGES = ('too many requests', 'rate limit', 'rate-limit', 'http error 429', 'please wait a few minutes')
+PERMANENT_MESSAGES = (
+    'unsupported url', 'video unavailable', 'private video', 'this video is not available', 'has been removed',
+    'does not exist', 'requested format is not available', 'no video formats found', 'sign in to confirm your age',
+    'members-only', 'login required', 'video not found', 'user not found', 'post not found',
+)
+TRANSIENT_MESSAGES = (
+    'jsondecodeerror', 'timed out', 'timeout', 'connection reset', 'connection aborted', 'connection refused',
+    'remote end closed', 'temporarily unavailable', 'temporary failure', 'incomplete read', 'network is unreachable',
+    'unable to download', 'conexão encerrada', 'bad gateway', 'service unavailable',
+)
+
+# Função para percorrer a falha e as suas causas (DownloadError do yt_dlp guarda a original em exc_info,
+# ExtractorError em cause; exceções encadeadas em __cause__ e __context__)
+def iter_causes(error):
+    seen = set()
+    pending = [error]
+    while pending:
+        current = pending.pop(0)
+        if current is None or id(current) in seen or not isinstance(current, BaseException):
+            continue
+        seen.add(id(current))
+        yield current
+        exc_info = getattr(current, 'exc_info', None)
+        if isinstance(exc_info, tuple) and len(exc_info) > 1:
+            pending.append(exc_info[1])
+        pending.extend((getattr(current, 'cause', None), current.__cause__, current.__context__))
+
+# Função para obter o código HTTP de uma exceção (yt_dlp: status; urllib: code)
+def http_status(error):
+    for attribute in ('status', 'code'):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int) and 400 <= value < 600:
+            return value
+    return None
+
+# Função para obter a espera (s) pedida pelo servidor no cabeçalho Retry-After (apenas o formato em segundos)
+def retry_after(error):
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or getattr(error, 'headers', None)
+    try:
+        value = headers.get('Retry-After') if headers is not None else None
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+# Função para classificar uma falha; retorna (tipo, espera pedida pelo servidor ou None)
+# O código HTTP e o tipo da exceção (também das causas encadeadas, como a falha de rede guardada pelo DownloadError
+# do yt_dlp) têm precedência sobre a mensagem; falhas desconhecidas são permanentes
+def classify_error(error):
+    causes = list(iter_causes(error))
+    for cause in causes:
+        status = http_status(cause)
+        if status in THROTTLED_STATUS:
+            return THROTTLED, retry_after(cause)
+        if status in TRANSIENT_STATUS:
+            return TRANSIENT, retry_after(cause)
+        if status is not None:
+            return PERMANENT, None
+    names = {cls.__name__ for cause in causes for cls in type(cause).__mro__}  # Inclui as classes base
+    if names & PERMANENT_TYPES:
+        return PERMANENT, None
+    if names & THROTTLED_TYPES:
+        return THROTTLED, None
+    if names & TRANSIENT_TYPES:
+        return TRANSIENT, None
+    message = ' '.join(str(cause) for cause in causes).lower()
+    if any(text in message for text in THROTTLED_MESSAGES):
+        return THROTTLED, None
+    if any(text in message for text in PERMANENT_MESSAGES):
+        return PERMANENT, None
+    if any(text in message for text in TRANSIENT_MESSAGES):
+        return TRANSIENT, None
+    return PERMANENT, None
+
+# Descrição de cada tipo de falha nas mensagens ao usuário
+KIND_LABELS = {
+    TRANSIENT: "falha temporária de rede ou do site",
+    THROTTLED: "o site limitou o número de requisições",
+}
+
+# Função para descrever uma falha ao usuário
+def describe_error(error):
+    kind, _ = classify_error(error)
+    if kind == PERMANENT:
+        return str(error)
+    return f"{error} ({KIND_LABELS[kind]}; por favor, tente novamente mais tarde)"
+
+# Classe que define o número de tentativas e a espera entre elas
+class RetryPolicy:
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, throttled_delay=THROTTLED_DELAY,
+                 max_delay=MAX_DELAY, rng=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.throttled_delay = throttled_delay
+        self.max_delay = max_delay
+        self._random = rng or random.Random()
+
+    # Indica se uma falha do tipo informado deve ser repetida após `attempt` tentativas (contadas a partir de 1)
+    def should_retry(self, kind, attempt):
+        return kind != PERMANENT and attempt < self.max_attempts
+
+    # Espera (s) antes da repetição seguinte à tentativa `attempt` (contada a partir de 1)
+    # Jitter "igual": metade da espera exponencial é fixa e a outra metade é sorteada, de modo que as esperas
+    # crescem com as tentativas, mas repetições simultâneas de vários downloads se espalham no tempo
+    def backoff(self, attempt, kind=TRANSIENT, server_delay=None):
+        base = self.throttled_delay if kind == THROTTLED else self.base_delay
+        ceiling = min(self.max_delay, base * 2 ** max(attempt - 1, 0))
+        delay = ceiling / 2 + self._random.uniform(0, ceiling / 2)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.max_delay))
+        return delay
+
+    # Cria uma função de espera para as repetições internas do yt_dlp (opção retry_sleep_functions), que a
+    # chama com o número da repetição (a partir de 0); `on_retry` é chamada a cada repetição
+    def sleep_function(self, kind=TRANSIENT, on_retry=None, scale=REQUEST_DELAY_SCALE):
+        def sleep(n):
+            if on_retry is not None:
+                on_retry()
+            return self.backoff(n + 1, kind) * scale
+        return sleep
+
+# Função para executar `func` repetindo-a nas falhas temporárias e na limitação de requisições
+# `on_retry(tentativa, tipo, espera, falha)` é chamada antes de cada espera; `wait(segundos)` aguarda e pode
+# lançar exceções para interromper (por exemplo, cancelamento). A última falha é lançada se as tentativas acabarem
+def run_with_retry(func, policy, on_retry=None, wait=time.sleep):
+    attempt = 1
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            kind, server_delay = classify_error(e)
+            if not policy.should_retry(kind, attempt):
+                raise
+            delay = policy.backoff(attempt, kind, server_delay)
+            if on_retry is not None:
+                on_retry(attempt, kind, delay, e)
+            wait(delay)
+            attempt += 1
@@ -0,0 +1,372 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Download segmentado do Multi Downloader
+Baixa um arquivo HTTP progressivo usando várias conexões simultâneas, cada uma responsável por um
+intervalo de bytes (requisições Range), escrevendo cada intervalo na sua posição do arquivo final.
+O arquivo resultante é idêntico, byte a byte, ao obtido com uma única conexão.
+Este módulo usa apenas a biblioteca padrão; a integração com o yt_dlp fica em `ytdl.py`.
+Funções:
+    urllib_opener(url, headers=None):
+        Cria uma função que abre um intervalo de bytes da URL usando urllib.
+    probe_size(open_range):
+        Verifica se o servidor aceita requisições Range e retorna o tamanho total do arquivo.
+    plan_segments(total_size, connections):
+        Divide o arquivo em intervalos, um por conexão.
+    download_ranges(open_range, filename, total_size, connections, state_path=None):
+        Baixa os intervalos em paralelo e informa o progresso na thread que fez a chamada. Com `state_path`,
+        o progresso de cada intervalo é salvo periodicamente e um download interrompido é retomado de onde parou.
+        O restante de um intervalo muito mais lento que os demais é requisitado novamente em outra conexão (hedging).
+    stream_ranges(open_range, total_size, write, connections):
+        Baixa o arquivo em blocos paralelos e entrega os bytes, em ordem, a `write` enquanto chegam (sem
+        arquivo intermediário), com no máximo alguns blocos em memória. Um bloco muito mais lento que os
+        demais é requisitado novamente em outra conexão (hedging), reduzindo a latência de cauda.
+"""
+
+# Importações nativas
+import json
+import os
+import threading
+import time
+import urllib.request
+
+# Número padrão de conexões por arquivo
+DEFAULT_CONNECTIONS = 4
+# Tamanho mínimo de cada intervalo: arquivos pequenos não compensam várias conexões
+MIN_SEGMENT_SIZE = 1024 * 1024
+# Tamanho de cada leitura da resposta
+READ_SIZE = 64 * 1024
+# Tamanho de cada bloco baixado por stream_ranges (cada bloco é uma requisição)
+STREAM_BLOCK_SIZE = 2 * 1024 * 1024
+# Um bloco (ou o restante de um intervalo) é requisitado novamente em outra conexão quando demora mais que
+# HEDGE_FACTOR vezes a mediana dos já concluídos (no mínimo HEDGE_MIN_DELAY segundos, com pelo menos
+# HEDGE_MIN_SAMPLES concluídos)
+HEDGE_FACTOR = 3.0
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MIN_SAMPLES = 2
+# Espera máxima (s) pelo encerramento de cada conexão ao final de um download com requisições duplicadas
+HEDGE_JOIN_TIMEOUT = 0.5
+
+# Exceção lançada quando o servidor ignora o cabeçalho Range
+class RangeNotSupported(Exception):
+    pass
+
+# Função para criar uma função que abre o intervalo [start, end] (inclusivo) da URL usando urllib
+def urllib_opener(url, headers=None, timeout=30):
+    def open_range(start, end):
+        range_header = f"bytes={start}-{end}" if end is not None else f"bytes={start}-"
+        request = urllib.request.Request(url, headers={**(headers or {}), 'Range': range_header})
+        return urllib.request.urlopen(request, timeout=timeout)
+    return open_range
+
+# Função para obter o código de status de uma resposta (urllib ou yt_dlp)
+def response_status(response):
+    return getattr(response, 'status', None) or response.getcode()
+
+# Função para verificar se o servidor aceita requisições Range
+# Retorna o tamanho total do arquivo, ou None se não for possível baixá-lo em intervalos
+def probe_size(open_range):
+    with open_range(0, 0) as response:
+        content_range = response.headers.get('Content-Range') or ''
+        if response_status(response) != 206 or '/' not in content_range:
+            return None
+        total_size = content_range.rsplit('/', 1)[-1].strip()
+        return int(total_size) if total_size.isdigit() else None
+
+# Função para dividir o arquivo em intervalos [início, fim] (inclusivos), um por conexão
+def plan_segments(total_size, connections, min_segment_size=MIN_SEGMENT_SIZE):
+    connections = max(1, min(connections, total_size // min_segment_size or 1))
+    segment_size = -(-total_size // connections)  # Divisão arredondada para cima
+    return [(start, min(start + segment_size, total_size) - 1) for start in range(0, total_size, segment_size)]
+
+# Função para carregar o progresso salvo de um download interrompido
+# Retorna os intervalos e os bytes já baixados de cada um, ou None se o estado não corresponder ao arquivo
+def load_state(state_path, filename, total_size):
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state['total_size'] != total_size or os.path.getsize(filename) != total_size:
+            return None
+        return [(start, end) for start, end, _ in state['segments']], [done for _, _, done in state['segments']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+# Função para salvar o progresso de cada intervalo (substituição atômica do arquivo de estado)
+def save_state(state_path, total_size, segments, downloaded):
+    temp_path = state_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'total_size': total_size, 'segments': [[start, end, done] for (start, end), done in zip(segments, downloaded)]}, f)
+    os.replace(temp_path, state_path)
+
+# Função para baixar um arquivo em intervalos paralelos
+# `open_range(início, fim)` deve retornar a resposta do intervalo; `chunk_size` limita o tamanho de
+# cada requisição (alguns sites limitam a velocidade de requisições grandes); `on_progress(baixados, total)`
+# é chamada periodicamente na thread que fez a chamada e pode lançar exceções para interromper o download
+# Requisições duplicadas (hedging): se um intervalo demorar mais que `hedge_factor` vezes o esperado pela mediana
+# do tempo por byte dos intervalos já concluídos, o restante dele é requisitado novamente em outra conexão e vale a
+# primeira a terminar (as duas gravam os mesmos bytes nas mesmas posições). `on_hedge(índice)` é chamada a cada
+# requisição duplicada e `hedge_factor=None` desativa o recurso
+def download_ranges(open_range, filename, total_size, connections=DEFAULT_CONNECTIONS, chunk_size=None,
+                    on_progress=None, progress_interval=0.2, min_segment_size=MIN_SEGMENT_SIZE, state_path=None,
+                    hedge_factor=HEDGE_FACTOR, hedge_min_delay=HEDGE_MIN_DELAY, on_hedge=None):
+    resumed = load_state(state_path, filename, total_size) if state_path else None
+    if resumed is not None:
+        segments, downloaded = resumed  # Retoma cada intervalo a partir dos bytes já gravados
+    else:
+        segments = plan_segments(total_size, connections, min_segment_size)
+        downloaded = [0] * len(segments)
+        with open(filename, 'wb') as f:
+            f.truncate(total_size)  # Reserva o tamanho final para que cada conexão escreva na sua posição
+    # Bytes que faltavam em cada intervalo no início (base do tempo esperado de cada um)
+    pending = [end - start + 1 - done for (start, end), done in zip(segments, downloaded)]
+    errors = []
+    stop = threading.Event()
+    finished = threading.Event()  # Sinalizado quando todos os intervalos terminam (ou em caso de erro)
+    done = set(index for index, size in enumerate(pending) if size <= 0)  # Intervalos concluídos
+    seconds_per_byte = []  # Tempo por byte dos intervalos concluídos (base para identificar um intervalo atrasado)
+    hedged = set()
+    lock = threading.Lock()
+    started_at = time.monotonic()
+    if len(done) == len(segments):
+        finished.set()
+
+    # Sem buffer: os bytes contabilizados em `downloaded` já foram entregues ao sistema operacional
+    # O arquivo é compartilhado pelas conexões (posicionamento e escrita sob o lock) e fechado apenas pela
+    # thread que fez a chamada, de modo que uma conexão atrasada nunca o mantém aberto após o fim do download
+    output = open(filename, 'r+b', buffering=0)
+
+    # Baixa o intervalo a partir dos bytes já gravados; a requisição duplicada usa a mesma função
+    # e quem chegar primeiro ao fim conclui o intervalo (os bytes gravados por ambas são idênticos)
+    def fetch_segment(index):
+        start, end = segments[index]
+        with lock:
+            position = start + downloaded[index]
+        while position <= end and not stop.is_set() and index not in done:
+            request_end = end if not chunk_size else min(end, position + chunk_size - 1)
+            with open_range(position, request_end) as response:
+                if response_status(response) != 206:
+                    raise RangeNotSupported(f"O servidor ignorou o intervalo {position}-{request_end}")
+                while position <= request_end:
+                    data = response.read(min(READ_SIZE, request_end - position + 1))
+                    if not data:
+                        raise OSError(f"Conexão encerrada no byte {position} do intervalo {start}-{end}")
+                    with lock:
+                        if stop.is_set() or index in done:
+                            return  # Outra requisição concluiu o intervalo, ou o download foi interrompido
+                        output.seek(position)
+                        view = memoryview(data)
+                        while view:
+                            written = output.write(view)
+                            view = view[written:]
+                        position += len(data)
+                        # Os bytes de cada requisição são contíguos e começam antes do fim dos bytes da outra:
+                        # o trecho concluído a partir do início do intervalo é o maior dos dois
+                        downloaded[index] = max(downloaded[index], position - start)
+        with lock:
+            if index not in done and position > end:
+                done.add(index)
+                seconds_per_byte.append((time.monotonic() - started_at) / pending[index])
+                if len(done) == len(segments):
+                    finished.set()
+
+    def download_segment(index):
+        try:
+            fetch_segment(index)
+        except Exception as e:
+            with lock:
+                if index in done:
+                    return  # A requisição duplicada já concluiu o intervalo
+            errors.append(e)
+            stop.set()  # Interrompe as demais conexões
+            finished.set()
+
+    # Requisição duplicada de um intervalo atrasado: as suas falhas são ignoradas (a requisição original continua)
+    def hedge_segment(index):
+        try:
+            fetch_segment(index)
+        except Exception:
+            pass
+
+    # Verifica se um intervalo está atrasado em relação à mediana do tempo por byte dos intervalos concluídos
+    def is_lagging(index):
+        if hedge_factor is None or index in done or index in hedged or len(seconds_per_byte) < HEDGE_MIN_SAMPLES:
+            return False
+        median = sorted(seconds_per_byte)[len(seconds_per_byte) // 2]
+        return time.monotonic() - started_at > max(hedge_factor * median * pending[index], hedge_min_delay)
+
+    threads = [threading.Thread(target=download_segment, args=(index,), daemon=True)
+               for index in range(len(segments)) if index not in done]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while not finished.wait(progress_interval):
+            with lock:
+                lagging = [index for index in range(len(segments)) if is_lagging(index)]
+                hedged.update(lagging)
+            for index in lagging:
+                thread = threading.Thread(target=hedge_segment, args=(index,), daemon=True)
+                threads.append(thread)
+                thread.start()
+                if on_hedge is not None:
+                    on_hedge(index)
+            if state_path:
+                with lock:
+                    save_state(state_path, total_size, segments, downloaded)
+            if on_progress is not None and not stop.is_set():
+                on_progress(sum(downloaded), total_size)
+    except BaseException:
+        stop.set()  # Interrupção pedida pelo on_progress (por exemplo, cancelamento)
+        raise
+    finally:
+        stop.set()  # Encerra as requisições que perderam para as duplicadas
+        for thread in threads:
+            # Uma conexão presa em um intervalo que a requisição duplicada já concluiu não é aguardada: ela termina
+            # sozinha (thread daemon) ao receber os próximos bytes, sem gravá-los, ou no tempo limite da conexão
+            thread.join(None if not hedged else HEDGE_JOIN_TIMEOUT)
+        with lock:
+            output.close()
+            if state_path and (errors or len(done) < len(segments)):
+                save_state(state_path, total_size, segments, downloaded)  # Permite retomar depois
+
+    if errors:
+        raise errors[0]
+    if state_path and os.path.exists(state_path):
+        os.remove(state_path)
+    if on_progress is not None:
+        on_progress(total_size, total_size)
+    return total_size
+
+# Função para baixar um arquivo em blocos paralelos entregando os bytes em ordem a `write(bytes)`
+# As conexões baixam os blocos seguintes enquanto `write` consome o atual; no máximo 2 * `connections` blocos
+# ficam em memória (se `write` for mais lenta que a rede, as conexões aguardam). `on_progress(baixados, total)`
+# é chamada na thread que fez a chamada, assim como `write`, e ambas podem lançar exceções para interromper o download
+# Requisições duplicadas (hedging): se o próximo bloco a entregar demorar mais que `hedge_factor` vezes a mediana
+# dos blocos já concluídos, uma segunda requisição do mesmo bloco é feita em outra conexão e vale a primeira a
+# terminar; um único bloco lento não segura mais a entrega de todos os seguintes. `on_hedge(índice)` é chamada a
+# cada requisição duplicada e `hedge_factor=None` desativa o recurso
+def stream_ranges(open_range, total_size, write, connections=DEFAULT_CONNECTIONS, block_size=STREAM_BLOCK_SIZE,
+                  on_progress=None, progress_interval=0.2, hedge_factor=HEDGE_FACTOR, hedge_min_delay=HEDGE_MIN_DELAY,
+                  on_hedge=None):
+    blocks = [(start, min(start + block_size, total_size) - 1) for start in range(0, total_size, block_size)]
+    window = 2 * max(connections, 1)  # Blocos baixados à frente do bloco sendo entregue
+    ready = {}  # Índice do bloco -> bytes baixados ainda não entregues
+    completed = set()  # Blocos já baixados por alguma requisição (a duplicada que perder é descartada)
+    received = {}  # Índice do bloco -> maior número de bytes recebidos por uma requisição ainda em andamento
+    started = {}  # Índice do bloco -> instante em que a primeira requisição começou
+    durations = []  # Duração dos blocos concluídos (base para identificar um bloco atrasado)
+    hedged = set()
+    state = {'next': 0, 'delivered': 0, 'downloaded': 0}
+    errors = []
+    stop = threading.Event()
+    condition = threading.Condition()
+
+    # Baixa um bloco; retorna False se outra requisição o concluiu antes
+    def fetch_block(index):
+        start, end = blocks[index]
+        data = bytearray()
+        with open_range(start, end) as response:
+            if response_status(response) != 206:
+                raise RangeNotSupported(f"O servidor ignorou o intervalo {start}-{end}")
+            while len(data) <= end - start and not stop.is_set():
+                chunk = response.read(min(READ_SIZE, end - start + 1 - len(data)))
+                if not chunk:
+                    raise OSError(f"Conexão encerrada no byte {start + len(data)} do bloco {start}-{end}")
+                data += chunk
+                with condition:
+                    if index in completed:
+                        return False
+                    received[index] = max(received.get(index, 0), len(data))
+        with condition:
+            if index in completed or stop.is_set():
+                return False
+            completed.add(index)
+            state['downloaded'] += len(data)
+            received.pop(index, None)
+            durations.append(time.monotonic() - started[index])
+            ready[index] = data
+            condition.notify_all()
+        return True
+
+    def download_blocks():
+        try:
+            while True:
+                with condition:
+                    while (state['next'] < len(blocks) and state['next'] >= state['delivered'] + window
+                           and not stop.is_set()):
+                        condition.wait()  # Aguarda a entrega dos blocos anteriores
+                    if stop.is_set() or state['next'] >= len(blocks):
+                        return
+                    index = state['next']
+                    state['next'] += 1
+                    started[index] = time.monotonic()
+                try:
+                    fetch_block(index)
+                except Exception:
+                    with condition:
+                        if index in completed:
+                            continue  # A requisição duplicada já entregou o bloco
+                    raise
+        except Exception as e:
+            errors.append(e)
+            stop.set()  # Interrompe as demais conexões
+            with condition:
+                condition.notify_all()
+
+    # Requisição duplicada de um bloco atrasado: as suas falhas são ignoradas (a requisição original continua)
+    def hedge_block(index):
+        try:
+            fetch_block(index)
+        except Exception:
+            pass
+
+    # Verifica se o bloco aguardado está atrasado em relação à mediana dos blocos concluídos
+    def is_lagging(index):
+        if hedge_factor is None or index in hedged or index not in started or len(durations) < HEDGE_MIN_SAMPLES:
+            return False
+        median = sorted(durations)[len(durations) // 2]
+        return time.monotonic() - started[index] > max(hedge_factor * median, hedge_min_delay)
+
+    threads = [threading.Thread(target=download_blocks, daemon=True) for _ in range(min(max(connections, 1), len(blocks)))]
+    for thread in threads:
+        thread.start()
+
+    try:
+        index = 0
+        reported_at = time.monotonic()
+        while index < len(blocks) and not stop.is_set():
+            with condition:
+                if index not in ready:
+                    condition.wait(min(progress_interval, hedge_min_delay))
+                data = ready.pop(index, None)
+                if data is not None:
+                    state['delivered'] = index + 1  # Libera a janela para o próximo bloco
+                    condition.notify_all()
+                elif is_lagging(index):
+                    hedged.add(index)
+                    threading.Thread(target=hedge_block, args=(index,), daemon=True).start()
+                    if on_hedge is not None:
+                        on_hedge(index)
+            if data is not None:
+                write(bytes(data))  # Fora do lock: as conexões continuam enquanto os bytes são consumidos
+                index += 1
+            if on_progress is not None and time.monotonic() - reported_at >= progress_interval:
+                reported_at = time.monotonic()
+                with condition:
+                    downloaded = state['downloaded'] + sum(received.values())
+                on_progress(downloaded, total_size)
+    finally:
+        stop.set()  # Encerra as conexões (também ao interromper pelo on_progress ou pelo write)
+        with condition:
+            condition.notify_all()
+        for thread in threads:
+            # Uma conexão presa no bloco que a requisição duplicada já entregou não é aguardada: ela termina
+            # sozinha (thread daemon) ao receber os próximos bytes ou no tempo limite da conexão
+            thread.join(None if not hedged else HEDGE_JOIN_TIMEOUT)
+
+    if errors:
+        raise errors[0]
+    if on_progress is not None:
+        on_progress(total_size, total_size)
+    return total_size
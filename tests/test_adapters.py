@@ -0,0 +1,63 @@
+import unittest
+
+import adapters
+from adapters import PlatformAdapter, find_adapter
+
+class TestAdapters(unittest.TestCase):
+
+    def test_hosts_are_matched_by_domain(self):
+        cases = {
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ': 'youtube',
+            'https://music.youtube.com/watch?v=dQw4w9WgXcQ': 'youtube',
+            'https://youtu.be/dQw4w9WgXcQ': 'youtube',
+            'https://mobile.twitter.com/user/status/1': 'twitter',
+            'https://X.com:443/user/status/1': 'twitter',
+            'https://m.facebook.com/watch/?v=1': 'facebook',
+            'https://www.instagram.com/p/abc/': 'instagram',
+            # Subdomínios das plataformas aceitos pelos extratores do yt_dlp
+            'https://business.facebook.com/pagina/videos/1234567890/': 'facebook',
+            'https://mbasic.facebook.com/watch/?v=1': 'facebook',
+            'https://fb.watch/abcDEF123/': 'facebook',
+            'https://gaming.youtube.com/watch?v=dQw4w9WgXcQ': 'youtube',
+        }
+        for url, platform in cases.items():
+            self.assertEqual(find_adapter(url).platform, platform, url)
+        # Hosts que apenas contêm o nome de uma plataforma não são aceitos
+        for url in ('https://box.com/file', 'https://notyoutube.com/watch?v=dQw4w9WgXcQ',
+                    'https://x.com.example.org/status/1', 'ftp://youtube.com/watch?v=dQw4w9WgXcQ', 'youtube.com'):
+            self.assertIsNone(find_adapter(url), url)
+
+    def test_ie_key_is_accepted_by_the_yt_dlp_extractor(self):
+        from yt_dlp.extractor import get_info_extractor
+        urls = [
+            'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+            'https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ',
+            'https://www.youtube.com/shorts/dQw4w9WgXcQ',
+            'https://youtu.be/dQw4w9WgXcQ?t=10',
+            'https://www.youtube.com/playlist?list=PL0123456789',
+            'https://www.youtube.com/@canal',
+            'https://twitter.com/i/status/1234567890',
+            'https://x.com/user/status/1234567890',
+            'https://www.facebook.com/pagina/videos/1234567890/',
+            'https://www.facebook.com/watch/?v=1234567890',
+        ]
+        for url in urls:
+            ie_key = find_adapter(url).resolve_ie_key(url)
+            self.assertIsNotNone(ie_key, url)
+            self.assertTrue(get_info_extractor(ie_key).suitable(url), url)
+        # Vídeos de playlists e URLs sem padrão conhecido ficam com a busca completa do yt_dlp
+        for url in ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL0123456789', 'https://fb.com/1234567890'):
+            self.assertIsNone(find_adapter(url).resolve_ie_key(url), url)
+
+    def test_register_adapter(self):
+        adapter = PlatformAdapter('vimeo', 'Vimeo', ('vimeo.com',), 'downloads-Vimeo', patterns=((r'https?://(?:www\.)?vimeo\.com/\d+', 'Vimeo'),))
+        adapters.register_adapter(adapter)
+        try:
+            self.assertIs(find_adapter('https://www.vimeo.com/123'), adapter)
+            self.assertEqual(adapter.resolve_ie_key('https://vimeo.com/123'), 'Vimeo')
+        finally:
+            adapters._adapters.pop('vimeo')
+            adapters._hosts.pop('vimeo.com')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+import archive
+from archive import MediaArchive, media_key
+
+class TestMediaArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.archive = MediaArchive(os.path.join(self.root, 'cache', 'archive.sqlite3'))
+
+    def tearDown(self):
+        self.archive.close()
+        self.temp_dir.cleanup()
+
+    def write_file(self, directory, name, data=b'video'):
+        os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+        path = os.path.join(self.root, directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_media_key_from_url(self):
+        self.assertEqual(media_key('https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=abc'), ('Youtube', 'dQw4w9WgXcQ'))
+        self.assertEqual(media_key('https://youtu.be/dQw4w9WgXcQ'), ('Youtube', 'dQw4w9WgXcQ'))
+        self.assertEqual(media_key('https://youtube.com/shorts/dQw4w9WgXcQ'), ('Youtube', 'dQw4w9WgXcQ'))
+        self.assertEqual(media_key('https://x.com/user/status/1234567890?s=20'), ('Twitter', '1234567890'))
+        self.assertEqual(media_key('https://www.facebook.com/user/videos/987654321/'), ('Facebook', '987654321'))
+        self.assertEqual(media_key('https://www.facebook.com/watch/?v=987654321'), ('Facebook', '987654321'))
+        self.assertEqual(media_key('https://www.instagram.com/reel/CqfOiUz3w1I/'), ('Instagram', 'CqfOiUz3w1I'))
+        self.assertIsNone(media_key('https://www.youtube.com/playlist?list=PL123'))
+        # Mesmo critério de domínio do roteamento: subdomínios sim, hosts que apenas terminam com o nome não
+        self.assertEqual(media_key('https://business.facebook.com/pagina/videos/987654321/'), ('Facebook', '987654321'))
+        self.assertEqual(media_key('https://gaming.youtube.com/watch?v=dQw4w9WgXcQ'), ('Youtube', 'dQw4w9WgXcQ'))
+        self.assertIsNone(media_key('https://notyoutube.com/watch?v=dQw4w9WgXcQ'))
+        self.assertIsNone(media_key('https://box.com/user/status/1234567890'))
+
+    def test_lookup_ignores_quality_for_mp3_and_drops_missing_files(self):
+        path = self.write_file('downloads-Youtube', 'mp3_[dQw4w9WgXcQ]_Video.mp3')
+        self.archive.add('Youtube', 'dQw4w9WgXcQ', 'mp3', '720p', path, archive.file_sha256(path))
+        self.assertEqual(self.archive.lookup('Youtube', 'dQw4w9WgXcQ', 'mp3', 'best', verify=True), path)
+        self.assertIsNone(self.archive.lookup('Youtube', 'dQw4w9WgXcQ', 'mp4', 'best'))
+
+        with open(path, 'ab') as f:
+            f.write(b'changed')
+        self.assertIsNone(self.archive.lookup('Youtube', 'dQw4w9WgXcQ', 'mp3', 'best'))
+        self.assertEqual(self.archive.count(), 0)
+
+    def test_rebuild_from_download_directories(self):
+        video = self.write_file('downloads-Youtube', 'mp4_720p_[dQw4w9WgXcQ]_Video.mp4')
+        self.write_file('downloads-Youtube', 'mp4_720p_[dQw4w9WgXcQ]_Video.f137.mp4')  # Formato intermediário
+        self.write_file('downloads-Youtube', 'mp4_best_Video_antigo.mp4')  # Sem o ID no nome
+        audio = self.write_file('downloads-Twitter', 'mp3_[1234567890]_Tweet.mp3')
+        post = self.write_file('downloads-Instagram', f"user - {archive.SHORTCODE_ALPHABET.index('C') * 64 + 1}.mp4")
+        directories = {platform: os.path.join(self.root, f"downloads-{name}")
+                       for platform, name in [('youtube', 'Youtube'), ('twitter', 'Twitter'), ('instagram', 'Instagram'), ('facebook', 'Facebook')]}
+
+        self.assertEqual(self.archive.rebuild(directories), 3)
+        self.assertEqual(self.archive.lookup('Youtube', 'dQw4w9WgXcQ', 'mp4', '720p'), video)
+        self.assertEqual(self.archive.lookup('Twitter', '1234567890', 'mp3', 'best'), audio)
+        self.assertEqual(self.archive.lookup('Instagram', 'CB', 'mp4', 'best'), post)
+
+if __name__ == '__main__':
+    unittest.main()
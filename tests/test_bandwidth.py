@@ -0,0 +1,54 @@
+import io
+import time
+import unittest
+
+import bandwidth
+from bandwidth import BandwidthGovernor, ThrottledStream, TokenBucket, fair_shares
+
+class TestBandwidth(unittest.TestCase):
+
+    def test_fair_shares_redistributes_unused_group_share(self):
+        groups = {1: 'youtube', 2: 'youtube', 3: 'instagram'}
+        self.assertEqual(fair_shares(groups, 900), {1: 300, 2: 300, 3: 300})
+        # O Instagram limitado a 100 libera a sobra para os downloads do YouTube
+        self.assertEqual(fair_shares(groups, 900, {'instagram': 100}), {1: 400, 2: 400, 3: 100})
+        self.assertEqual(fair_shares(groups, None, {'youtube': 500}), {1: 250, 2: 250, 3: None})
+
+    def test_parse_rate(self):
+        self.assertEqual(bandwidth.parse_rate('500K'), 500 * 1024)
+        self.assertEqual(bandwidth.parse_rate('1.5MB/s'), int(1.5 * 1024 * 1024))
+        self.assertIsNone(bandwidth.parse_rate(''))
+        with self.assertRaises(ValueError):
+            bandwidth.parse_rate('rápido')
+
+    def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(rate=100 * 1024)
+        start = time.monotonic()
+        for _ in range(10):
+            bucket.consume(5 * 1024)  # 50 KB a 100 KB/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+
+    def test_governor_rebalances_and_applies_new_limits(self):
+        governor = BandwidthGovernor(total_rate=1000)
+        first = governor.acquire('youtube')
+        self.assertEqual(first.allotted, 1000)
+        with governor.acquire('twitter') as second:
+            self.assertEqual((first.allotted, second.allotted), (500, 500))
+            governor.set_limits(total_rate=None, group_rates={'twitter': 200})
+            self.assertEqual((first.allotted, second.allotted), (None, 200))
+        self.assertEqual(len(governor.snapshot()), 1)  # A cota do segundo foi devolvida
+        first.close()
+
+    def test_throttled_stream_reports_actual_rate(self):
+        governor = BandwidthGovernor(total_rate=200 * 1024)
+        with governor.acquire('youtube') as lease:
+            stream = ThrottledStream(io.BytesIO(b'x' * 100 * 1024), lease)
+            start = time.monotonic()
+            while stream.read(10 * 1024):
+                pass
+            elapsed = time.monotonic() - start
+            self.assertGreaterEqual(elapsed, 0.2)
+            self.assertLess(lease.actual, 400 * 1024)
+
+if __name__ == '__main__':
+    unittest.main()
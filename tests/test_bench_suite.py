@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from benchmarks import bench_suite, synthetic
+from benchmarks.media_server import MediaServer
+
+class TestBenchSuite(unittest.TestCase):
+
+    def test_synthetic_media_downloads_through_stand_in_extractors(self):
+        with MediaServer() as server, tempfile.TemporaryDirectory() as directory:
+            for kind, platform in zip(synthetic.MEDIA_KINDS, bench_suite.PLATFORMS):
+                url = bench_suite.new_video(platform, kind, synthetic.add_media(server, kind, f"test-{kind}", 256 * 1024, 4))
+                ydl_opts = {'outtmpl': os.path.join(directory, f"{kind}.%(ext)s"), 'cachedir': False}
+                with synthetic.YoutubeDL(ydl_opts) as ydl:
+                    info = ydl.extract_info(url, download=True)
+                self.assertEqual(info['extractor_key'], platform.capitalize())
+                self.assertGreaterEqual(os.path.getsize(info['requested_downloads'][0]['filepath']), 256 * 1024)
+
+    def test_find_regressions_respects_direction_and_tolerance(self):
+        baseline = {'first_byte': {'dash': {'median_ms': 100}}, 'throughput': {'4': {'mb_per_s': 50, 'ui_latency_ms': {'p95': 10}}}}
+        current = {'first_byte': {'dash': {'median_ms': 110}}, 'throughput': {'4': {'mb_per_s': 30, 'ui_latency_ms': {'p95': 5}}}}
+        regressions = bench_suite.find_regressions(baseline, current, tolerance=0.2)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('throughput.4.mb_per_s'))
+
+    def test_cold_start_reports_target(self):
+        with patch('engine.COLD_START_TARGET', 10.0):
+            cold_start = bench_suite.measure_cold_start(1)
+        self.assertTrue(cold_start['within_target'])
+        self.assertEqual(cold_start['target_ms'], 10000.0)
+        with patch('engine.COLD_START_TARGET', 0.0):
+            self.assertFalse(bench_suite.measure_cold_start(1)['within_target'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,304 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+import engine
+from engine import download_youtube, download_instagram, download_twitter, download_facebook, sanitize_twitter_url
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestDownloader(unittest.TestCase):
+
+    def setUp(self):
+        # Executa cada teste em um diretório temporário para não criar as pastas de download no repositório
+        self.previous_dir = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        engine._instagram_pool = None  # As instâncias do Instaloader são criadas com os mocks de cada teste
+        engine._ytdl_pool = None  # As instâncias do YoutubeDL também
+
+    def tearDown(self):
+        engine._instagram_pool = None
+        engine._ytdl_pool = None
+        os.chdir(self.previous_dir)
+        self.temp_dir.cleanup()
+
+    @patch('ytdl.YoutubeDL')
+    @patch('engine.update_progress')
+    @patch('engine.log_message')
+    @patch('engine.notify_user')
+    def test_download_youtube(self, mock_notify_user, mock_log_message, mock_update_progress, mock_youtube_dl):
+        mock_instance = mock_youtube_dl.return_value.fork.return_value  # Instância do download (YoutubeDL.fork)
+        mock_instance.extract_info.return_value = {'title': 'Test Video'}
+        
+        with patch('time.time', return_value=0):
+            download_youtube('http://youtube.com/watch?v=12345', 'mp4')
+        
+        mock_youtube_dl.assert_called_once()
+        mock_instance.extract_info.assert_called_once_with('http://youtube.com/watch?v=12345', download=True, ie_key=None)
+        mock_log_message.assert_called_with("Vídeo 'Test Video' do Youtube em best baixado em 0.00 segundos!")
+        mock_notify_user.assert_called_with('info', "Sucesso", "Download do vídeo 'Test Video' concluído com sucesso!")
+
+    @patch('ytdl.YoutubeDL')
+    @patch('engine.update_progress')
+    @patch('engine.log_message')
+    @patch('engine.notify_user')
+    def test_download_retries_transient_failures(self, mock_notify_user, mock_log_message, mock_update_progress, mock_youtube_dl):
+        from retry import RetryPolicy
+        mock_instance = mock_youtube_dl.return_value.fork.return_value  # Instância do download (YoutubeDL.fork)
+        mock_instance.extract_info.side_effect = [ConnectionResetError("Connection reset by peer"), {'title': 'Test Video'}]
+
+        with patch('engine.get_retry_policy', return_value=RetryPolicy(base_delay=0)):
+            result = download_youtube('http://youtube.com/watch?v=12345', 'mp4')
+
+        self.assertEqual(result['title'], 'Test Video')
+        self.assertEqual(mock_instance.extract_info.call_count, 2)
+        mock_notify_user.assert_called_once_with('info', "Sucesso", "Download do vídeo 'Test Video' concluído com sucesso!")
+
+        # Falha permanente: sem novas tentativas e com a mensagem de erro ao usuário
+        mock_instance.extract_info.reset_mock(side_effect=True)
+        mock_instance.extract_info.side_effect = Exception("ERROR: Private video")
+        with patch('engine.get_retry_policy', return_value=RetryPolicy(base_delay=0)), self.assertRaises(Exception):
+            download_youtube('http://youtube.com/watch?v=12345', 'mp4')
+        self.assertEqual(mock_instance.extract_info.call_count, 1)
+        mock_notify_user.assert_called_with('error', "Erro", "Erro ao baixar o vídeo do Youtube: ERROR: Private video")
+
+    @patch('instaloader.Post.from_shortcode')
+    @patch('instaloader.Instaloader')
+    @patch('engine.update_progress')
+    @patch('engine.log_message')
+    @patch('engine.notify_user')
+    def test_download_instagram(self, mock_notify_user, mock_log_message, mock_update_progress, mock_instaloader, mock_from_shortcode):
+        mock_loader = mock_instaloader.return_value
+        mock_post = MagicMock()
+        mock_post.owner_username = 'testuser'
+        mock_loader.context = MagicMock()
+        mock_loader.download_post = MagicMock()
+        mock_from_shortcode.return_value = mock_post
+        
+        with patch('time.time', return_value=0):
+            download_instagram('http://instagram.com/p/12345')
+        
+        mock_from_shortcode.assert_called_once_with(mock_loader.context, '12345')
+        mock_loader.download_post.assert_called_once_with(mock_post, target='downloads-Instagram')
+        mock_log_message.assert_called_with("Vídeo de 'testuser' do Instagram baixado em 0.00 segundos!")
+        mock_notify_user.assert_called_with('info', "Sucesso", "Download do vídeo do Instagram concluído com sucesso!")
+
+    @patch('ytdl.YoutubeDL')
+    @patch('engine.update_progress')
+    @patch('engine.log_message')
+    @patch('engine.notify_user')
+    def test_download_twitter(self, mock_notify_user, mock_log_message, mock_update_progress, mock_youtube_dl):
+        mock_instance = mock_youtube_dl.return_value.fork.return_value  # Instância do download (YoutubeDL.fork)
+        mock_instance.extract_info.return_value = {'title': 'Test Video'}
+        
+        with patch('time.time', return_value=0):
+            download_twitter('http://twitter.com/user/status/12345', 'mp4')
+        
+        mock_youtube_dl.assert_called_once()
+        mock_instance.extract_info.assert_called_once_with('http://twitter.com/user/status/12345', download=True, ie_key='Twitter')
+        mock_log_message.assert_called_with("Vídeo 'Test Video' do Twitter em best baixado em 0.00 segundos!")
+        mock_notify_user.assert_called_with('info', "Sucesso", "Download do vídeo 'Test Video' concluído com sucesso!")
+
+    @patch('ytdl.YoutubeDL')
+    @patch('engine.update_progress')
+    @patch('engine.log_message')
+    @patch('engine.notify_user')
+    def test_download_facebook(self, mock_notify_user, mock_log_message, mock_update_progress, mock_youtube_dl):
+        mock_instance = mock_youtube_dl.return_value.fork.return_value  # Instância do download (YoutubeDL.fork)
+        mock_instance.extract_info.return_value = {'title': 'Test Video'}
+        
+        with patch('time.time', return_value=0):
+            download_facebook('http://facebook.com/video/12345', 'mp4')
+        
+        mock_youtube_dl.assert_called_once()
+        mock_instance.extract_info.assert_called_once_with('http://facebook.com/video/12345', download=True, ie_key=None)
+        mock_log_message.assert_called_with("Vídeo 'Test Video' do Facebook em best baixado em 0.00 segundos!")
+        mock_notify_user.assert_called_with('info', "Sucesso", "Download do vídeo 'Test Video' concluído com sucesso!")
+
+    def test_sanitize_twitter_url(self):
+        url = "https://twitter.com/user/status/12345"
+        sanitized_url = sanitize_twitter_url(url)
+        self.assertEqual(sanitized_url, "https://twitter.com/i/status/12345")
+
+    def test_normalize_url(self):
+        self.assertEqual(engine.normalize_url("https://youtu.be/abc?si=xyz"), engine.normalize_url("https://www.youtube.com/watch?v=abc&feature=share"))
+        self.assertEqual(engine.normalize_url("https://x.com/user/status/1"), "https://twitter.com/i/status/1")
+
+    def test_info_cache_reuses_probed_info(self):
+        cache = engine.InfoCache(max_entries=1)
+        cache.put('https://youtu.be/a', {'extractor_key': 'Youtube', 'id': 'a', 'title': 'A'})
+        self.assertEqual(cache.get('https://www.youtube.com/watch?v=a')['title'], 'A')
+        self.assertEqual(cache.get_by_id('Youtube', 'a')['title'], 'A')
+        cache.put('https://youtu.be/b', {'extractor_key': 'Youtube', 'id': 'b'})
+        self.assertIsNone(cache.get('https://youtu.be/a'))  # Descartada pelo limite de entradas
+
+    def test_scheduler_respects_platform_limit_and_cancel(self):
+        scheduler = engine.JobScheduler(max_workers=2, platform_limits={'youtube': 1})
+        running = []
+
+        def task(job=None):
+            running.append(job.id)
+            while not job.cancel_event.is_set():
+                time.sleep(0.01)
+            job.check_cancelled()
+
+        first = scheduler.submit('youtube', task)
+        second = scheduler.submit('youtube', task)
+        time.sleep(0.1)
+        self.assertEqual(running, [first.id])  # O segundo aguarda a vaga da plataforma
+        scheduler.cancel(second.id)
+        scheduler.cancel(first.id)
+        time.sleep(0.1)
+        self.assertEqual((first.state, second.state), (engine.JOB_CANCELLED, engine.JOB_CANCELLED))
+        self.assertEqual(running, [first.id])
+
+    def test_scheduler_releases_slot_while_next_stage_runs(self):
+        from concurrent.futures import Future
+        scheduler = engine.JobScheduler(max_workers=1)
+        conversion = Future()
+        second_done = threading.Event()
+
+        first = scheduler.submit('youtube', lambda job=None: conversion)
+        second = scheduler.submit('youtube', lambda job=None: 'ok')
+        second.add_done_callback(lambda job: second_done.set())
+        self.assertTrue(second_done.wait(1))  # A única vaga foi liberada enquanto o primeiro aguarda a conversão
+        self.assertEqual(first.state, engine.JOB_RUNNING)
+
+        conversion.set_result({'path': 'audio.mp3'})
+        self.assertEqual((first.state, first.result), (engine.JOB_DONE, {'path': 'audio.mp3'}))
+        stats = scheduler.stats()
+        self.assertEqual((stats['queued'], stats['running'], stats['completed']), (0, 0, 2))
+
+    def test_done_callback_registered_while_job_finishes(self):
+        # O download termina entre a verificação do estado e o registro da função: ela ainda é chamada
+        scheduler = engine.JobScheduler(max_workers=1)
+        release = threading.Event()
+        job = scheduler.submit('youtube', lambda job=None: release.wait(5))
+        called = []
+        is_active = engine.Job.is_active
+
+        def finish_after_check(job):
+            active = is_active(job)
+            release.set()
+            time.sleep(0.1)  # O worker tenta concluir o download enquanto a função é registrada
+            return active
+
+        with patch.object(engine.Job, 'is_active', autospec=True, side_effect=finish_after_check):
+            job.add_done_callback(called.append)
+        deadline = time.time() + 2
+        while not called and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(called, [job])
+        self.assertEqual(job.state, engine.JOB_DONE)
+
+    @patch('engine.journal_call')
+    @patch('engine.notify_user')
+    @patch('engine.log_message')
+    def test_archived_url_completes_while_workers_are_busy(self, mock_log_message, mock_notify_user, mock_journal_call):
+        from archive import MediaArchive
+        media_archive = MediaArchive(os.path.join('cache', 'archive.sqlite3'))
+        path = os.path.join('downloads-Youtube', 'mp4_720p_[dQw4w9WgXcQ]_Video.mp4')
+        os.makedirs('downloads-Youtube')
+        with open(path, 'wb') as f:
+            f.write(b'video')
+        media_archive.add('Youtube', 'dQw4w9WgXcQ', 'mp4', '720p', path)
+        mock_journal_call.return_value = 7
+        scheduler = engine.JobScheduler(max_workers=2, on_change=engine.on_job_change)
+        release = threading.Event()
+        blocking = [scheduler.submit(platform, lambda job=None: release.wait(5)) for platform in ('youtube', 'twitter', 'youtube')]
+        time.sleep(0.1)
+
+        try:
+            with patch('engine.get_archive', return_value=media_archive), patch('engine.get_scheduler', return_value=scheduler):
+                start = time.perf_counter()
+                job = engine.submit_download('https://youtu.be/dQw4w9WgXcQ', 'mp4', '720p', notify=False)
+                elapsed = time.perf_counter() - start
+            # Concluído ao retornar, com as duas threads ocupadas e outro download na fila
+            self.assertEqual((job.state, job.result['path']), (engine.JOB_DONE, path))
+            self.assertLess(elapsed, 1)
+            self.assertEqual([other.state for other in blocking], [engine.JOB_RUNNING, engine.JOB_RUNNING, engine.JOB_QUEUED])
+            mock_journal_call.assert_any_call('set_state', 7, engine.JOB_DONE, None)
+            mock_journal_call.assert_any_call('update_progress', 7, engine.JOB_DONE, None, None, path)
+            finished = []
+            job.add_done_callback(finished.append)
+            self.assertEqual(finished, [job])
+        finally:
+            release.set()
+
+    @patch('ytdl.YoutubeDL')
+    @patch('engine.journal_call')
+    @patch('engine.notify_user')
+    @patch('engine.log_message')
+    def test_submit_download_reuses_archived_file(self, mock_log_message, mock_notify_user, mock_journal_call, mock_youtube_dl):
+        from archive import MediaArchive
+        media_archive = MediaArchive(os.path.join('cache', 'archive.sqlite3'))
+        os.makedirs('downloads-Youtube')
+        path = os.path.join('downloads-Youtube', 'mp4_720p_[dQw4w9WgXcQ]_Video.mp4')
+        with open(path, 'wb') as f:
+            f.write(b'video')
+        media_archive.add('Youtube', 'dQw4w9WgXcQ', 'mp4', '720p', path)
+        scheduler = engine.JobScheduler(max_workers=1)
+        finished = threading.Event()
+
+        with patch('engine.get_archive', return_value=media_archive), patch('engine.get_scheduler', return_value=scheduler):
+            job = engine.submit_download('https://youtu.be/dQw4w9WgXcQ', 'mp4', '720p', notify=False)
+            job.add_done_callback(lambda job: finished.set())
+            self.assertTrue(finished.wait(1))
+
+        self.assertEqual(job.state, engine.JOB_DONE)
+        self.assertEqual(job.result['path'], path)
+        mock_youtube_dl.assert_not_called()
+        mock_notify_user.assert_not_called()
+        media_archive.close()
+
+    def test_event_bus_coalesces_progress_per_job(self):
+        bus = engine.EventBus()
+        first, second = MagicMock(id=1), MagicMock(id=2)
+        for percentage in (10, 20, 30):
+            bus.post('progress', {'job': first, 'percentage': percentage})
+            bus.post('progress', {'job': second, 'percentage': percentage / 2})
+        bus.post('log', {'message': 'ok'})
+        events = bus.drain()
+        self.assertEqual([(event, data.get('percentage')) for event, data in events], [('progress', 30), ('progress', 15), ('log', None)])
+        self.assertEqual((bus.received, bus.delivered), (7, 3))
+        self.assertEqual(bus.drain(), [])
+
+    @patch('engine.log_message')
+    @patch('engine.submit_download')
+    def test_resume_unfinished_jobs(self, mock_submit_download, mock_log_message):
+        from journal import JobJournal
+        journal = JobJournal(os.path.join('cache', 'journal.sqlite3'))
+        resumed_id = journal.add('https://youtu.be/abc', 'youtube', 'mp3', '720p', 'downloads-Youtube')
+        unsupported_id = journal.add('https://example.com/video', 'youtube', 'mp4', 'best', 'downloads-Youtube')
+        journal.set_state(resumed_id, engine.JOB_RUNNING)
+        mock_submit_download.side_effect = lambda url, *args, **kwargs: MagicMock() if 'youtu.be' in url else None
+
+        with patch('engine.get_journal', return_value=journal):
+            jobs = engine.resume_unfinished_jobs()
+
+        self.assertEqual(len(jobs), 1)
+        mock_submit_download.assert_any_call('https://youtu.be/abc', 'mp3', '720p', journal_id=resumed_id, notify=False)
+        self.assertEqual(journal.get(unsupported_id)['state'], engine.JOB_FAILED)
+        mock_log_message.assert_called_once_with("Retomando 1 download(s) interrompido(s).")
+        journal.close()
+
+    def test_parse_url_list(self):
+        text = "https://youtu.be/a\n\n# comentário\nhttps://youtu.be/b\nhttps://youtu.be/a\n"
+        self.assertEqual(engine.parse_url_list(text), ["https://youtu.be/a", "https://youtu.be/b"])
+
+    def test_cold_start(self):
+        # Importar o engine não pode carregar as bibliotecas de extração nem a interface gráfica
+        # (o tempo de importação é medido pelo benchmark: benchmarks/bench_suite.py)
+        code = ("import sys; import engine; "
+                "print(any(name in sys.modules for name in ('yt_dlp', 'ytdl', 'instaloader', 'customtkinter')))")
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
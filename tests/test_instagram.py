@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import instagram
+from instagram import CancellableRateController, InstaloaderPool, parse_instagram_url
+
+class TestInstagram(unittest.TestCase):
+
+    def test_parse_instagram_url(self):
+        self.assertEqual(parse_instagram_url('https://www.instagram.com/p/CqfOiUz3w1I/?igsh=abc'), ('post', 'CqfOiUz3w1I'))
+        self.assertEqual(parse_instagram_url('https://www.instagram.com/reel/CqfOiUz3w1I'), ('post', 'CqfOiUz3w1I'))
+        self.assertEqual(parse_instagram_url('https://www.instagram.com/user.name/p/CqfOiUz3w1I/'), ('post', 'CqfOiUz3w1I'))
+        self.assertEqual(parse_instagram_url('https://www.instagram.com/user.name/'), ('profile', 'user.name'))
+        self.assertEqual(parse_instagram_url('https://www.instagram.com/user.name/reels/'), ('reels', 'user.name'))
+        self.assertEqual(parse_instagram_url('https://www.instagram.com/user.name/highlights/'), ('highlights', 'user.name'))
+        with self.assertRaises(ValueError):
+            parse_instagram_url('https://www.instagram.com/explore/')
+
+    @patch('instaloader.Instaloader')
+    def test_pool_reuses_instance_and_loads_session(self, mock_instaloader):
+        with tempfile.TemporaryDirectory() as session_dir:
+            open(instagram.session_path(session_dir, 'user'), 'wb').close()
+            pool = InstaloaderPool(size=1, session_dir=session_dir, username='user')
+            for _ in range(3):
+                with pool.lease() as loader:
+                    self.assertIs(loader, mock_instaloader.return_value)
+        mock_instaloader.assert_called_once()
+        loader.load_session_from_file.assert_called_once_with('user', os.path.join(session_dir, 'session-user'))
+        loader.save_session_to_file.assert_called_once()  # Gravada no máximo a cada SESSION_SAVE_INTERVAL
+
+    def test_rate_controller_sleep_is_cancellable(self):
+        controller = CancellableRateController(MagicMock())
+        controller.check_cancelled = MagicMock(side_effect=KeyboardInterrupt)
+        with self.assertRaises(KeyboardInterrupt):
+            controller.sleep(60)
+
+    def test_download_items_skips_pictures_and_archived(self):
+        loader = MagicMock()
+        picture = MagicMock(is_video=False, typename='GraphImage')
+        archived = MagicMock(is_video=True, shortcode='old')
+        video = MagicMock(is_video=True, shortcode='new')
+        seen = []
+        downloaded = instagram.download_items(loader, [picture, archived, video], 'downloads-Instagram',
+                                              on_item=lambda item, done: seen.append(done),
+                                              skip=lambda item: item.shortcode == 'old')
+        self.assertEqual(downloaded, 1)
+        self.assertEqual(seen, [False, False, True])
+        loader.download_post.assert_called_once_with(video, target='downloads-Instagram')
+
+if __name__ == '__main__':
+    unittest.main()
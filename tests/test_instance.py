@@ -0,0 +1,135 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import engine
+import instance
+
+# Job simulado com os atributos usados por engine.describe_job
+class FakeJob:
+    def __init__(self, job_id, label):
+        self.id = job_id
+        self.label = label
+        self.platform = 'youtube'
+        self.state = engine.JOB_QUEUED
+        self.downloaded_bytes = 0
+        self.error = None
+        self.result = None
+
+class TestInstance(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'cache', 'instance.json')
+        self.jobs = []
+        self.focused = 0
+
+        def submit(url, format_choice, quality):
+            if engine.detect_platform(url) is None:
+                return None
+            job = FakeJob(len(self.jobs) + 1, f"{url} {format_choice} {quality}")
+            self.jobs.append(job)
+            return job
+
+        def focus():
+            self.focused += 1
+
+        self.server = instance.InstanceServer(submit, lambda: list(self.jobs), engine.describe_job, focus=focus,
+                                              status=lambda: {'queued': len(self.jobs)}, metrics=lambda: "# metrics\n",
+                                              path=self.path)
+
+    def tearDown(self):
+        self.server.close()
+        self.temp_dir.cleanup()
+
+    def test_forward_submits_jobs(self):
+        response = instance.forward(['https://www.youtube.com/watch?v=dQw4w9WgXcQ', 'https://example.com/x'],
+                                    'mp3', '720p', instance_path=self.path)
+        self.assertEqual(response, {'jobs': [1], 'rejected': ['https://example.com/x']})
+        self.assertEqual(self.jobs[0].label, 'https://www.youtube.com/watch?v=dQw4w9WgXcQ mp3 720p')
+        self.assertEqual(self.focused, 1)
+
+        self.assertIsNotNone(instance.forward([], instance_path=self.path))
+        self.assertEqual(self.focused, 2)
+
+    def test_status_queries(self):
+        instance.forward(['https://youtu.be/dQw4w9WgXcQ'], instance_path=self.path)
+        self.jobs[0].state = engine.JOB_DONE
+        self.jobs[0].result = {'path': 'downloads-Youtube/video.mp4'}
+
+        status, data = instance.request('GET', '/jobs', instance_path=self.path)
+        self.assertEqual(status, 200)
+        self.assertEqual(data['jobs'][0]['state'], engine.JOB_DONE)
+        self.assertEqual(data['jobs'][0]['path'], 'downloads-Youtube/video.mp4')
+        self.assertEqual(instance.request('GET', '/jobs/1', instance_path=self.path)[1]['id'], 1)
+        self.assertEqual(instance.request('GET', '/jobs/9', instance_path=self.path)[0], 404)
+        self.assertEqual(instance.request('GET', '/status', instance_path=self.path)[1],
+                         {'pid': os.getpid(), 'queued': 1})
+        self.assertEqual(instance.request('GET', '/metrics', instance_path=self.path), (200, "# metrics\n"))
+        self.assertEqual(instance.request('POST', '/jobs', {'urls': 'x'}, instance_path=self.path)[0], 400)
+
+    def test_rejects_invalid_format_and_quality(self):
+        url = 'https://youtu.be/dQw4w9WgXcQ'
+        for body in ({'urls': [url], 'format': 'webm'}, {'urls': [url], 'format': ['mp4']},
+                     {'urls': [url], 'quality': '720'}, {'urls': [url], 'quality': 'best[height<=720]'},
+                     {'urls': [url], 'format': 'mp4', 'quality': {'height': 720}}):
+            status, data = instance.request('POST', '/jobs', body, instance_path=self.path)
+            self.assertEqual(status, 400, body)
+            self.assertIn('error', data)
+        self.assertEqual(self.jobs, [])  # Nada foi submetido
+        self.assertEqual(instance.forward([url], 'mp4', '1080p', instance_path=self.path)['jobs'], [1])
+
+    def test_rejects_wrong_token(self):
+        with open(self.path, encoding='utf-8') as f:
+            info = json.load(f)
+        info['token'] = 'outro'
+        other_path = os.path.join(self.temp_dir.name, 'other.json')
+        with open(other_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        self.assertEqual(instance.request('GET', '/jobs', instance_path=other_path)[0], 403)
+        self.assertIsNone(instance.forward(['https://youtu.be/dQw4w9WgXcQ'], instance_path=other_path))
+        self.assertEqual(self.jobs, [])
+
+    def test_stale_instance_file(self):
+        # Porta sem nenhum servidor: o arquivo é de uma instância encerrada sem removê-lo
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        stale_path = os.path.join(self.temp_dir.name, 'stale.json')
+        with open(stale_path, 'w', encoding='utf-8') as f:
+            json.dump({'pid': 1, 'port': port, 'token': 'x'}, f)
+        self.assertIsNone(instance.forward(['https://youtu.be/dQw4w9WgXcQ'], instance_path=stale_path))
+        self.assertIsNone(instance.forward([], instance_path=os.path.join(self.temp_dir.name, 'missing.json')))
+
+    def test_close_removes_instance_file(self):
+        self.assertTrue(os.path.exists(self.path))
+        self.server.close()
+        self.assertFalse(os.path.exists(self.path))
+        self.server = instance.InstanceServer(lambda *args: None, list, engine.describe_job, path=self.path)
+
+    def test_second_launch_forwards_without_heavy_imports(self):
+        # Segunda execução da interface: encaminha a URL sem importar customtkinter, engine ou yt_dlp
+        code = ("import json, sys; import instance; "
+                f"response = instance.forward(['https://youtu.be/dQw4w9WgXcQ'], instance_path={self.path!r}); "
+                "print(json.dumps([response['jobs'], [m for m in ('engine', 'customtkinter', 'yt_dlp') if m in sys.modules]]))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stdout
+        jobs, modules = json.loads(output)
+        self.assertEqual(jobs, [1])
+        self.assertEqual(modules, [])
+
+    def test_instance_path_does_not_depend_on_current_directory(self):
+        # Execuções iniciadas de outra pasta encontram o mesmo arquivo da instância
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import instance; print(instance.INSTANCE_PATH)"
+        output = subprocess.run([sys.executable, '-c', code], cwd=self.temp_dir.name, env={**os.environ, 'PYTHONPATH': root},
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), os.path.join(root, 'cache', 'instance.json'))
+        self.assertEqual(instance.INSTANCE_PATH, os.path.join(root, 'cache', 'instance.json'))
+
+if __name__ == '__main__':
+    unittest.main()
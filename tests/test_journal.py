@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+from journal import JobJournal
+
+class TestJobJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'cache', 'journal.sqlite3')
+        self.journal = JobJournal(self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        self.temp_dir.cleanup()
+
+    def test_unfinished_survives_reopen(self):
+        first = self.journal.add('https://youtu.be/a', 'youtube', 'mp4', '720p', 'downloads-Youtube')
+        second = self.journal.add('https://youtu.be/b', 'youtube', 'mp3', 'best', 'downloads-Youtube')
+        done = self.journal.add('https://youtu.be/c', 'youtube', 'mp4', 'best', 'downloads-Youtube')
+        self.journal.set_state(first, 'running')
+        self.journal.update_progress(first, 'downloading', 1024, 4096, 'downloads-Youtube/a.mp4.part')
+        self.journal.set_state(done, 'done')
+        self.journal.close()
+
+        self.journal = JobJournal(self.path)
+        unfinished = self.journal.unfinished()
+        self.assertEqual([row['id'] for row in unfinished], [first, second])
+        self.assertEqual(unfinished[0]['bytes_done'], 1024)
+        self.assertEqual(unfinished[0]['phase'], 'downloading')
+        self.assertEqual(unfinished[0]['quality'], '720p')
+
+    def test_final_state_keeps_progress(self):
+        journal_id = self.journal.add('https://youtu.be/a', 'youtube', 'mp4', 'best', 'downloads-Youtube')
+        self.journal.update_progress(journal_id, 'downloading', 2048, 2048, 'downloads-Youtube/a.mp4.part')
+        self.journal.update_progress(journal_id, 'merging')
+        self.journal.set_state(journal_id, 'failed', 'erro')
+        row = self.journal.get(journal_id)
+        self.assertEqual((row['state'], row['phase'], row['error']), ('failed', 'failed', 'erro'))
+        self.assertEqual(row['bytes_done'], 2048)
+        self.assertEqual(row['output_path'], 'downloads-Youtube/a.mp4.part')
+        self.assertEqual(self.journal.unfinished(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+import logview
+
+class TestLogView(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'logs', 'downloader.log')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_ring_batches_messages_and_trims_oldest_lines(self):
+        ring = logview.LogRing(max_lines=3)
+        self.assertIsNone(ring.take_batch())
+        ring.add("a")
+        ring.add("b\nc")
+        self.assertEqual(ring.take_batch(), ("a\nb\nc\n", 0))
+        ring.add("d")
+        self.assertEqual(ring.take_batch(), ("d\n", 1))  # Uma linha antiga sai do widget
+        for index in range(10):
+            ring.add(str(index))
+        self.assertEqual(ring.take_batch(), ("7\n8\n9\n", 3))  # Rajada maior que o limite: só as últimas linhas
+        self.assertEqual(ring.visible, 3)
+
+    def test_history_rotates_and_searches_all_files(self):
+        history = logview.LogHistory(self.path, max_bytes=300, backups=3)
+        for index in range(20):
+            history.write(f"Vídeo {index} baixado")
+        history.write("Erro ao baixar o vídeo do Youtube")
+        matches, total = history.search("ERRO")
+        self.assertEqual(total, 1)
+        self.assertTrue(matches[0].endswith("Erro ao baixar o vídeo do Youtube"))
+        matches, total = history.search("baixado", limit=2)
+        self.assertEqual([match.split(' ', 2)[2] for match in matches], ["Vídeo 18 baixado", "Vídeo 19 baixado"])
+        self.assertGreater(total, 2)
+        history.close()
+        self.assertTrue(os.path.exists(self.path + '.1'))  # O histórico foi dividido em arquivos rotativos
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import metrics
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.jsonl_path = os.path.join(self.temp_dir.name, 'cache', 'metrics.jsonl')
+        self.prometheus_path = os.path.join(self.temp_dir.name, 'cache', 'metrics.prom')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_phases_follow_download_events(self):
+        clock = iter(range(100))
+        with patch('time.perf_counter', side_effect=lambda: next(clock)):
+            job_metrics = metrics.JobMetrics(1, 'youtube', 'https://youtu.be/a', submitted_at=-2)  # Saiu da fila em 0
+            job_metrics.mark('extract')  # 1
+            job_metrics.download_started()  # 2
+            job_metrics.on_progress({'status': 'downloading', 'downloaded_bytes': 0})  # Sem bytes: ainda aguarda
+            job_metrics.on_progress({'status': 'downloading', 'downloaded_bytes': 10, 'speed': 50})  # 3
+            job_metrics.download_started()  # Segundo arquivo (áudio): continua na transferência
+            job_metrics.mark('merge')  # 4
+            job_metrics.count_retry()
+            record = job_metrics.finish('done', 100)  # 5
+
+        self.assertEqual(record['phases'], {'queued': 2, 'resolve': 1, 'extract': 1, 'first_byte': 1, 'transfer': 1,
+                                            'merge': 1, 'postprocess': 0, 'finalize': 0})
+        self.assertEqual(record['total_seconds'], 7)
+        self.assertEqual((record['avg_throughput'], record['peak_throughput'], record['retries']), (100, 100, 1))
+
+    def test_recorder_exports_json_lines_and_prometheus_text(self):
+        recorder = metrics.MetricsRecorder(self.jsonl_path, self.prometheus_path)
+        for state in ('done', 'failed'):
+            job_metrics = recorder.start(1, 'youtube', 'https://youtu.be/a', time.perf_counter())
+            recorder.finish(job_metrics, state, 1024, 'erro' if state == 'failed' else None)
+
+        with open(self.jsonl_path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record['state'] for record in records], ['done', 'failed'])
+        self.assertEqual(records[1]['error'], 'erro')
+        with open(self.prometheus_path, encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn('multidownloader_jobs_total{platform="youtube",state="failed"} 1', text)
+        self.assertIn('multidownloader_bytes_total{platform="youtube"} 2048', text)
+        self.assertIn('multidownloader_job_seconds_count{platform="youtube"} 2', text)
+        self.assertEqual(recorder.summary()['jobs'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
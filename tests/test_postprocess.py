@@ -0,0 +1,166 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+
+import postprocess
+from postprocess import AudioStreamEncoder, PostProcessingError, PostProcessingStage
+
+# ffmpeg falso: copia a entrada para a saída, falha se a entrada contiver 'erro' e demora se contiver 'lento'
+FAKE_FFMPEG = """#!{python}
+import shutil, sys, time
+source, target = sys.argv[sys.argv.index('-i') + 1], sys.argv[-1]
+data = open(source, 'rb').read()
+if b'erro' in data:
+    sys.stderr.write('arquivo invalido')
+    sys.exit(1)
+if b'lento' in data:
+    time.sleep(10)
+shutil.copyfile(source, target)
+"""
+
+# ffmpeg falso do modo de transmissão: copia a entrada padrão para a saída e falha se ela contiver 'erro'
+FAKE_STREAM_FFMPEG = """#!{python}
+import sys
+data = sys.stdin.buffer.read()
+if b'erro' in data:
+    sys.stderr.write('fluxo invalido')
+    sys.exit(1)
+open(sys.argv[-1], 'wb').write(data)
+"""
+
+class TestPostProcessingStage(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ffmpeg = os.path.join(self.temp_dir.name, 'ffmpeg')
+        with open(self.ffmpeg, 'w') as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(self.ffmpeg, os.stat(self.ffmpeg).st_mode | stat.S_IEXEC)
+        self.stage = PostProcessingStage(workers=2, ffmpeg=self.ffmpeg)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_source(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_audio_command_copies_mp3_and_encodes_other_codecs(self):
+        self.assertIn('copy', postprocess.audio_command('ffmpeg', 'a.webm', 'a.mp3', 'mp3'))
+        self.assertIn('libmp3lame', postprocess.audio_command('ffmpeg', 'a.webm', 'a.mp3', 'opus'))
+        self.assertIn('libmp3lame', postprocess.audio_command('ffmpeg', 'a.m4a', 'a.mp3', 'mp4a.40.2'))
+
+    def test_extract_audio_replaces_source(self):
+        source = self.write_source('audio.webm', b'audio')
+        target = self.stage.extract_audio(source, source[:-5] + '.mp3', 'opus').result(timeout=10)
+        with open(target, 'rb') as f:
+            self.assertEqual(f.read(), b'audio')
+        self.assertFalse(os.path.exists(source))
+        stats = self.stage.stats()
+        self.assertEqual((stats['queued'], stats['running'], stats['completed'], stats['failed']), (0, 0, 1, 0))
+
+    def test_merge_streams_and_keep_source(self):
+        video = self.write_source('136.mp4', b'video')
+        audio = self.write_source('140.m4a', b'audio')
+        command = postprocess.merge_command('ffmpeg', video, audio, 'final.mp4')
+        self.assertEqual(command[command.index('-c') + 1], 'copy')
+        target = self.stage.merge_streams(video, audio, os.path.join(self.temp_dir.name, 'final.mp4')).result(timeout=10)
+        mp3 = self.stage.extract_audio(audio, audio[:-4] + '.mp3', 'mp4a.40.2', keep_source=True).result(timeout=10)
+        with open(target, 'rb') as f:
+            self.assertEqual(f.read(), b'video')
+        # Os fluxos baixados continuam disponíveis para as demais versões
+        self.assertTrue(os.path.exists(video) and os.path.exists(audio) and os.path.exists(mp3))
+        self.assertEqual(self.stage.stats()['completed'], 2)
+
+    def test_ffmpeg_error_is_reported(self):
+        source = self.write_source('audio.webm', b'erro')
+        with self.assertRaises(PostProcessingError) as context:
+            self.stage.extract_audio(source, source[:-5] + '.mp3', 'opus').result(timeout=10)
+        self.assertIn('arquivo invalido', str(context.exception))
+        self.assertTrue(os.path.exists(source))
+        self.assertEqual(self.stage.stats()['failed'], 1)
+
+    def test_cancel_kills_ffmpeg(self):
+        source = self.write_source('audio.webm', b'lento')
+        cancelled = threading.Event()
+
+        def check_cancelled():
+            if cancelled.is_set():
+                raise KeyboardInterrupt
+
+        conversion = self.stage.extract_audio(source, source[:-5] + '.mp3', 'opus', check_cancelled)
+        cancelled.set()
+        with self.assertRaises(KeyboardInterrupt):
+            conversion.result(timeout=5)
+        self.assertFalse(os.path.exists(source[:-5] + '.mp3'))
+
+class TestAudioStreamEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ffmpeg = os.path.join(self.temp_dir.name, 'ffmpeg')
+        with open(self.ffmpeg, 'w') as f:
+            f.write(FAKE_STREAM_FFMPEG.format(python=sys.executable))
+        os.chmod(self.ffmpeg, os.stat(self.ffmpeg).st_mode | stat.S_IEXEC)
+        self.target = os.path.join(self.temp_dir.name, 'audio.mp3.part')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_stream_command_reads_standard_input(self):
+        command = postprocess.stream_command('ffmpeg', 'a.mp3.part', 'opus')
+        self.assertEqual(command[command.index('-i') + 1], 'pipe:0')
+        self.assertEqual(command[-3:], ['-f', 'mp3', 'a.mp3.part'])
+        self.assertTrue(postprocess.can_stream('webm'))
+        self.assertTrue(postprocess.can_stream('m4a', 'm4a_dash'))
+        self.assertFalse(postprocess.can_stream('mp4'))
+
+    def test_chunks_are_encoded_in_order(self):
+        encoder = AudioStreamEncoder(self.target, 'opus', self.ffmpeg)
+        for index in range(100):
+            encoder.write(bytes([index]) * 1000)
+        encoder.close()
+        with open(self.target, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(bytes([index]) * 1000 for index in range(100)))
+
+    def test_ffmpeg_error_removes_output(self):
+        encoder = AudioStreamEncoder(self.target, 'opus', self.ffmpeg)
+        encoder.write(b'erro')
+        with self.assertRaises(PostProcessingError) as context:
+            encoder.close()
+        self.assertIn('fluxo invalido', str(context.exception))
+        self.assertFalse(os.path.exists(self.target))
+
+    def test_youtube_dl_streams_selected_audio_format(self):
+        from benchmarks import synthetic
+        from benchmarks.media_server import MediaServer
+        data = os.urandom(3 * 1024 * 1024 + 5)
+        statuses = []
+        with MediaServer() as server:
+            info = {'id': 'abc', 'title': 'Teste', 'extractor': 'test', 'extractor_key': 'Test', 'webpage_url': 'https://example.com/abc',
+                    'formats': [{'url': server.add('/audio.webm', data, 'audio/webm'), 'ext': 'webm', 'acodec': 'opus',
+                                 'vcodec': 'none', 'format_id': 'audio'}]}
+            ydl_opts = {'outtmpl': os.path.join(self.temp_dir.name, 'mp3_[%(id)s]_%(title)s.%(ext)s'), 'ffmpeg_location': self.ffmpeg,
+                        'format': 'bestaudio/best', 'progress_hooks': [lambda d: statuses.append(d['status'])]}
+            with synthetic.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.stream_audio(info)
+        output_path = info['requested_downloads'][0]['filepath']
+        self.assertTrue(output_path.endswith('mp3_[abc]_Teste.mp3'))
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(statuses[-1], 'finished')
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ['ffmpeg', 'mp3_[abc]_Teste.mp3'])  # Sem arquivo intermediário
+
+    def test_abort_discards_output(self):
+        encoder = AudioStreamEncoder(self.target, 'opus', self.ffmpeg)
+        encoder.write(b'audio')
+        encoder.abort()
+        self.assertFalse(os.path.exists(self.target))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import engine
+import renditions
+import ytdl
+from benchmarks import synthetic
+from benchmarks.media_server import MediaServer
+from postprocess import PostProcessingStage
+
+# ffmpeg falso: copia a primeira entrada para a saída
+FAKE_FFMPEG = """#!{python}
+import shutil, sys
+shutil.copyfile(sys.argv[sys.argv.index('-i') + 1], sys.argv[-1])
+"""
+
+# Formatos de um vídeo com vídeo e áudio separados (em ordem crescente de qualidade, como após a extração)
+SPLIT_FORMATS = [
+    {'format_id': '140', 'ext': 'm4a', 'acodec': 'mp4a.40.2', 'vcodec': 'none', 'abr': 128, 'url': 'https://example.com/a', 'protocol': 'https'},
+    {'format_id': '134', 'ext': 'mp4', 'acodec': 'none', 'vcodec': 'avc1', 'height': 360, 'url': 'https://example.com/v360', 'protocol': 'https'},
+    {'format_id': '136', 'ext': 'mp4', 'acodec': 'none', 'vcodec': 'avc1', 'height': 720, 'url': 'https://example.com/v720', 'protocol': 'https'},
+]
+
+class TestRenditions(unittest.TestCase):
+
+    def test_parse_outputs(self):
+        self.assertEqual(renditions.parse_outputs("mp4:1080p, mp4:720p,mp3,MP4:720p,mp3:320p"),
+                         [('mp4', '1080p'), ('mp4', '720p'), ('mp3', 'best')])
+        self.assertEqual(renditions.parse_outputs("mp4"), [('mp4', 'best')])
+        self.assertEqual(renditions.format_outputs([('mp4', '1080p'), ('mp3', 'best')]), "mp4:1080p,mp3")
+        for text in ("", "webm:720p", "mp4:alta"):
+            with self.assertRaises(ValueError):
+                renditions.parse_outputs(text)
+
+    def test_plan_shares_streams(self):
+        ydl = synthetic.YoutubeDL({})
+        info = {'id': 'abc', 'title': 'Vídeo', 'formats': SPLIT_FORMATS}
+        outputs = [('mp4', 'best'), ('mp4', '360p'), ('mp4', '720p'), ('mp3', 'best')]
+        selections = [ydl.select_formats(info, renditions.format_spec(*output)) for output in outputs]
+        streams, planned = renditions.plan_renditions(outputs, selections)
+
+        # O áudio é baixado uma vez para os três mp4 e o mp3; best e 720p usam o mesmo vídeo
+        self.assertEqual(list(streams), ['136', '140', '134'])
+        self.assertEqual([rendition.streams for rendition in planned], [['136', '140'], ['134', '140'], ['136', '140'], ['140']])
+        self.assertEqual([rendition.ext for rendition in planned], ['mp4', 'mp4', 'mp4', 'mp3'])
+        with self.assertRaises(Exception):
+            ydl.select_formats(info, 'bestvideo[height<=144]')  # Sem alternativa: nenhum formato atende
+
+    def test_plan_progressive_only(self):
+        # Sites sem formatos separados (Twitter): o mp4 e o mp3 usam o mesmo arquivo
+        progressive = {'format_id': 'http-832', 'ext': 'mp4', 'acodec': 'mp4a.40.2', 'vcodec': 'avc1', 'height': 720}
+        streams, planned = renditions.plan_renditions([('mp4', 'best'), ('mp3', 'best')], [[progressive], [progressive]])
+        self.assertEqual(list(streams), ['http-832'])
+        self.assertEqual([(rendition.streams, rendition.ext) for rendition in planned], [(['http-832'], 'mp4'), (['http-832'], 'mp3')])
+
+    def test_link_or_copy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'fonte.mp4')
+            target = os.path.join(directory, 'versao.mp4')
+            with open(source, 'wb') as f:
+                f.write(b'video')
+            with open(target, 'wb') as f:
+                f.write(b'antigo')
+            with patch('os.link', side_effect=OSError):
+                renditions.link_or_copy(source, target)
+            with open(target, 'rb') as f:
+                self.assertEqual(f.read(), b'video')
+
+class TestDownloadRenditions(unittest.TestCase):
+
+    def setUp(self):
+        # Executa cada teste em um diretório temporário (pastas de download, índice e fluxos baixados)
+        self.previous_dir = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        ffmpeg = os.path.join(self.temp_dir.name, 'ffmpeg')
+        with open(ffmpeg, 'w') as f:
+            f.write(FAKE_FFMPEG.format(python=sys.executable))
+        os.chmod(ffmpeg, os.stat(ffmpeg).st_mode | stat.S_IEXEC)
+        self.created = []
+
+        def factory(params):
+            ydl = synthetic.YoutubeDL(params)
+            self.created.append(ydl)
+            return ydl
+
+        engine._ytdl_pool = ytdl.YoutubeDLPool(factory, {'cachedir': False})
+        engine._postprocessing_stage = PostProcessingStage(workers=2, ffmpeg=ffmpeg)
+        engine._archive = None
+        engine._info_cache = None
+
+    def tearDown(self):
+        engine._ytdl_pool.close()
+        engine._ytdl_pool = None
+        engine._postprocessing_stage = None
+        engine._archive = None
+        engine._info_cache = None
+        os.chdir(self.previous_dir)
+        self.temp_dir.cleanup()
+
+    @patch('engine.log_message')
+    @patch('engine.notify_user')
+    def test_twitter_mp4_and_mp3_from_one_download(self, mock_notify_user, mock_log_message):
+        downloaded = []
+        with MediaServer() as server:
+            synthetic.CATALOG[('twitter', '987654')] = ('progressive', synthetic.add_media(server, 'progressive', 'renditions', 256 * 1024))
+            url = synthetic.media_url('twitter', '987654')
+            with patch('engine.update_progress', side_effect=lambda job, percentage, *args: downloaded.append(percentage)), \
+                 patch.object(ytdl.YoutubeDL, 'download_format', autospec=True, side_effect=ytdl.YoutubeDL.download_format) as download_format:
+                result = engine.download_renditions('twitter', url, [('mp4', 'best'), ('mp3', 'best')])
+
+        mp4_path, mp3_path = result['paths']
+        self.assertTrue(os.path.basename(mp4_path).startswith('mp4_best_[987654]'))
+        self.assertTrue(os.path.basename(mp3_path).startswith('mp3_[987654]') and mp3_path.endswith('.mp3'))
+        with open(mp4_path, 'rb') as f, open(mp3_path, 'rb') as g:
+            self.assertEqual(f.read(), g.read())  # O mp3 (ffmpeg falso) foi extraído do mesmo arquivo baixado
+        self.assertEqual(download_format.call_count, 1)  # O vídeo é baixado uma única vez para as duas versões
+        self.assertEqual(len(self.created), 1)
+        self.assertFalse(os.listdir(engine.RENDITIONS_DIR))  # Os fluxos baixados são removidos ao final
+        self.assertTrue(downloaded)
+
+        # As duas versões ficam no índice: um novo pedido não acessa a rede
+        self.assertEqual(engine.find_archived(url, 'mp4', 'best'), mp4_path)
+        self.assertEqual(engine.find_archived(url, 'mp3', 'best'), mp3_path)
+        again = engine.download_renditions('twitter', url, [('mp3', 'best'), ('mp4', 'best')])
+        self.assertEqual(again['paths'], [mp3_path, mp4_path])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import random
+import sys
+import unittest
+
+import retry
+
+# Erro HTTP simulado com o código e os cabeçalhos da resposta (como o HTTPError do yt_dlp)
+class FakeHTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP Error {status}")
+        self.status = status
+        self.headers = headers or {}
+
+# DownloadError simulado: a falha original fica em exc_info
+class DownloadError(Exception):
+    def __init__(self, message, original):
+        super().__init__(message)
+        self.exc_info = (type(original), original, None)
+
+class TestRetry(unittest.TestCase):
+
+    def test_classify_error(self):
+        self.assertEqual(retry.classify_error(FakeHTTPError(502)), (retry.TRANSIENT, None))
+        self.assertEqual(retry.classify_error(FakeHTTPError(429, {'Retry-After': '30'})), (retry.THROTTLED, 30.0))
+        self.assertEqual(retry.classify_error(FakeHTTPError(404)), (retry.PERMANENT, None))
+        wrapped = DownloadError("ERROR: unable to download video data", FakeHTTPError(503))
+        self.assertEqual(retry.classify_error(wrapped)[0], retry.THROTTLED)
+        try:
+            json.loads('<html>')
+        except ValueError as e:
+            self.assertEqual(retry.classify_error(Exception(f"ERROR: JSONDecodeError: {e}"))[0], retry.TRANSIENT)
+            self.assertEqual(retry.classify_error(e)[0], retry.TRANSIENT)
+        self.assertEqual(retry.classify_error(ConnectionResetError())[0], retry.TRANSIENT)
+        self.assertEqual(retry.classify_error(Exception("ERROR: [youtube] x: Video unavailable"))[0], retry.PERMANENT)
+        self.assertEqual(retry.classify_error(ValueError("erro desconhecido"))[0], retry.PERMANENT)
+
+    def test_wrapped_network_errors_are_transient(self):
+        # Falhas de rede recebidas do yt_dlp dentro de um DownloadError, com mensagens novas e pouco específicas
+        from yt_dlp.networking.exceptions import IncompleteRead
+        from yt_dlp.utils import DownloadError as YtdlDownloadError
+        for original in (ConnectionResetError(104, 'Connection reset by peer'), IncompleteRead(partial=1024, expected=4096)):
+            try:
+                raise original
+            except Exception:
+                wrapped = YtdlDownloadError("ERROR: fragment 3 not found, unable to continue", sys.exc_info())
+            self.assertEqual(retry.classify_error(wrapped)[0], retry.TRANSIENT)
+            self.assertEqual(retry.classify_error(DownloadError("ERROR: unable to download video data", original))[0], retry.TRANSIENT)
+        # Mensagens de conteúdo inexistente continuam permanentes
+        self.assertEqual(retry.classify_error(Exception("ERROR: [twitter] 123: Video not found"))[0], retry.PERMANENT)
+
+    def test_backoff_grows_with_jitter(self):
+        policy = retry.RetryPolicy(base_delay=2, throttled_delay=10, max_delay=60, rng=random.Random(1))
+        delays = [policy.backoff(attempt) for attempt in range(1, 8)]
+        for attempt, delay in enumerate(delays, 1):
+            ceiling = min(60, 2 * 2 ** (attempt - 1))
+            self.assertTrue(ceiling / 2 <= delay <= ceiling)
+        self.assertGreater(len({round(delay, 6) for delay in delays}), 5)
+        self.assertGreaterEqual(policy.backoff(1, retry.THROTTLED), 5)
+        self.assertEqual(policy.backoff(1, retry.THROTTLED, server_delay=45), 45)
+
+    def test_run_with_retry(self):
+        waits = []
+        retries = []
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionResetError("Connection reset by peer")
+            return 'ok'
+
+        policy = retry.RetryPolicy(max_attempts=4)
+        result = retry.run_with_retry(flaky, policy, lambda *args: retries.append(args[:2]), waits.append)
+        self.assertEqual(result, 'ok')
+        self.assertEqual(retries, [(1, retry.TRANSIENT), (2, retry.TRANSIENT)])
+        self.assertEqual(len(waits), 2)
+
+        # Falha permanente: lançada sem novas tentativas
+        calls.clear()
+        def unavailable():
+            calls.append(1)
+            raise Exception("Private video")
+        with self.assertRaises(Exception):
+            retry.run_with_retry(unavailable, policy, wait=waits.append)
+        self.assertEqual(len(calls), 1)
+
+        # Tentativas esgotadas: a última falha é lançada
+        calls.clear()
+        def always_throttled():
+            calls.append(1)
+            raise FakeHTTPError(429)
+        with self.assertRaises(FakeHTTPError):
+            retry.run_with_retry(always_throttled, policy, wait=lambda delay: None)
+        self.assertEqual(len(calls), 4)
+
+    def test_describe_error(self):
+        self.assertIn("tente novamente mais tarde", retry.describe_error(FakeHTTPError(503)))
+        self.assertEqual(retry.describe_error(Exception("Private video")), "Private video")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import tempfile
+import time
+import unittest
+
+import segmented
+from benchmarks.media_server import MediaServer
+
+class TestSegmented(unittest.TestCase):
+
+    def setUp(self):
+        self.data = os.urandom(300 * 1024 + 17)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'video.mp4')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_plan_segments_covers_file(self):
+        segments = segmented.plan_segments(10, 3, min_segment_size=1)
+        self.assertEqual(segments, [(0, 3), (4, 7), (8, 9)])
+        self.assertEqual(segmented.plan_segments(10, 8, min_segment_size=6), [(0, 9)])
+
+    def test_download_ranges_is_byte_identical(self):
+        progress = []
+        with MediaServer() as server:
+            open_range = segmented.urllib_opener(server.add('/video.mp4', self.data))
+            total_size = segmented.probe_size(open_range)
+            segmented.download_ranges(open_range, self.filename, total_size, connections=4, chunk_size=50 * 1024,
+                                      on_progress=lambda done, total: progress.append(done), min_segment_size=1024)
+            requests = server.requests['/video.mp4']
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(progress[-1], len(self.data))
+        self.assertGreater(requests, 4)  # Sondagem + intervalos divididos em blocos de chunk_size
+
+    def test_stream_ranges_delivers_bytes_in_order(self):
+        chunks = []
+        with MediaServer(per_connection_rate=2 * 1024 * 1024) as server:
+            open_range = segmented.urllib_opener(server.add('/audio.webm', self.data))
+            segmented.stream_ranges(open_range, len(self.data), chunks.append, connections=4, block_size=16 * 1024)
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertEqual(len(chunks), -(-len(self.data) // (16 * 1024)))
+
+    def test_stream_ranges_stops_when_write_fails(self):
+        def write(data):
+            raise KeyboardInterrupt
+        with MediaServer() as server:
+            open_range = segmented.urllib_opener(server.add('/audio.webm', self.data))
+            with self.assertRaises(KeyboardInterrupt):
+                segmented.stream_ranges(open_range, len(self.data), write, connections=2, block_size=16 * 1024)
+
+    def test_stream_ranges_hedges_lagging_block(self):
+        # Primeira requisição do bloco 3 presa: a requisição duplicada entrega o bloco sem esperar por ela
+        block_size = 16 * 1024
+        requests = []
+
+        class Response:
+            status = 206
+            headers = {}
+
+            def __init__(self, data, stalled):
+                self.data = data
+                self.stalled = stalled
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def read(self, size):
+                if self.stalled:
+                    time.sleep(2)
+                chunk, self.data = self.data[:size], self.data[size:]
+                return chunk
+
+        def open_range(start, end):
+            stalled = start == 3 * block_size and start not in requests
+            requests.append(start)
+            return Response(self.data[start:end + 1], stalled)
+
+        chunks = []
+        hedges = []
+        started = time.monotonic()
+        segmented.stream_ranges(open_range, len(self.data), chunks.append, connections=2, block_size=block_size,
+                                hedge_min_delay=0.05, on_hedge=hedges.append)
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertEqual(b''.join(chunks), self.data)
+        self.assertEqual(hedges, [3])
+        self.assertEqual(requests.count(3 * block_size), 2)
+
+    def test_download_ranges_hedges_lagging_segment(self):
+        # Primeira requisição do último intervalo presa: a requisição duplicada conclui o intervalo sem esperar por ela
+        segments = segmented.plan_segments(len(self.data), 4, min_segment_size=1024)
+        slow_start = segments[-1][0]
+        requests = []
+
+        class Response:
+            status = 206
+            headers = {}
+
+            def __init__(self, data, stalled):
+                self.data = data
+                self.stalled = stalled
+                self.delivered = False
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def read(self, size):
+                if self.stalled and self.delivered:
+                    time.sleep(3)  # Entrega a primeira leitura do intervalo e para
+                chunk, self.data = self.data[:size], self.data[size:]
+                self.delivered = True
+                return chunk
+
+        def open_range(start, end):
+            stalled = start == slow_start
+            requests.append(start)
+            return Response(self.data[start:end + 1], stalled)
+
+        hedges = []
+        started = time.monotonic()
+        segmented.download_ranges(open_range, self.filename, len(self.data), connections=4, min_segment_size=1024,
+                                  progress_interval=0.02, hedge_min_delay=0.05, on_hedge=hedges.append)
+        self.assertLess(time.monotonic() - started, 2)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(hedges, [len(segments) - 1])
+        # A requisição duplicada continua dos bytes já gravados pela original
+        hedge_start = [start for start in requests if start not in [segment[0] for segment in segments]]
+        self.assertEqual(len(hedge_start), 1)
+        self.assertGreater(hedge_start[0], slow_start)
+
+    def test_probe_size_without_range_support(self):
+        with MediaServer(accept_ranges=False) as server:
+            open_range = segmented.urllib_opener(server.add('/video.mp4', self.data))
+            self.assertIsNone(segmented.probe_size(open_range))
+
+    def test_on_progress_exception_stops_download(self):
+        def on_progress(done, total):
+            raise KeyboardInterrupt
+        with MediaServer(per_connection_rate=100 * 1024) as server:
+            open_range = segmented.urllib_opener(server.add('/video.mp4', self.data))
+            with self.assertRaises(KeyboardInterrupt):
+                segmented.download_ranges(open_range, self.filename, len(self.data), connections=2,
+                                          on_progress=on_progress, progress_interval=0.05, min_segment_size=1024)
+
+    def test_resume_from_state_file(self):
+        state_path = self.filename + '.segments'
+        progress = []
+        def on_progress(done, total):
+            progress.append(done)
+            if done >= len(self.data) // 3:
+                raise KeyboardInterrupt
+        with MediaServer(per_connection_rate=100 * 1024) as server:
+            open_range = segmented.urllib_opener(server.add('/video.mp4', self.data))
+            with self.assertRaises(KeyboardInterrupt):
+                segmented.download_ranges(open_range, self.filename, len(self.data), connections=2,
+                                          on_progress=on_progress, progress_interval=0.05, min_segment_size=1024,
+                                          state_path=state_path)
+            self.assertTrue(os.path.exists(state_path))
+            resumed = []
+            segmented.download_ranges(open_range, self.filename, len(self.data), connections=2,
+                                      on_progress=lambda done, total: resumed.append(done), progress_interval=0.05,
+                                      min_segment_size=1024, state_path=state_path)
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertGreater(resumed[0], 0)  # Parte dos bytes já estava no disco
+        self.assertFalse(os.path.exists(state_path))
+
+if __name__ == '__main__':
+    unittest.main()
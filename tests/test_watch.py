@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import engine
+import watch
+
+# Listagem simulada de um canal: páginas de 30 vídeos pedidas apenas quando consumidas
+class FakeChannel:
+    def __init__(self, total):
+        self.ids = [f"video{index}" for index in range(total, 0, -1)]  # Mais recentes primeiro
+        self.pages = 0
+
+    def entries(self):
+        for start in range(0, len(self.ids), 30):
+            self.pages += 1
+            for video_id in self.ids[start:start + 30]:
+                yield {'_type': 'url', 'id': video_id, 'url': f"https://www.youtube.com/watch?v={video_id}", 'ie_key': 'Youtube'}
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.watchlist = watch.WatchList(os.path.join(self.temp_dir.name, 'cache', 'watch.sqlite3'))
+        engine._ytdl_pool = None  # As instâncias do YoutubeDL são criadas com os mocks de cada teste
+
+    def tearDown(self):
+        engine._ytdl_pool = None
+        self.watchlist.close()
+        self.temp_dir.cleanup()
+
+    def test_scan_feed_stops_at_seen_ids(self):
+        seen = {f"video{index}" for index in range(1, 5001)}
+        channel = FakeChannel(5003)
+        new_entries, scanned = watch.scan_feed(channel.entries(), seen.__contains__)
+        self.assertEqual([entry['id'] for entry in new_entries], ['video5003', 'video5002', 'video5001'])
+        self.assertEqual(scanned, 3 + watch.STOP_AFTER_SEEN)
+        self.assertEqual(channel.pages, 1)
+
+    def test_due_sources_and_seen_ids(self):
+        source_id = self.watchlist.add_source('https://www.youtube.com/@canal', 'youtube', 'mp3', 'best', interval=60)
+        self.assertEqual(self.watchlist.add_source('https://www.youtube.com/@canal', 'youtube', 'mp4', '720p', interval=60), source_id)
+        self.assertEqual(self.watchlist.get_source(source_id)['format'], 'mp4')
+        self.assertEqual([source['id'] for source in self.watchlist.due_sources()], [source_id])
+        self.watchlist.mark_checked(source_id, 2)
+        self.assertEqual(self.watchlist.due_sources(), [])
+        self.assertEqual(len(self.watchlist.due_sources(now=self.watchlist.get_source(source_id)['last_checked'] + 60)), 1)
+
+        self.watchlist.add_seen(source_id, ['a', 'b', 'a'])
+        self.assertTrue(self.watchlist.is_seen(source_id, 'a'))
+        self.assertFalse(self.watchlist.is_seen(source_id, 'c'))
+        self.assertEqual(self.watchlist.seen_count(source_id), 2)
+        self.assertTrue(self.watchlist.remove_source('https://www.youtube.com/@canal'))
+        self.assertEqual((self.watchlist.sources(), self.watchlist.seen_count(source_id)), ([], 0))
+
+    @patch('engine.log_message')
+    @patch('engine.submit_download')
+    @patch('engine.load_ytdl')
+    def test_sync_source_submits_only_new_videos(self, mock_load_ytdl, mock_submit_download, mock_log_message):
+        channel = FakeChannel(5000)
+        mock_ydl = mock_load_ytdl.return_value.YoutubeDL.return_value.fork.return_value
+        mock_ydl.extract_info.side_effect = lambda url, **kwargs: {'_type': 'playlist', 'entries': channel.entries()}
+        mock_submit_download.side_effect = lambda url, *args, **kwargs: MagicMock(url=url)
+
+        with patch('engine._watchlist', self.watchlist):
+            source_id = engine.watch_source('https://www.youtube.com/@canal', 'mp3')
+            self.assertEqual(engine.sync_source(self.watchlist.get_source(source_id)), [])  # Primeira consulta: apenas marca
+            self.assertEqual(self.watchlist.seen_count(source_id), watch.BASELINE_ENTRIES)
+
+            channel.ids[:0] = ['video5002', 'video5001']
+            channel.pages = 0
+            jobs = engine.sync_source(self.watchlist.get_source(source_id))
+
+        self.assertEqual([job.url for job in jobs], ['https://www.youtube.com/watch?v=video5001', 'https://www.youtube.com/watch?v=video5002'])
+        mock_submit_download.assert_called_with('https://www.youtube.com/watch?v=video5002', 'mp3', 'best', notify=False)
+        self.assertEqual(channel.pages, 1)
+        mock_ydl.extract_info.assert_called_with('https://www.youtube.com/@canal', download=False, process=False, ie_key='YoutubeTab')
+        self.assertEqual(self.watchlist.get_source(source_id)['new_items'], 2)
+
+    def test_watch_source_rejects_unsupported_urls(self):
+        with patch('engine._watchlist', self.watchlist):
+            for url in ('https://example.com/canal', 'https://www.instagram.com/perfil/'):
+                with self.assertRaises(ValueError):
+                    engine.watch_source(url)
+
+if __name__ == '__main__':
+    unittest.main()
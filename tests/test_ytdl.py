@@ -0,0 +1,107 @@
+import functools
+import os
+import tempfile
+import unittest
+
+import yt_dlp
+
+import ytdl
+from benchmarks import synthetic
+from benchmarks.media_server import MediaServer
+
+class TestYoutubeDLPool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.created = []
+
+        def factory(params):
+            ydl = synthetic.YoutubeDL(params)
+            self.created.append(ydl)
+            return ydl
+
+        self.pool = ytdl.YoutubeDLPool(factory, {'cachedir': os.path.join(self.temp_dir.name, 'yt-dlp')})
+
+    def tearDown(self):
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def download(self, platform, video_id, params):
+        with self.pool.lease(platform, params) as ydl:
+            info = ydl.extract_info(synthetic.media_url(platform, video_id), download=True)
+            return ydl, info['requested_downloads'][0]['filepath']
+
+    def test_instances_are_reused_per_platform(self):
+        first_hook, second_hook = [], []
+        with MediaServer() as server:
+            synthetic.CATALOG[('youtube', 'poolvideo01')] = ('progressive', synthetic.add_media(server, 'progressive', 'pool1', 64 * 1024))
+            synthetic.CATALOG[('youtube', 'poolvideo02')] = ('progressive', synthetic.add_media(server, 'progressive', 'pool2', 64 * 1024))
+            synthetic.CATALOG[('twitter', '123456')] = ('progressive', synthetic.add_media(server, 'progressive', 'pool3', 64 * 1024))
+            first, first_path = self.download('youtube', 'poolvideo01', {
+                'outtmpl': os.path.join(self.temp_dir.name, 'mp4_best_[%(id)s].%(ext)s'), 'format': 'best',
+                'progress_hooks': [lambda d: first_hook.append(d['status'])]})
+            extractor = first.get_info_extractor('Youtube')
+            second, second_path = self.download('youtube', 'poolvideo02', {
+                'outtmpl': os.path.join(self.temp_dir.name, 'mp4_720p_[%(id)s].%(ext)s'), 'format': 'best[height<=720]',
+                'progress_hooks': [lambda d: second_hook.append(d['status'])]})
+            other, _ = self.download('twitter', '123456', {'outtmpl': os.path.join(self.temp_dir.name, '%(id)s.%(ext)s')})
+
+        # O segundo download do YouTube usa os mesmos extratores e cookies (instância do pool); o Twitter tem os seus
+        self.assertIsNot(second, first)
+        self.assertIs(second.get_info_extractor('Youtube'), extractor)
+        self.assertIs(second.cookiejar, first.cookiejar)
+        self.assertIsNot(other.cookiejar, first.cookiejar)
+        self.assertEqual(len(self.created), 2)
+        self.assertEqual(self.pool.stats(), {'created': 2, 'reused': 1, 'idle': 2})
+
+        # As opções de cada download valem só para ele; as da instância são mantidas
+        self.assertTrue(first_path.endswith('mp4_best_[poolvideo01].mp4'))
+        self.assertTrue(second_path.endswith('mp4_720p_[poolvideo02].mp4'))
+        self.assertTrue(os.path.exists(first_path) and os.path.exists(second_path))
+        self.assertEqual(first_hook[-1], 'finished')
+        self.assertEqual(second_hook[-1], 'finished')
+        self.assertNotIn('finished', first_hook[first_hook.index('finished') + 1:])  # O hook do primeiro não recebe o segundo
+        self.assertEqual(second.params['cachedir'], os.path.join(self.temp_dir.name, 'yt-dlp'))
+        # Livre no pool: os extratores voltam para a instância do pool, sem referências ao último download
+        self.assertIs(extractor._downloader, self.created[0])
+        self.assertNotIn('progress_hooks', self.created[0].params)
+
+    def test_instance_params_select_separate_instances(self):
+        with self.pool.lease('youtube', {'proxy': 'http://127.0.0.1:9'}) as with_proxy:
+            pass
+        with self.pool.lease('youtube', {}) as without_proxy:
+            pass
+        self.assertIsNot(with_proxy, without_proxy)
+        with self.pool.lease('youtube', {'proxy': 'http://127.0.0.1:9'}) as again:
+            self.assertIs(again.cookiejar, with_proxy.cookiejar)
+        self.assertIsNot(with_proxy.cookiejar, without_proxy.cookiejar)
+
+    def test_shared_attributes_exist_in_yt_dlp(self):
+        # Falha se uma nova versão do yt_dlp renomear os objetos compartilhados pelas instâncias do pool
+        ydl = yt_dlp.YoutubeDL({'quiet': True}, auto_init=False)
+        for name in ytdl.WARM_EXTRACTOR_ATTRS:
+            self.assertIsInstance(vars(ydl).get(name), dict, name)
+        for name in ytdl.WARM_NETWORK_ATTRS:
+            self.assertIsInstance(getattr(yt_dlp.YoutubeDL, name, None), functools.cached_property, name)
+        ie = ydl.get_info_extractor('Generic')
+        self.assertIs(vars(ydl)['_ies_instances'].get('Generic'), ie)
+        self.assertIs(ie._downloader, ydl)
+        ydl.close()
+
+    def test_fork_creates_new_download_state(self):
+        warm = synthetic.YoutubeDL({'cachedir': False})
+        extractor = warm.get_info_extractor('Youtube')
+        hook = lambda d: None
+        ydl = warm.fork({'cachedir': False, 'outtmpl': '%(id)s.%(ext)s', 'format': 'best', 'progress_hooks': [hook]})
+        self.assertIs(ydl.get_info_extractor('Youtube'), extractor)
+        self.assertIs(extractor._downloader, ydl)
+        self.assertIs(vars(ydl)['_request_director'], vars(warm)['_request_director'])
+        self.assertEqual(ydl._progress_hooks, [hook])
+        self.assertEqual(warm._progress_hooks, [])
+        self.assertNotIn('format', warm.params)
+        warm.adopt_extractors()
+        self.assertIs(extractor._downloader, warm)
+        warm.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Inscrições (modo de acompanhamento) do Multi Downloader
+Canais e playlists acompanhados são consultados periodicamente com extração "flat" (apenas a listagem, sem
+resolver cada vídeo). As listagens chegam dos mais recentes para os mais antigos e as páginas seguintes só são
+pedidas quando consumidas: a leitura para ao encontrar uma sequência de IDs já vistos, então acompanhar um canal
+com milhares de vídeos custa poucas requisições por sincronização. Os IDs vistos de cada fonte ficam em SQLite.
+Na primeira sincronização de uma fonte, os vídeos existentes apenas são marcados como vistos (exceto com
+`backfill`, que baixa todo o histórico).
+Funções:
+    scan_feed(entries, is_seen, stop_after, limit):
+        Percorre uma listagem até encontrar `stop_after` IDs já vistos seguidos e retorna as entradas novas.
+Classes:
+    WatchList:
+        Acesso ao banco das fontes acompanhadas e dos IDs já vistos, seguro para uso a partir de várias threads.
+"""
+
+# Importações nativas
+import os
+import sqlite3
+import threading
+import time
+
+# Intervalo padrão (s) entre as consultas de uma fonte
+DEFAULT_INTERVAL = 3600
+# IDs já vistos seguidos que encerram a leitura de uma listagem (tolera vídeos fixados e reordenações)
+STOP_AFTER_SEEN = 10
+# Entradas marcadas como vistas na primeira sincronização de uma fonte sem `backfill`
+BASELINE_ENTRIES = 50
+
+# Função para percorrer uma listagem (iterável de entradas, dos vídeos mais recentes para os mais antigos)
+# A leitura para após `stop_after` IDs já vistos seguidos ou `limit` entradas lidas; como a listagem é
+# consumida aos poucos, as páginas seguintes não são pedidas. Retorna (entradas novas, entradas lidas)
+def scan_feed(entries, is_seen, stop_after=STOP_AFTER_SEEN, limit=None):
+    new_entries = []
+    scanned = 0
+    seen_run = 0
+    for entry in entries:
+        if limit is not None and scanned >= limit:
+            break
+        scanned += 1
+        video_id = (entry or {}).get('id')
+        if not video_id:
+            continue
+        if is_seen(video_id):
+            seen_run += 1
+            if seen_run >= stop_after:
+                break
+        else:
+            seen_run = 0
+            new_entries.append(entry)
+    return new_entries, scanned
+
+# Classe de acesso ao banco das inscrições
+class WatchList:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")  # Escritas atômicas e leituras sem bloqueio
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    platform TEXT NOT NULL,
+                    format TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    interval REAL NOT NULL,
+                    backfill INTEGER NOT NULL DEFAULT 0,
+                    last_checked REAL,
+                    last_error TEXT,
+                    new_items INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS seen (
+                    source_id INTEGER NOT NULL,
+                    video_id TEXT NOT NULL,
+                    seen_at REAL NOT NULL,
+                    PRIMARY KEY (source_id, video_id)
+                ) WITHOUT ROWID
+            """)
+
+    # Executa um comando em uma transação
+    def _execute(self, sql, parameters=()):
+        with self._lock, self._connection:
+            return self._connection.execute(sql, parameters)
+
+    # Acompanha uma fonte (ou atualiza formato, qualidade e intervalo de uma fonte já acompanhada) e retorna o seu ID
+    def add_source(self, url, platform, format_choice='mp4', quality='best', interval=DEFAULT_INTERVAL, backfill=False):
+        self._execute("""
+            INSERT INTO sources (url, platform, format, quality, interval, backfill, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET format = excluded.format, quality = excluded.quality, interval = excluded.interval
+        """, (url, platform, format_choice, quality, interval, int(backfill), time.time()))
+        return self.get_source(url)['id']
+
+    # Deixa de acompanhar uma fonte (pelo ID ou pela URL); retorna se ela existia
+    def remove_source(self, source):
+        row = self.get_source(source)
+        if row is None:
+            return False
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM seen WHERE source_id = ?", (row['id'],))
+            self._connection.execute("DELETE FROM sources WHERE id = ?", (row['id'],))
+        return True
+
+    # Retorna uma fonte pelo ID ou pela URL
+    def get_source(self, source):
+        column = 'id' if isinstance(source, int) else 'url'
+        with self._lock:
+            row = self._connection.execute(f"SELECT * FROM sources WHERE {column} = ?", (source,)).fetchone()
+        return dict(row) if row else None
+
+    def sources(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT * FROM sources ORDER BY id").fetchall()
+        return [dict(row) for row in rows]
+
+    # Retorna as fontes cuja próxima consulta já deveria ter sido feita (nunca consultadas primeiro)
+    def due_sources(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._connection.execute("""
+                SELECT * FROM sources WHERE last_checked IS NULL OR last_checked + interval <= ?
+                ORDER BY last_checked IS NOT NULL, last_checked
+            """, (now,)).fetchall()
+        return [dict(row) for row in rows]
+
+    # Registra o resultado de uma consulta
+    def mark_checked(self, source_id, new_items=0, error=None):
+        self._execute("UPDATE sources SET last_checked = ?, last_error = ?, new_items = new_items + ? WHERE id = ?",
+                      (time.time(), error, new_items, source_id))
+
+    def is_seen(self, source_id, video_id):
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM seen WHERE source_id = ? AND video_id = ?",
+                                            (source_id, video_id)).fetchone() is not None
+
+    # Marca IDs como vistos (todos na mesma transação)
+    def add_seen(self, source_id, video_ids):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR IGNORE INTO seen (source_id, video_id, seen_at) VALUES (?, ?, ?)",
+                                         [(source_id, video_id, now) for video_id in video_ids])
+
+    def seen_count(self, source_id):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM seen WHERE source_id = ?", (source_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
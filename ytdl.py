@@ -0,0 +1,346 @@
+# Desenvolvido por @wilsonsouza https://github.com/wilsondesouza
+# Se curtiu o trabalho ou se a aplicação lhe foi útil, favorite o repositório
+
+"""
+Integração do Multi Downloader com o yt_dlp
+Este módulo importa o yt_dlp e, por isso, só é carregado pelo engine quando uma plataforma
+baseada no yt_dlp é usada (ver engine.load_ytdl).
+Classes:
+    SegmentedHttpFD:
+        Downloader do yt_dlp que baixa formatos HTTP progressivos em várias conexões (ver segmented.py).
+    YoutubeDL:
+        Subclasse do yt_dlp.YoutubeDL que usa o SegmentedHttpFD quando a opção 'segmented_connections' é maior que 1.
+        Formatos DASH/HLS continuam com os downloaders do yt_dlp, que baixam 'concurrent_fragment_downloads' fragmentos em paralelo.
+        Com a opção 'bandwidth_lease', todas as respostas (intervalos, fragmentos e downloads de uma conexão) são
+        limitadas pela cota de banda do download (ver bandwidth.py).
+        A opção 'download_start_hook' é chamada com as informações do formato quando o download de um arquivo começa.
+        `stream_audio(info)` baixa o formato de áudio selecionado entregando os bytes ao ffmpeg enquanto chegam
+        (StreamingAudioFD), gerando o mp3 sem arquivo intermediário.
+        `select_formats(info, format_spec)` e `download_format(info, stream, filename)` selecionam e baixam formatos
+        isolados das informações já extraídas (downloads com várias versões, ver renditions.py).
+        `fork(params)` cria a instância de um download com as suas opções (modelo de saída, formato, hooks...)
+        compartilhando os extratores, cookies e conexões já inicializados de uma instância do pool.
+    YoutubeDLPool:
+        Conjunto de instâncias do YoutubeDL reaproveitadas entre os downloads, separadas por plataforma e pelas
+        opções que definem a instância (cache em disco, cookies, proxy...). Cada download recebe uma instância
+        nova (YoutubeDL.fork) que compartilha os objetos já inicializados da instância do pool.
+    StreamingAudioFD:
+        Downloader que baixa um formato HTTP progressivo em blocos paralelos e o converte para mp3 durante a transferência.
+"""
+
+# Importações nativas
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Importações externas
+import yt_dlp
+from yt_dlp.downloader.common import FileDownloader
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.utils import determine_protocol
+
+# Importações locais
+import bandwidth
+import postprocess
+import segmented
+
+# Função para criar a função que abre um intervalo de bytes do formato pela pilha de rede do yt_dlp
+# (cookies, proxy e cabeçalhos do extrator)
+def range_opener(ydl, info_dict):
+    url = info_dict['url']
+    headers = dict(info_dict.get('http_headers') or {})
+
+    def open_range(start, end):
+        range_header = f"bytes={start}-{end}" if end is not None else f"bytes={start}-"
+        return ydl.urlopen(Request(url, headers={**headers, 'Range': range_header}))
+    return open_range
+
+# Downloader que baixa um formato HTTP progressivo em intervalos paralelos
+class SegmentedHttpFD(FileDownloader):
+    FD_NAME = 'segmented'
+
+    def real_download(self, filename, info_dict):
+        connections = self.params.get('segmented_connections') or segmented.DEFAULT_CONNECTIONS
+        open_range = range_opener(self.ydl, info_dict)
+        total_size = segmented.probe_size(open_range)
+        if total_size is None or total_size < 2 * segmented.MIN_SEGMENT_SIZE:
+            return self._single_connection_download(filename, info_dict)  # Sem suporte a Range ou arquivo pequeno
+
+        tmpfilename = self.temp_name(filename)
+        self.report_destination(filename)
+        start_time = time.time()
+
+        # Repassa o progresso agregado das conexões aos progress_hooks
+        def on_progress(downloaded_bytes, total_bytes):
+            elapsed = time.time() - start_time
+            speed = downloaded_bytes / elapsed if elapsed > 0 else None
+            self._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': downloaded_bytes,
+                'total_bytes': total_bytes,
+                'filename': filename,
+                'tmpfilename': tmpfilename,
+                'elapsed': elapsed,
+                'speed': speed,
+                'eta': (total_bytes - downloaded_bytes) / speed if speed else None,
+            }, info_dict)
+
+        chunk_size = (info_dict.get('downloader_options') or {}).get('http_chunk_size') or self.params.get('http_chunk_size')
+        # O arquivo de estado permite retomar o download a partir do arquivo parcial
+        state_path = tmpfilename + '.segments' if self.params.get('continuedl', True) else None
+        segmented.download_ranges(open_range, tmpfilename, total_size, connections, chunk_size, on_progress, state_path=state_path)
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            'status': 'finished',
+            'downloaded_bytes': total_size,
+            'total_bytes': total_size,
+            'filename': filename,
+            'elapsed': time.time() - start_time,
+        }, info_dict)
+        return True
+
+    # Baixa o formato com o downloader HTTP padrão do yt_dlp (uma única conexão)
+    def _single_connection_download(self, filename, info_dict):
+        fd = HttpFD(self.ydl, self.params)
+        for progress_hook in self._progress_hooks:
+            fd.add_progress_hook(progress_hook)
+        return fd.real_download(filename, info_dict)
+
+# Downloader que converte o áudio para mp3 enquanto ele é baixado
+# Os blocos são baixados em paralelo e entregues em ordem ao ffmpeg; o mp3 é gravado em `filename`.part
+class StreamingAudioFD(FileDownloader):
+    FD_NAME = 'audiostream'
+
+    def real_download(self, filename, info_dict):
+        connections = self.params.get('segmented_connections') or segmented.DEFAULT_CONNECTIONS
+        open_range = range_opener(self.ydl, info_dict)
+        total_size = segmented.probe_size(open_range)  # None: sem suporte a Range (uma única resposta)
+
+        tmpfilename = self.temp_name(filename)
+        self.report_destination(filename)
+        start_time = time.time()
+
+        # Repassa o progresso aos progress_hooks (os bytes baixados, não os já convertidos)
+        def on_progress(downloaded_bytes, total_bytes):
+            elapsed = time.time() - start_time
+            speed = downloaded_bytes / elapsed if elapsed > 0 else None
+            self._hook_progress({
+                'status': 'downloading',
+                'downloaded_bytes': downloaded_bytes,
+                'total_bytes': total_bytes,
+                'filename': filename,
+                'tmpfilename': tmpfilename,
+                'elapsed': elapsed,
+                'speed': speed,
+                'eta': (total_bytes - downloaded_bytes) / speed if speed and total_bytes else None,
+            }, info_dict)
+
+        encoder = postprocess.AudioStreamEncoder(tmpfilename, info_dict.get('acodec'), self.params.get('ffmpeg_location') or 'ffmpeg')
+        try:
+            if total_size is not None:
+                chunk_size = (info_dict.get('downloader_options') or {}).get('http_chunk_size') or self.params.get('http_chunk_size')
+                block_size = min(segmented.STREAM_BLOCK_SIZE, chunk_size or segmented.STREAM_BLOCK_SIZE)
+                segmented.stream_ranges(open_range, total_size, encoder.write, connections, block_size, on_progress)
+            else:
+                total_size = self._stream_single_response(open_range, encoder, on_progress)
+            encoder.close()
+        except BaseException:
+            encoder.abort()
+            raise
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            'status': 'finished',
+            'downloaded_bytes': total_size,
+            'total_bytes': total_size,
+            'filename': filename,
+            'elapsed': time.time() - start_time,
+        }, info_dict)
+        return True
+
+    # Entrega ao ffmpeg uma resposta completa (servidor sem suporte a Range), na ordem em que é lida
+    def _stream_single_response(self, open_range, encoder, on_progress):
+        downloaded = 0
+        with open_range(0, None) as response:
+            total_size = int(response.headers.get('Content-Length') or 0) or None
+            while True:
+                data = response.read(segmented.READ_SIZE)
+                if not data:
+                    break
+                encoder.write(data)
+                downloaded += len(data)
+                on_progress(downloaded, total_size)
+        return downloaded
+
+# YoutubeDL que baixa formatos HTTP progressivos em várias conexões
+class YoutubeDL(yt_dlp.YoutubeDL):
+    # Cria uma instância nova com as opções `params` que compartilha os objetos já inicializados desta (WARM_ATTRS)
+    # Todo o estado do download (modelo de saída, seletor de formato, hooks, contadores) é criado pelo próprio
+    # yt_dlp; as opções que definem a instância (INSTANCE_PARAMS) devem ser as mesmas desta
+    def fork(self, params):
+        ydl = type(self)(params, auto_init=False)
+        for name in WARM_NETWORK_ATTRS:
+            getattr(self, name, None)  # Cookies e conexões são criados nesta instância, que continua no pool
+        state = vars(self)
+        warm = {name: state[name] for name in WARM_ATTRS if name in state}
+        if not all(name in warm for name in WARM_EXTRACTOR_ATTRS):
+            # Versão do yt_dlp sem esses atributos: os extratores são criados novamente (mais lento, mas correto)
+            warm = {name: value for name, value in warm.items() if name not in WARM_EXTRACTOR_ATTRS}
+            ydl.add_default_info_extractors()
+        vars(ydl).update(warm)
+        ydl.adopt_extractors()
+        return ydl
+
+    # Faz os extratores já inicializados usarem esta instância (e não a do download que os usou por último)
+    def adopt_extractors(self):
+        for ie in vars(self).get('_ies_instances', {}).values():
+            ie.set_downloader(self)
+
+    # Limita as leituras das respostas pela cota de banda do download (todos os downloaders usam o urlopen)
+    def urlopen(self, req):
+        response = super().urlopen(req)
+        lease = self.params.get('bandwidth_lease')
+        return bandwidth.ThrottledStream(response, lease) if lease is not None else response
+
+    def dl(self, name, info, subtitle=False, test=False):
+        download_start_hook = self.params.get('download_start_hook')  # Marca o início do download (medições do engine)
+        if download_start_hook is not None and not (test or subtitle):
+            download_start_hook(info)
+        connections = self.params.get('segmented_connections') or 1
+        if (test or subtitle or name == '-' or connections <= 1 or info.get('is_live')
+                or self.params.get('external_downloader') or determine_protocol(info) not in ('http', 'https')):
+            return super().dl(name, info, subtitle, test)
+        if not info.get('url'):
+            self.raise_no_formats(info, True)
+
+        fd = SegmentedHttpFD(self, self.params)
+        for progress_hook in self._progress_hooks:
+            fd.add_progress_hook(progress_hook)
+        new_info = self._copy_infodict(info)
+        if new_info.get('http_headers') is None:
+            new_info['http_headers'] = self._calc_headers(new_info)
+        return fd.download(name, new_info, subtitle)
+
+    # Seleciona o formato (opção 'format') das informações extraídas e o converte para mp3 durante o download
+    # O mp3 segue o modelo de nome de saída, com a extensão .mp3. Retorna as informações com o arquivo final em
+    # 'requested_downloads', ou None se o formato não puder ser transmitido ao ffmpeg (formatos separados,
+    # fragmentados ou em contêineres que exigem acesso aleatório), caso em que o download normal deve ser usado
+    def stream_audio(self, info):
+        info = self.process_ie_result(info, download=False)
+        if (info.get('requested_formats') or info.get('is_live') or not info.get('url')
+                or determine_protocol(info) not in ('http', 'https')
+                or not postprocess.can_stream(info.get('ext'), info.get('container'))):
+            return None
+        filename = os.path.splitext(self.prepare_filename(info))[0] + '.mp3'
+        download_start_hook = self.params.get('download_start_hook')  # Marca o início do download (medições do engine)
+        if download_start_hook is not None:
+            download_start_hook(info)
+
+        fd = StreamingAudioFD(self, self.params)
+        for progress_hook in self._progress_hooks:
+            fd.add_progress_hook(progress_hook)
+        new_info = self._copy_infodict(info)
+        if new_info.get('http_headers') is None:
+            new_info['http_headers'] = self._calc_headers(new_info)
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        fd.download(filename, new_info)
+        info['requested_downloads'] = [{**new_info, 'filepath': filename, 'ext': 'mp3'}]
+        return info
+
+    # Seleciona nas informações já extraídas os formatos de uma especificação (sintaxe da opção 'format'), sem baixá-los
+    # Retorna os formatos a baixar: vídeo e áudio separados (a serem juntados) ou um único formato
+    def select_formats(self, info, format_spec):
+        formats = info.get('formats') or [info]
+        selected = self._select_formats(formats, self.build_format_selector(format_spec))
+        if not selected:
+            raise yt_dlp.utils.ExtractorError(f"Requested format is not available: {format_spec}", expected=True)
+        return list(selected[0].get('requested_formats') or [selected[0]])
+
+    # Baixa um único formato das informações extraídas em `filename` (com as conexões paralelas e a cota de banda
+    # do download); um arquivo já completo não é baixado novamente e um arquivo parcial é continuado
+    def download_format(self, info, stream, filename):
+        new_info = {**info, **stream}
+        new_info.pop('requested_formats', None)
+        new_info.pop('requested_downloads', None)
+        os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+        success, _ = self.dl(filename, new_info)
+        if not success:
+            raise yt_dlp.utils.DownloadError(f"Falha ao baixar o formato {stream.get('format_id')}")
+        return filename
+
+# Opções que definem a instância: downloads com valores diferentes usam instâncias diferentes
+# (inclui todas as opções usadas pelo yt_dlp ao criar os cookies e as conexões compartilhados;
+# as demais opções valem apenas para o download, ver YoutubeDL.fork)
+INSTANCE_PARAMS = (
+    'cachedir', 'cookiefile', 'cookiesfrombrowser', 'proxy', 'source_address', 'http_headers', 'nocheckcertificate',
+    'impersonate', 'postprocessors', 'download_archive', 'usenetrc', 'netrc_location', 'username', 'password',
+    'verbose', 'compat_opts', 'js_runtimes', 'socket_timeout', 'legacyserverconnect', 'debug_printtraffic',
+    'enable_file_urls', 'client_certificate', 'client_certificate_key', 'client_certificate_password',
+)
+# Atributos internos do yt_dlp.YoutubeDL compartilhados pelas instâncias criadas por YoutubeDL.fork: extratores já
+# inicializados (no YouTube, o player e as funções de assinatura já processados), cookies e conexões abertas
+# Se algum deixar de existir em uma nova versão do yt_dlp, o download apenas cria o seu (ver tests/test_ytdl.py)
+WARM_EXTRACTOR_ATTRS = ('_ies', '_ies_instances')
+WARM_NETWORK_ATTRS = ('cookiejar', '_request_director')
+WARM_ATTRS = WARM_EXTRACTOR_ATTRS + WARM_NETWORK_ATTRS
+# Número máximo de instâncias livres mantidas por plataforma
+MAX_IDLE = 4
+
+# Classe do conjunto de instâncias do YoutubeDL
+# Cada instância guarda os extratores já inicializados (no YouTube, o player e as funções de assinatura já
+# processados), os cookies e as conexões abertas; o próximo download do mesmo site reaproveita tudo isso.
+# `factory(params)` cria uma instância e `shared_params` são as opções comuns a todas (por exemplo, 'cachedir')
+class YoutubeDLPool:
+    def __init__(self, factory=None, shared_params=None, max_idle=MAX_IDLE):
+        self._factory = factory or YoutubeDL
+        self.shared_params = dict(shared_params or {})
+        self.max_idle = max_idle
+        self._idle = {}  # (plataforma, opções da instância) -> instâncias livres
+        self._lock = threading.Lock()
+        self.created = 0  # Instâncias criadas
+        self.reused = 0  # Downloads atendidos por uma instância já existente
+
+    # Chave das instâncias intercambiáveis: a plataforma e as opções que definem a instância
+    def _key(self, platform, params):
+        return platform, tuple(sorted((key, repr(params[key])) for key in INSTANCE_PARAMS if key in params))
+
+    # Empresta uma instância para um download com as opções `params`
+    # A instância emprestada é nova (YoutubeDL.fork); a do pool, que guarda os objetos já inicializados, volta a
+    # ficar livre ao final sem nenhuma referência ao download (hooks, cota de banda)
+    @contextmanager
+    def lease(self, platform, params):
+        params = {**self.shared_params, **params}
+        key = self._key(platform, params)
+        with self._lock:
+            idle = self._idle.get(key)
+            warm = idle.pop() if idle else None  # A mais recente primeiro (conexões ainda abertas)
+            if warm is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        if warm is None:
+            warm = self._factory({key: value for key, value in params.items() if key in INSTANCE_PARAMS})
+        try:
+            yield warm.fork(params)
+        finally:
+            warm.adopt_extractors()
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(warm)
+                    warm = None
+            if warm is not None:
+                warm.close()  # Excedente: grava os cookies e fecha as conexões
+
+    def stats(self):
+        with self._lock:
+            return {'created': self.created, 'reused': self.reused, 'idle': sum(len(idle) for idle in self._idle.values())}
+
+    # Fecha todas as instâncias livres (grava os cookies e fecha as conexões)
+    def close(self):
+        with self._lock:
+            instances = [ydl for idle in self._idle.values() for ydl in idle]
+            self._idle.clear()
+        for ydl in instances:
+            ydl.close()